@@ -0,0 +1,64 @@
+"""Shared animation clock and sine lookup tables.
+
+Everything that sways, bobs or pulses reads its phase from one
+``AnimationClock``. The game advances it once per frame by the real
+frame time, so animations run at the same speed at any frame rate, and
+no button or tear keeps a counter of its own. Sines come from a table
+computed at import: ``sin``/``cos`` for single values, ``sin_array`` for
+NumPy arrays of phases.
+"""
+
+import math
+
+import numpy as np
+
+SINE_TABLE_SIZE = 4096  # a power of two, so indices wrap with a mask
+SINE_TABLE = np.sin(np.arange(SINE_TABLE_SIZE) * (math.tau / SINE_TABLE_SIZE))
+
+# Animation time units per second: the original 0.02 per frame at 60 FPS
+ANIMATION_RATE = 1.2
+
+_SINES = SINE_TABLE.tolist()
+_INDEX_SCALE = SINE_TABLE_SIZE / math.tau
+_MASK = SINE_TABLE_SIZE - 1
+_QUARTER = SINE_TABLE_SIZE // 4
+
+def sin(phase):
+    return _SINES[int(phase * _INDEX_SCALE) & _MASK]
+
+def cos(phase):
+    return _SINES[(int(phase * _INDEX_SCALE) + _QUARTER) & _MASK]
+
+def sin_array(phases):
+    return SINE_TABLE[(np.asarray(phases) * _INDEX_SCALE).astype(np.int64) & _MASK]
+
+def cos_array(phases):
+    return SINE_TABLE[((np.asarray(phases) * _INDEX_SCALE).astype(np.int64) + _QUARTER) & _MASK]
+
+class AnimationClock:
+    """Animation time shared by everything drawn in a frame.
+
+    ``wave`` values are computed once per frame and reused by every
+    caller asking for the same frequency and offset.
+    """
+
+    def __init__(self, rate=ANIMATION_RATE):
+        self.rate = rate
+        self.time = 0.0
+        self._waves = {}
+
+    def advance(self, seconds):
+        self.time += seconds * self.rate
+        self._waves.clear()
+
+    def wave(self, frequency=1.0, offset=0.0):
+        """``sin(time * frequency + offset)`` for the current frame."""
+        key = (frequency, offset)
+        value = self._waves.get(key)
+        if value is None:
+            value = self._waves[key] = sin(self.time * frequency + offset)
+        return value
+
+    def step(self, frequency, steps):
+        """Which of ``steps`` equal parts of a ``sin(time * frequency)`` period the frame is in."""
+        return int(self.time * frequency * steps / math.tau) % steps
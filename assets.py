@@ -0,0 +1,146 @@
+"""Background loading and caching of the game's sounds and music.
+
+``AssetManager.start`` loads everything on a daemon thread so the welcome
+screen can animate straight away; lookups return ``None`` until an asset
+is ready. Each sound effect is also pre-rendered into the pitch and
+volume variants the voice pool plays. Decoded sound effects are written
+to a raw PCM cache keyed by the source file and the mixer format, and
+later launches memory-map the cached samples instead of decoding the MP3
+again.
+"""
+
+import os
+import threading
+import time
+
+import numpy as np
+import pygame
+
+from audio import render_variants
+
+ASSET_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.environ.get("TEARS_CACHE_DIR",
+                           os.path.join(os.path.expanduser("~"), ".cache", "tears-pygame"))
+
+# Sound name -> (file, volume)
+SOUNDS = {
+    "tear": ("teardrop-drop-sound.mp3", 0.9),
+}
+MUSIC_FILE = "bgmusic.mp3"
+MUSIC_VOLUME = 0.3
+
+class AssetManager:
+    def __init__(self, cache_dir=CACHE_DIR, on_ready=None):
+        self.cache_dir = cache_dir
+        self.on_ready = on_ready
+        self.sounds = {}
+        self.variants = {}
+        self.music_loaded = False
+        self.load_seconds = None
+
+        self._lock = threading.Lock()
+        self._music_wanted = False
+        self._ready = threading.Event()
+        self._thread = None
+
+    @property
+    def ready(self):
+        return self._ready.is_set()
+
+    def start(self):
+        """Begin loading on a background thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._load_all, name="asset-loader", daemon=True)
+            self._thread.start()
+
+    def wait(self, timeout=None):
+        """Block until loading finishes; return whether it did."""
+        self.start()
+        return self._ready.wait(timeout)
+
+    def sound(self, name):
+        return self.sounds.get(name)
+
+    def play_music(self):
+        """Play the music from the start, or as soon as it has loaded."""
+        with self._lock:
+            self._music_wanted = True
+            if not self.music_loaded:
+                return
+        try:
+            pygame.mixer.music.play(-1)
+        except pygame.error as e:
+            print(f"Error playing music: {e}")
+
+    def stop_music(self):
+        with self._lock:
+            self._music_wanted = False
+            if not self.music_loaded:
+                return
+        pygame.mixer.music.stop()
+
+    def _load_all(self):
+        start = time.perf_counter()
+        for name, (filename, volume) in SOUNDS.items():
+            sound = self._load_sound(filename)
+            if sound is not None:
+                sound.set_volume(volume)
+                self.variants[name] = render_variants(sound, base_volume=volume)
+                self.sounds[name] = sound
+        self._load_music()
+        self.load_seconds = time.perf_counter() - start
+        if self.on_ready is not None:
+            self.on_ready(self)
+        self._ready.set()
+        print(f"Assets loaded in {self.load_seconds * 1000:.0f} ms")
+
+    def _cache_path(self, path):
+        stat = os.stat(path)
+        frequency, size, channels = pygame.mixer.get_init()
+        name = os.path.splitext(os.path.basename(path))[0]
+        return os.path.join(self.cache_dir,
+                            f"{name}-{stat.st_size}-{stat.st_mtime_ns}-{frequency}-{size}-{channels}.pcm")
+
+    def _load_sound(self, filename):
+        path = os.path.join(ASSET_DIR, filename)
+        try:
+            cache_path = self._cache_path(path)
+        except (OSError, TypeError) as e:
+            # TypeError: get_init() returned None, the mixer is not running
+            print(f"Error loading sound {filename}: {e}")
+            return None
+
+        if os.path.exists(cache_path):
+            try:
+                samples = np.memmap(cache_path, dtype=np.uint8, mode="r")
+                return pygame.mixer.Sound(buffer=samples)
+            except (OSError, ValueError, pygame.error) as e:
+                print(f"Ignoring unreadable sound cache {cache_path}: {e}")
+
+        try:
+            sound = pygame.mixer.Sound(path)
+        except (OSError, pygame.error) as e:
+            print(f"Error loading sound {filename}: {e}")
+            return None
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            partial = f"{cache_path}.{os.getpid()}.tmp"
+            with open(partial, "wb") as f:
+                f.write(sound.get_raw())
+            os.replace(partial, cache_path)
+        except OSError as e:
+            print(f"Could not cache decoded {filename}: {e}")
+        return sound
+
+    def _load_music(self):
+        try:
+            pygame.mixer.music.load(os.path.join(ASSET_DIR, MUSIC_FILE))
+            pygame.mixer.music.set_volume(MUSIC_VOLUME)
+        except (OSError, pygame.error) as e:
+            print(f"Error loading music: {e}")
+            return
+        with self._lock:
+            self.music_loaded = True
+            play = self._music_wanted
+        if play:
+            self.play_music()
@@ -0,0 +1,120 @@
+"""Sound effect playback through a fixed pool of reserved mixer channels.
+
+Game code queues named cues with ``VoicePool.queue`` while it simulates;
+``flush`` runs once per frame and plays each queued cue at most once,
+using a louder pre-rendered variant when several were coalesced. A
+sliding one-second window caps how many voices start per second, and
+when every channel is busy a cue may only take over a voice of equal or
+lower priority.
+"""
+
+import collections
+import random
+import time
+
+import numpy as np
+import pygame
+
+VOICE_COUNT = 8
+MAX_VOICES_PER_SECOND = 16
+DEFAULT_BUFFER = 512  # samples; smaller means lower latency but risks underruns
+
+# Pre-rendered variants: pitch factors x volume levels for coalesced cues
+PITCH_VARIANTS = (0.94, 1.0, 1.06)
+VOLUME_LEVELS = (1.0, 1.1)
+
+def render_variants(sound, pitches=PITCH_VARIANTS, volumes=VOLUME_LEVELS, base_volume=1.0):
+    """Return ``variants[volume_index][pitch_index]`` copies of ``sound``.
+
+    Pitch is changed by linear resampling, so higher variants are also
+    slightly shorter; volumes are relative to ``base_volume``.
+    """
+    samples = pygame.sndarray.array(sound)
+    length = len(samples)
+    positions = np.arange(length, dtype=np.float64)
+    resampled = []
+    for pitch in pitches:
+        if pitch == 1.0:
+            resampled.append(samples)
+            continue
+        steps = np.arange(0, length - 1, pitch)
+        if samples.ndim == 1:
+            shifted = np.interp(steps, positions, samples)
+        else:
+            shifted = np.stack([np.interp(steps, positions, samples[:, c])
+                                for c in range(samples.shape[1])], axis=1)
+        resampled.append(np.ascontiguousarray(shifted.astype(samples.dtype)))
+
+    variants = []
+    for volume in volumes:
+        row = []
+        for data in resampled:
+            variant = pygame.sndarray.make_sound(data)
+            variant.set_volume(base_volume * volume)
+            row.append(variant)
+        variants.append(row)
+    return variants
+
+class VoicePool:
+    def __init__(self, voices=VOICE_COUNT, max_per_second=MAX_VOICES_PER_SECOND, rng=None):
+        self.max_per_second = max_per_second
+        self.rng = rng or random.Random()
+        self.cues = {}
+        self.pending = collections.Counter()
+        self.started = collections.deque()
+        self.dropped = 0
+        self.channels = []
+        self._playing = []
+        if pygame.mixer.get_init():
+            # Reserve every channel so stray Sound.play() calls cannot steal ours
+            pygame.mixer.set_num_channels(voices)
+            pygame.mixer.set_reserved(voices)
+            self.channels = [pygame.mixer.Channel(i) for i in range(voices)]
+            self._playing = [(0, 0.0)] * voices
+
+    def add_cue(self, name, variants, priority=0):
+        """Register ``variants`` (from ``render_variants``) under ``name``."""
+        self.cues[name] = (variants, priority)
+
+    def queue(self, name):
+        """Ask for ``name`` to play on the next ``flush``."""
+        if name in self.cues:
+            self.pending[name] += 1
+
+    def flush(self, now=None):
+        """Start the cues queued since the last flush, highest priority first."""
+        if not self.pending:
+            return
+        now = time.perf_counter() if now is None else now
+        started = self.started
+        while started and now - started[0] >= 1.0:
+            started.popleft()
+
+        order = sorted(self.pending.items(), key=lambda item: -self.cues[item[0]][1])
+        self.pending.clear()
+        for name, count in order:
+            if len(started) >= self.max_per_second:
+                self.dropped += count
+                continue
+            variants, priority = self.cues[name]
+            row = variants[min(count, len(variants)) - 1]
+            if self._start(self.rng.choice(row), priority, now):
+                started.append(now)
+            else:
+                self.dropped += count
+
+    def _start(self, sound, priority, now):
+        if not self.channels:
+            return False
+        victim = None
+        for i, channel in enumerate(self.channels):
+            if not channel.get_busy():
+                victim = i
+                break
+            if victim is None or self._playing[i] < self._playing[victim]:
+                victim = i
+        if self.channels[victim].get_busy() and self._playing[victim][0] > priority:
+            return False
+        self.channels[victim].play(sound)
+        self._playing[victim] = (priority, now)
+        return True
@@ -0,0 +1,394 @@
+"""Batch rollouts of headless catch game sessions for difficulty tuning.
+
+Many sessions are simulated at once as a NumPy batch dimension, and
+batches fan out across processes. Example::
+
+    python batch_runner.py --sessions 20000 --policy track:0.9 --classic-spawns \\
+        --sweep OBJECT_SPAWN_RATE=30,45,60 --sweep DANGER_SPAWN_CHANCE=10,15,25
+
+Setting names are the gameplay constants from ``simulation.py`` (which
+``catch_game.py`` imports); each maps to the matching ``SimConfig``
+attribute. Only the settings in ``BATCH_SETTINGS`` are accepted, as the
+batch engine ignores the others. Like the game, sessions spawn from
+``waves.json`` unless told otherwise, and the wave file then replaces the
+``CLASSIC_SETTINGS``.
+"""
+
+import argparse
+import itertools
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from simulation import INPUT_LEFT, INPUT_RIGHT, TICK_RATE, SimConfig, classic_tear_types
+from waves import DEFAULT_WAVES, SpawnSchedule, WaveError, load_waves
+
+DEFAULT_MAX_TICKS = 10 * 60 * TICK_RATE
+DEFAULT_BATCH_SIZE = 1024
+POLICIES = ("idle", "random", "track")
+# The SimConfig attributes BatchSimulation plays by
+BATCH_SETTINGS = ("width", "height", "bucket_width", "bucket_height", "bucket_speed", "bucket_bottom_margin",
+                  "object_size", "object_speed", "object_spawn_rate", "danger_spawn_chance", "danger_speed_factor",
+                  "max_lives", "catch_score")
+# The ones only the random spawner uses
+CLASSIC_SETTINGS = ("object_size", "object_speed", "object_spawn_rate", "danger_spawn_chance", "danger_speed_factor",
+                    "catch_score")
+
+class BatchSimulation:
+    """``size`` independent sessions of the game rules stepped in lockstep.
+
+    Mirrors ``simulation.Simulation`` tick for tick, with every per-session
+    quantity held in arrays whose first axis is the session. With the
+    random spawner all sessions spawn on the same ticks, so tears live in a
+    small ring of slots per session that is sized for the slowest tear to
+    clear the screen. With a wave file every session of the batch plays the
+    schedule of the batch's seed: the tears' positions are shared and only
+    whether each session still has a tear is kept per session.
+    """
+
+    def __init__(self, size, config=None, seed=None):
+        self.config = config = config or SimConfig()
+        self.size = size
+        self.rng = np.random.default_rng(seed)
+
+        self.tick = 0
+        self.spawn_timer = 0
+        self.next_slot = 0
+        self.bucket_x = np.full(size, config.bucket_start_x, dtype=np.int64)
+        self.score = np.zeros(size, dtype=np.int64)
+        self.lives = np.full(size, config.max_lives, dtype=np.int64)
+        self.alive = np.ones(size, dtype=bool)
+        self.length = np.zeros(size, dtype=np.int64)
+        self.lost_at = np.full((size, config.max_lives), -1, dtype=np.int64)
+
+        if config.waves:
+            waveset = load_waves(config.waves)
+            tear_types = waveset.tear_types
+            schedule_seed = seed if seed is not None else int(self.rng.integers(2 ** 32))
+            self.schedule = SpawnSchedule(waveset, schedule_seed, config.width, TICK_RATE, config.tear_variants)
+            self.slots = 0
+            shape = (0,)
+            self.tear_size = np.zeros(0, dtype=np.int32)
+        else:
+            tear_types = classic_tear_types(config)
+            self.schedule = None
+            fall_ticks = (config.height + 2 * config.object_size) / config.object_speed
+            self.slots = int(math.ceil(fall_ticks / config.object_spawn_rate)) + 1
+            shape = (size, self.slots)
+            self.tear_size = config.object_size
+        self.type_score = np.array([tear_type.score for tear_type in tear_types], dtype=np.int64)
+        self.type_damage = np.array([tear_type.damage for tear_type in tear_types], dtype=np.int64)
+        self.type_miss_damage = np.array([tear_type.miss_damage for tear_type in tear_types], dtype=np.int64)
+
+        # Shared by every session with a wave file, one row per session otherwise
+        self.tear_x = np.zeros(shape)
+        self.tear_y = np.zeros(shape)
+        self.tear_speed = np.zeros(shape)
+        self.tear_kind = np.zeros(shape, dtype=np.int8)
+        self.tear_active = np.zeros((size, shape[-1]), dtype=bool)
+
+    def step(self, inputs):
+        """Advance every running session one tick with per-session ``inputs``."""
+        config = self.config
+        alive = self.alive
+        self.tick += 1
+
+        move_left = alive & ((inputs & INPUT_LEFT) != 0) & (self.bucket_x > 0)
+        self.bucket_x -= move_left * config.bucket_speed
+        move_right = alive & ((inputs & INPUT_RIGHT) != 0) & (self.bucket_x < config.width - config.bucket_width)
+        self.bucket_x += move_right * config.bucket_speed
+
+        if self.schedule is not None:
+            start, stop = self.schedule.window(self.tick)
+            if stop > start:
+                self._add_spawns(start, stop)
+        else:
+            self.spawn_timer += 1
+            if self.spawn_timer >= config.object_spawn_rate:
+                self.spawn_timer = 0
+                slot = self.next_slot
+                self.next_slot = (slot + 1) % self.slots
+                danger = self.rng.integers(1, 101, self.size) <= config.danger_spawn_chance
+                self.tear_x[:, slot] = self.rng.integers(config.object_size // 2,
+                                                         config.width - config.object_size // 2 + 1, self.size)
+                self.tear_y[:, slot] = -config.object_size
+                self.tear_speed[:, slot] = np.where(danger, config.object_speed * config.danger_speed_factor,
+                                                    config.object_speed)
+                self.tear_kind[:, slot] = danger
+                self.tear_active[:, slot] = alive
+
+        active = self.tear_active
+        if self.schedule is not None:
+            self.tear_y += self.tear_speed
+        else:
+            self.tear_y += self.tear_speed * active
+
+        size = self.tear_size
+        left = np.trunc(self.tear_x - size // 2)
+        top = np.trunc(self.tear_y - size // 2)
+        bucket_left = self.bucket_x[:, None]
+        bucket_top = config.bucket_y
+        hit = (active
+               & (left < bucket_left + config.bucket_width) & (left + size > bucket_left)
+               & (top < bucket_top + config.bucket_height) & (top + size > bucket_top))
+        off_screen = active & ~hit & (self.tear_y > config.height + size)
+
+        damage = self.type_damage[self.tear_kind]
+        caught = hit & (damage == 0)
+        lost = (hit * damage).sum(axis=1) + (off_screen * self.type_miss_damage[self.tear_kind]).sum(axis=1)
+        self.tear_active &= ~(hit | off_screen)
+        self.score += (caught * self.type_score[self.tear_kind]).sum(axis=1)
+
+        if lost.any():
+            lives_before = self.lives
+            self.lives = lives_before - lost
+            for j in range(config.max_lives):
+                newly_lost = (j >= config.max_lives - lives_before) & (j < config.max_lives - self.lives)
+                self.lost_at[:, j] = np.where(newly_lost, self.tick, self.lost_at[:, j])
+            ended = alive & (self.lives <= 0)
+            if ended.any():
+                self.length[ended] = self.tick
+                self.alive = alive & ~ended
+                self.tear_active &= self.alive[:, None]
+
+        if self.schedule is not None:
+            # Forget the shared tears that no session has any more
+            kept = self.tear_active.any(axis=0)
+            if not kept.all():
+                for name in ("tear_x", "tear_y", "tear_speed", "tear_size", "tear_kind"):
+                    setattr(self, name, getattr(self, name)[kept])
+                self.tear_active = self.tear_active[:, kept]
+
+    def _add_spawns(self, start, stop):
+        """Append the schedule's spawns ``start:stop`` to the shared tears of every running session."""
+        schedule = self.schedule
+        size = schedule.size[start:stop]
+        self.tear_x = np.concatenate((self.tear_x, schedule.x[start:stop]))
+        self.tear_y = np.concatenate((self.tear_y, -size))
+        self.tear_speed = np.concatenate((self.tear_speed, schedule.speed[start:stop]))
+        self.tear_size = np.concatenate((self.tear_size, size))
+        self.tear_kind = np.concatenate((self.tear_kind, schedule.kind[start:stop]))
+        spawned = np.repeat(self.alive[:, None], stop - start, axis=1)
+        self.tear_active = np.concatenate((self.tear_active, spawned), axis=1)
+
+def make_policy(spec, batch, seed=None):
+    """Return a ``policy(batch) -> inputs`` callable from ``name[:param]``.
+
+    idle: never moves.
+    random[:p]: holds a random direction, switching with probability p per tick.
+    track[:skill]: steers toward the lowest harmless tear; each tick it reacts
+    with probability ``skill`` and otherwise repeats its last input.
+    """
+    name, _, param = spec.partition(":")
+    rng = np.random.default_rng(seed)
+    size = batch.size
+    held = np.zeros(size, dtype=np.int64)
+
+    if name == "idle":
+        return lambda batch: held
+
+    if name == "random":
+        switch_chance = float(param or 0.1)
+        choices = np.array([0, INPUT_LEFT, INPUT_RIGHT], dtype=np.int64)
+
+        def random_policy(batch):
+            switch = rng.random(size) < switch_chance
+            held[switch] = choices[rng.integers(0, 3, int(switch.sum()))]
+            return held
+        return random_policy
+
+    if name == "track":
+        skill = float(param or 1.0)
+        config = batch.config
+        half_step = config.bucket_speed / 2
+
+        def track_policy(batch):
+            harmless = batch.tear_active & (batch.type_damage[batch.tear_kind] == 0)
+            if not harmless.shape[1]:
+                wanted = np.zeros(size, dtype=np.int64)
+            else:
+                depth = np.where(harmless, batch.tear_y, -np.inf)
+                lowest = depth.argmax(axis=1)
+                has_target = np.isfinite(depth[np.arange(size), lowest])
+                target = np.broadcast_to(batch.tear_x, harmless.shape)[np.arange(size), lowest]
+                offset = target - (batch.bucket_x + config.bucket_width / 2)
+                wanted = np.where(offset < -half_step, INPUT_LEFT, np.where(offset > half_step, INPUT_RIGHT, 0))
+                wanted = np.where(has_target, wanted, 0)
+            react = rng.random(size) < skill
+            held[react] = wanted[react]
+            return held
+        return track_policy
+
+    raise ValueError(f"Unknown policy {spec!r}; expected one of {', '.join(POLICIES)}")
+
+def run_batch(overrides, size, policy, seed, max_ticks, waves=DEFAULT_WAVES):
+    """Play ``size`` sessions to completion and return their raw results.
+
+    ``waves`` names the wave file to spawn from, None for the random spawner.
+    """
+    config = SimConfig(waves=waves, **overrides)
+    batch = BatchSimulation(size, config, seed)
+    choose_inputs = make_policy(policy, batch, None if seed is None else seed + 1)
+    while batch.alive.any() and batch.tick < max_ticks:
+        batch.step(choose_inputs(batch))
+    batch.length[batch.alive] = batch.tick
+    return {
+        "score": batch.score,
+        "length": batch.length,
+        "lost_at": batch.lost_at,
+        "truncated": batch.alive.copy(),
+    }
+
+def summarize(results):
+    """Reduce a list of ``run_batch`` results to summary statistics."""
+    score = np.concatenate([r["score"] for r in results])
+    length = np.concatenate([r["length"] for r in results]) / TICK_RATE
+    lost_at = np.concatenate([r["lost_at"] for r in results]) / TICK_RATE
+    truncated = np.concatenate([r["truncated"] for r in results])
+
+    def stats(values):
+        if not values.size:
+            return None
+        return {
+            "mean": float(values.mean()),
+            "std": float(values.std()),
+            "min": float(values.min()),
+            "p10": float(np.percentile(values, 10)),
+            "p50": float(np.percentile(values, 50)),
+            "p90": float(np.percentile(values, 90)),
+            "max": float(values.max()),
+        }
+
+    return {
+        "sessions": int(score.size),
+        "score": stats(score),
+        "session_seconds": stats(length),
+        # Mean time (s) at which the n-th life was lost, over sessions that lost it
+        "life_lost_seconds": [stats(column[column >= 0]) for column in lost_at.T],
+        "truncated_fraction": float(truncated.mean()) if truncated.size else 0.0,
+    }
+
+def parse_setting(text):
+    """Parse ``NAME=v1,v2,...`` into (SimConfig attribute, [values])."""
+    name, sep, values = text.partition("=")
+    if not sep or not values:
+        raise argparse.ArgumentTypeError(f"Expected NAME=value[,value...], got {text!r}")
+    attribute = name.strip().lower()
+    if attribute not in BATCH_SETTINGS:
+        names = ", ".join(setting.upper() for setting in BATCH_SETTINGS)
+        raise argparse.ArgumentTypeError(f"Unknown or unsupported setting {name!r}; expected one of {names}")
+    parsed = []
+    for value in values.split(","):
+        number = float(value)
+        parsed.append(int(number) if number.is_integer() else number)
+    return attribute, parsed
+
+def sweep_grid(sets, sweeps):
+    """Expand fixed settings and sweep axes into a list of override dicts."""
+    base = {name: values[-1] for name, values in sets}
+    names = [name for name, _ in sweeps]
+    grid = []
+    for combination in itertools.product(*[values for _, values in sweeps]):
+        overrides = dict(base)
+        overrides.update(zip(names, combination))
+        grid.append(overrides)
+    return grid
+
+def run_sweep(grid, sessions, policy="track", batch_size=DEFAULT_BATCH_SIZE, workers=None,
+              seed=0, max_ticks=DEFAULT_MAX_TICKS, waves=DEFAULT_WAVES, on_result=None):
+    """Run ``sessions`` sessions per point of ``grid`` across worker processes.
+
+    ``on_result(overrides, summary)`` is called as each grid point finishes.
+    Returns ``(summaries, elapsed_seconds)`` with summaries in grid order.
+    """
+    pending = {}
+    collected = [[] for _ in grid]
+    remaining = [0] * len(grid)
+    summaries = [None] * len(grid)
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        chunk_seed = seed
+        for index, overrides in enumerate(grid):
+            for offset in range(0, sessions, batch_size):
+                size = min(batch_size, sessions - offset)
+                future = executor.submit(run_batch, overrides, size, policy, chunk_seed, max_ticks, waves)
+                pending[future] = index
+                remaining[index] += 1
+                chunk_seed += 2
+
+        for future in as_completed(pending):
+            index = pending.pop(future)
+            collected[index].append(future.result())
+            remaining[index] -= 1
+            if not remaining[index]:
+                summaries[index] = summarize(collected[index])
+                collected[index] = None
+                if on_result:
+                    on_result(grid[index], summaries[index])
+
+    return summaries, time.perf_counter() - start
+
+def format_summary(overrides, summary):
+    label = ", ".join(f"{name.upper()}={value}" for name, value in overrides.items()) or "defaults"
+    score = summary["score"]
+    length = summary["session_seconds"]
+    lives = " ".join("-" if s is None else f"{s['mean']:.0f}s" for s in summary["life_lost_seconds"])
+    return (f"{label}: score mean {score['mean']:.1f} p50 {score['p50']:.0f} p90 {score['p90']:.0f} | "
+            f"length mean {length['mean']:.1f}s p50 {length['p50']:.1f}s | "
+            f"lives lost at {lives} | truncated {summary['truncated_fraction']:.1%}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Run batches of headless catch game sessions.")
+    parser.add_argument("--sessions", type=int, default=10000, help="sessions per sweep point")
+    parser.add_argument("--policy", default="track:0.9", help="idle, random[:p] or track[:skill]")
+    parser.add_argument("--set", dest="sets", action="append", type=parse_setting, default=[],
+                        metavar="NAME=VALUE", help="override a gameplay constant")
+    parser.add_argument("--sweep", dest="sweeps", action="append", type=parse_setting, default=[],
+                        metavar="NAME=V1,V2", help="sweep a gameplay constant over values")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--max-seconds", type=float, default=DEFAULT_MAX_TICKS / TICK_RATE,
+                        help="cut sessions off after this much game time")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--waves", metavar="FILE", default=DEFAULT_WAVES,
+                        help=f"tear types and spawn waves to play (default {DEFAULT_WAVES})")
+    parser.add_argument("--classic-spawns", action="store_true",
+                        help="spawn tears with the original fixed-rate random spawner instead of waves")
+    parser.add_argument("--json", help="write all summaries to this file")
+    args = parser.parse_args()
+
+    waves = None if args.classic_spawns else args.waves
+    if waves is not None:
+        try:
+            load_waves(waves)
+        except WaveError as e:
+            parser.error(str(e))
+        replaced = [name.upper() for name, _ in args.sets + args.sweeps if name in CLASSIC_SETTINGS]
+        if replaced:
+            parser.error(f"{', '.join(replaced)}: only used with --classic-spawns, the wave file replaces them")
+    make_policy(args.policy, BatchSimulation(1))
+    grid = sweep_grid(args.sets, args.sweeps)
+    summaries, elapsed = run_sweep(grid, args.sessions, args.policy, args.batch_size, args.workers,
+                                   args.seed, int(args.max_seconds * TICK_RATE), waves,
+                                   on_result=lambda overrides, summary: print(format_summary(overrides, summary)))
+
+    total = args.sessions * len(grid)
+    print(f"{total} sessions in {elapsed:.2f}s ({total / elapsed:.0f} sessions/s)")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({
+                "policy": args.policy,
+                "waves": waves,
+                "elapsed_seconds": elapsed,
+                "sessions_per_second": total / elapsed,
+                "results": [{"settings": overrides, "summary": summary}
+                            for overrides, summary in zip(grid, summaries)],
+            }, f, indent=2)
+
+if __name__ == "__main__":
+    main()
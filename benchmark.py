@@ -0,0 +1,304 @@
+"""Rendering and update benchmarks for the catch game.
+
+Drives a real ``Game`` under SDL's dummy video and audio drivers through
+canned scenes and times every call of the hot methods in ``METHODS``.
+Each scenario reports frames per second, p50/p99 frame time and, per
+method, p50/p99 call time plus allocations per call (new Surfaces and
+net Python memory blocks).
+
+Save a baseline with ``python benchmark.py --save baseline.json`` and
+check a later run against it with ``--baseline baseline.json``; the run
+exits with status 1 when a scenario is slower than the baseline by more
+than ``--threshold``.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+# The drivers must be chosen before pygame is initialised by catch_game
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import numpy as np
+import pygame
+
+from catch_game import (FPS, GAME_OVER, PLAYING, WELCOME_SCREEN, PARTICLE_LIFE, PARTICLE_MAX_SIZE,
+                        PARTICLE_MIN_SIZE, TEARS_MEDIUM, Game, Particle)
+import profiler
+from simulation import INPUT_LEFT, INPUT_RIGHT, SimConfig, spawn_tear
+from waves import DEFAULT_WAVES
+
+METHODS = ("draw_animated_background", "draw_game_screen", "draw_game_over_screen", "update_game")
+DEFAULT_FRAMES = 300
+WARMUP_FRAMES = 30
+DEFAULT_THRESHOLD = 0.25
+# Slowdowns smaller than this are timer noise, whatever the percentage
+REGRESSION_FLOOR_MS = 0.1
+STRESS_TEARS = 500
+STRESS_PARTICLES = 20000
+SEED = 1234
+FRAME_SECONDS = 1.0 / FPS
+
+_tear_rng = random.Random(SEED)
+
+def _tracking_input(game):
+    """Scripted player: steer the bucket under the lowest blue tear."""
+    sim = game.sim
+    tears = sim.tears
+    blue = np.flatnonzero(tears.kind[:tears.count] == 0)
+    if not blue.size:
+        return 0
+    target = tears.x[blue[np.argmax(tears.y[blue])]]
+    centre = sim.bucket_x + sim.config.bucket_width / 2
+    if target < centre - 4:
+        return INPUT_LEFT
+    if target > centre + 4:
+        return INPUT_RIGHT
+    return 0
+
+def _start_playing(game, waves=DEFAULT_WAVES, **settings):
+    game.sim.config = SimConfig(waves=waves, **settings)
+    game.first_seed = SEED
+    game.state = PLAYING
+    game.reset_game()
+    game.read_input = lambda: _tracking_input(game)
+
+def _fill_tears(game, rng, count, spread=False):
+    config = game.sim.config
+    while game.sim.tears.count < count:
+        y = rng.uniform(-config.object_size, config.height) if spread else -config.object_size
+        spawn_tear(game.sim.tears, rng.randint(0, config.width), y, rng.random() < 0.15, rng, config)
+
+def _fill_particles(game, count):
+    missing = count - game.particles.count
+    if missing > 0:
+        width, height = game.screen.get_size()
+        # Straight into the pool: the stress test ignores the quality level's particle cap
+        game.particles.pool.spawn_many(np.random.uniform(0, width, missing),
+                                       np.random.uniform(0, height, missing),
+                                       vx=np.random.uniform(-3, 3, missing),
+                                       vy=np.random.uniform(-5, -1, missing),
+                                       life=np.random.randint(1, PARTICLE_LIFE + 1, missing),
+                                       size=np.random.randint(PARTICLE_MIN_SIZE, PARTICLE_MAX_SIZE + 1, missing),
+                                       color=Particle.color_index(TEARS_MEDIUM))
+
+class Scenario:
+    """A canned scene: ``setup`` runs once, ``prepare`` untimed before every frame."""
+
+    def __init__(self, name, description, setup, frame, prepare=None):
+        self.name = name
+        self.description = description
+        self.setup = setup
+        self.frame = frame
+        self.prepare = prepare
+
+def _welcome_setup(game):
+    game.state = WELCOME_SCREEN
+
+def _welcome_frame(game):
+    game.animation.advance(FRAME_SECONDS)
+    game.draw_welcome_screen()
+
+def _play_setup(game):
+    # Enough lives that the scripted player never reaches the game over screen
+    _start_playing(game, max_lives=10 ** 6)
+
+def _play_frame(game):
+    game.animation.advance(FRAME_SECONDS)
+    game.update_game()
+    game.particles.update()
+    game.draw_game_screen()
+
+def _tears_setup(game):
+    # The pool is kept full by hand, so nothing else spawns
+    _start_playing(game, waves=None, max_lives=10 ** 6, object_spawn_rate=10 ** 6)
+    _tear_rng.seed(SEED)
+    _fill_tears(game, _tear_rng, STRESS_TEARS, spread=True)
+
+def _tears_prepare(game):
+    _fill_tears(game, _tear_rng, STRESS_TEARS)
+
+def _particles_setup(game):
+    _start_playing(game, max_lives=10 ** 6)
+    np.random.seed(SEED)
+    _fill_particles(game, STRESS_PARTICLES)
+
+def _particles_prepare(game):
+    _fill_particles(game, STRESS_PARTICLES)
+
+def _game_over_setup(game):
+    _start_playing(game)
+    for _ in range(240):
+        game.sim.step(0)
+    game.sim.lives = 0
+    game.sim.game_over = True
+    game.state = GAME_OVER
+
+def _game_over_frame(game):
+    game.animation.advance(FRAME_SECONDS)
+    game.particles.update()
+    game.draw_game_screen()
+    game.draw_game_over_screen()
+
+SCENARIOS = (
+    Scenario("welcome", "idle welcome screen", _welcome_setup, _welcome_frame),
+    Scenario("play", "normal play with a scripted player", _play_setup, _play_frame),
+    Scenario("tears_500", f"{STRESS_TEARS} simultaneous tears", _tears_setup, _play_frame, _tears_prepare),
+    Scenario("particles_20k", f"{STRESS_PARTICLES} live particles", _particles_setup, _play_frame,
+             _particles_prepare),
+    Scenario("game_over", "game over overlay", _game_over_setup, _game_over_frame),
+)
+
+class MethodTimer:
+    """Wrap ``METHODS`` on a game instance and record every call."""
+
+    def __init__(self, game):
+        self.samples = {method: [] for method in METHODS}
+        self.recording = False
+        for method in METHODS:
+            setattr(game, method, self._wrap(self.samples[method], getattr(game, method)))
+
+    def _wrap(self, samples, method):
+        clock = time.perf_counter
+
+        def timed(*args, **kwargs):
+            if not self.recording:
+                return method(*args, **kwargs)
+            surfaces = profiler.surfaces_created
+            blocks = sys.getallocatedblocks()
+            start = clock()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                elapsed = clock() - start
+                samples.append((elapsed * 1000.0, profiler.surfaces_created - surfaces,
+                                sys.getallocatedblocks() - blocks))
+        return timed
+
+def _percentiles(values):
+    p50, p99 = np.percentile(values, (50, 99))
+    return float(p50), float(p99)
+
+def run_scenario(scenario, frames=DEFAULT_FRAMES, warmup=WARMUP_FRAMES):
+    """Run one scenario on a fresh Game and return its result dict."""
+    game = Game(seed=SEED)
+    game.music_started = True
+    # Keep the loader and background ring threads out of the measured frames
+    game.assets.wait()
+    game.background.wait_ring()
+    scenario.setup(game)
+    timer = MethodTimer(game)
+
+    frame_times = []
+    for frame in range(warmup + frames):
+        if scenario.prepare is not None:
+            scenario.prepare(game)
+        timer.recording = frame >= warmup
+        start = time.perf_counter()
+        scenario.frame(game)
+        pygame.display.flip()
+        elapsed = time.perf_counter() - start
+        if timer.recording:
+            frame_times.append(elapsed * 1000.0)
+
+    frame_p50, frame_p99 = _percentiles(frame_times)
+    methods = {}
+    for method, samples in timer.samples.items():
+        if not samples:
+            continue
+        times, surfaces, blocks = np.array(samples).T
+        p50, p99 = _percentiles(times)
+        methods[method] = {
+            "calls_per_frame": len(samples) / frames,
+            "p50_ms": p50,
+            "p99_ms": p99,
+            "surfaces_per_call": float(surfaces.mean()),
+            "blocks_per_call": float(blocks.mean()),
+        }
+    return {
+        "description": scenario.description,
+        "frames": frames,
+        "fps": 1000.0 * frames / sum(frame_times),
+        "frame_p50_ms": frame_p50,
+        "frame_p99_ms": frame_p99,
+        "tears": game.sim.tears.count,
+        "particles": game.particles.count,
+        "methods": methods,
+    }
+
+def compare(results, baseline, threshold):
+    """Return a list of regression messages for ``results`` against ``baseline``."""
+    regressions = []
+    limit = 1.0 + threshold
+    for name, result in results.items():
+        base = baseline.get("scenarios", {}).get(name)
+        if base is None:
+            continue
+        checks = [("frame p50", result["frame_p50_ms"], base["frame_p50_ms"]),
+                  ("frame p99", result["frame_p99_ms"], base["frame_p99_ms"])]
+        for method, stats in result["methods"].items():
+            if method in base["methods"]:
+                checks.append((f"{method} p50", stats["p50_ms"], base["methods"][method]["p50_ms"]))
+        for label, value, reference in checks:
+            if value > reference * limit and value - reference > REGRESSION_FLOOR_MS:
+                regressions.append(f"{name}: {label} {value:.3f} ms vs baseline {reference:.3f} ms "
+                                   f"(+{(value / reference - 1) * 100:.0f}%)")
+    return regressions
+
+def format_result(name, result):
+    lines = [f"{name:14} {result['fps']:8.1f} fps  frame p50 {result['frame_p50_ms']:6.2f} ms  "
+             f"p99 {result['frame_p99_ms']:6.2f} ms  ({result['description']})"]
+    for method, stats in result["methods"].items():
+        lines.append(f"  {method:26} p50 {stats['p50_ms']:7.3f} ms  p99 {stats['p99_ms']:7.3f} ms  "
+                     f"{stats['surfaces_per_call']:6.2f} surfaces  {stats['blocks_per_call']:8.1f} blocks")
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the catch game's rendering and update paths.")
+    parser.add_argument("--scenario", dest="scenarios", action="append",
+                        choices=[scenario.name for scenario in SCENARIOS],
+                        help="run only this scenario (repeatable)")
+    parser.add_argument("--frames", type=int, default=DEFAULT_FRAMES, help="measured frames per scenario")
+    parser.add_argument("--warmup", type=int, default=WARMUP_FRAMES, help="unmeasured frames first")
+    parser.add_argument("--save", metavar="FILE", help="write results as a JSON baseline")
+    parser.add_argument("--baseline", metavar="FILE", help="fail if slower than this baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown against the baseline, as a fraction")
+    args = parser.parse_args()
+
+    results = {}
+    for scenario in SCENARIOS:
+        if args.scenarios and scenario.name not in args.scenarios:
+            continue
+        results[scenario.name] = run_scenario(scenario, args.frames, args.warmup)
+        print(format_result(scenario.name, results[scenario.name]))
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "pygame": pygame.version.ver,
+                "numpy": np.__version__,
+                "platform": platform.platform(),
+                "video_driver": os.environ.get("SDL_VIDEODRIVER"),
+                "scenarios": results,
+            }, f, indent=2)
+        print(f"Saved baseline to {args.save}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        if regressions:
+            raise SystemExit(1)
+        print(f"No regressions beyond {args.threshold * 100:.0f}% of {args.baseline}")
+
+if __name__ == "__main__":
+    main()
@@ -3,15 +3,45 @@ import random
 import sys
 import os
 import math
+import time
+import argparse
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from animation import AnimationClock, cos_array, sin_array
+from assets import AssetManager
+from audio import DEFAULT_BUFFER, VoicePool
+from controls import Controls, LatencyMeter
+from netplay import DEFAULT_PORT, STATE_OVER, STATE_PLAYING, STATE_WAITING, StateServer, parse_address
+from particles import (
+    MAX_PARTICLES, PARTICLE_MAX_SIZE, PARTICLE_MIN_SIZE, ContinuousEmitter, ParticleSystem, TrailEmitter,
+)
+from profiler import FrameProfiler, count_surfaces, new_surface
+from quality import QUALITY_NAMES, QualityGovernor
+from replay import Replay, ReplayError, ReplayRecorder
+from simulation import (
+    WINDOW_WIDTH, WINDOW_HEIGHT, BUCKET_WIDTH, BUCKET_HEIGHT, OBJECT_SIZE, MAX_LIVES,
+    TICK_RATE, TICK_SECONDS, MAX_PLAYERS, EVENT_CATCH, EVENT_HIT,
+    SimConfig, Simulation, classic_tear_types, spawn_tear,
+)
+from stats_store import DEFAULT_DB, SessionTelemetry, StatsStore
+from waves import DEFAULT_WAVES, WaveError, load_waves
+
+STARTUP_TIME = time.perf_counter()
 
 # Initialize Pygame
+pygame.mixer.pre_init(buffer=DEFAULT_BUFFER)
 pygame.init()
 pygame.mixer.init()
 
-# Constants
-WINDOW_WIDTH = 800
-WINDOW_HEIGHT = 600
+# Constants (gameplay settings live in simulation.py)
 FPS = 60
+MAX_TICKS_PER_FRAME = 5
+THREADED_SWITCH_INTERVAL = 0.001  # seconds
+# While waiting for the next frame, input is taken off the event queue this often
+INPUT_POLL_SECONDS = 0.002
 
 # Tears Blue-themed Colors (RGB values)
 TEARS_LIGHT = (173, 216, 230)  # Light blue
@@ -34,79 +64,806 @@ DANGER_LIGHT_RED = (255, 69, 0) # Red orange
 WELCOME_SCREEN = 0
 PLAYING = 1
 GAME_OVER = 2
+NET_STATES = {WELCOME_SCREEN: STATE_WAITING, PLAYING: STATE_PLAYING, GAME_OVER: STATE_OVER}
+
+# Fonts and text rendering
+TITLE_FONT_SIZE = 84
+SUBTITLE_FONT_SIZE = 42
+SCORE_FONT_SIZE = 48
+TEXT_FONT_SIZE = 28
+BUTTON_FONT_SIZE = 36
+FINAL_SCORE_FONT_SIZE = 36
+TEXT_CACHE_SIZE = 128
+
+# Particle settings (sizes and the pool capacity live in particles.py)
+PARTICLE_ALPHA_LEVELS = 16
+PARTICLE_LIFE = 60
+PARTICLE_GRAVITY = 0.1
+# Above this many live particles, draw them as one soft layer instead of a sprite each
+PARTICLE_SPRITE_LIMIT = 3000
+# Layer cell size for particles up to a given size, in render pixels
+PARTICLE_SPLAT_CELLS = ((3, 2), (PARTICLE_MAX_SIZE, 4))
+TRAIL_LIFE = 24
+HIGH_SCORE_GOLD = (255, 200, 60)
+HIGH_SCORE_SPARKLE_TICKS = 180
+
+# Tear colour variants
+BLUE_TEAR_COLORS = [TEARS_MEDIUM, SKY_BLUE, POWDER_BLUE, OCEAN_BLUE]
+DANGER_PULSE_PHASES = 32
+DANGER_GLOW_LAYERS = 3
+# Pulses per unit of animation time (radians); see animation.ANIMATION_RATE
+DANGER_PULSE_FREQUENCY = 10.0
+BUTTON_PULSE_FREQUENCY = 5.0
+
+# Sprites for the random spawner's kinds when no tear types are given
+CLASSIC_TEAR_TYPES = classic_tear_types(SimConfig())
+
+# Life icons
+LOST_LIFE_COLOR = (100, 100, 100)
+LOST_LIFE_HIGHLIGHT = (150, 150, 150)
+
+# Players: bucket palette (dark, medium, light) and (left keys, right keys, label) per player
+PLAYER_PALETTES = [
+    (TEARS_DARK, TEARS_MEDIUM, TEARS_LIGHT),
+    ((0, 100, 0), (46, 139, 87), (144, 238, 144)),
+    ((75, 0, 130), (138, 43, 226), (216, 191, 216)),
+    ((139, 69, 19), (255, 140, 0), (255, 218, 185)),
+    ((0, 90, 90), (0, 150, 150), (175, 238, 238)),
+    ((139, 10, 80), (219, 112, 147), (255, 192, 203)),
+    ((120, 90, 0), (218, 165, 32), (250, 235, 160)),
+    ((40, 40, 40), (112, 128, 144), (211, 211, 211)),
+]
+# Every colour a particle can have; pools store the index into this palette
+PARTICLE_COLORS = tuple(dict.fromkeys(
+    [TEARS_MEDIUM, DANGER_RED, DANGER_LIGHT_RED, HIGH_SCORE_GOLD] + [palette[1] for palette in PLAYER_PALETTES]))
+PARTICLE_COLOR_INDEX = {color: index for index, color in enumerate(PARTICLE_COLORS)}
+SOLO_KEYS = [((pygame.K_LEFT, pygame.K_a), (pygame.K_RIGHT, pygame.K_d), "Arrows or A/D")]
+PLAYER_KEYS = [
+    ((pygame.K_a,), (pygame.K_d,), "A/D"),
+    ((pygame.K_LEFT,), (pygame.K_RIGHT,), "Arrows"),
+    ((pygame.K_j,), (pygame.K_l,), "J/L"),
+    ((pygame.K_KP4,), (pygame.K_KP6,), "Keypad 4/6"),
+    ((pygame.K_z,), (pygame.K_c,), "Z/C"),
+    ((pygame.K_v,), (pygame.K_n,), "V/N"),
+    ((pygame.K_q,), (pygame.K_e,), "Q/E"),
+    ((pygame.K_u,), (pygame.K_o,), "U/O"),
+]
+
+# Multiplayer HUD: one panel per player across the top
+HUD_PANEL_HEIGHT = 54
+HUD_PANEL_MARGIN = 6
+HUD_PANEL_FONT_SIZE = 24
+HUD_LIFE_DOT_RADIUS = 4
+
+# Gameplay backdrop theme
+GAME_THEME = {
+    "gradient_top": (250, 252, 255),     # Almost white
+    "gradient_bottom": (200, 225, 245),  # Soft blue
+    "grid_color": TEARS_LIGHT,
+    "grid_spacing": 50,
+    "overlay_color": TEARS_DARK,
+    "overlay_alpha": 180,
+}
+
+# Sound cues: name -> (sound, priority); red hits may cut off blue catches
+SOUND_CUES = {
+    "catch": ("tear", 1),
+    "hit": ("tear", 2),
+}
+
+# Dirty-rect rendering: fall back to a full flip above this share of the screen
+DIRTY_RECT_FULL_THRESHOLD = 0.5
+
+# Welcome screen background
+BACKGROUND_PIXEL_SIZE = 8
+BACKGROUND_RING_FRAMES = 128
 
-# Bucket settings 
-BUCKET_WIDTH = 120
-BUCKET_HEIGHT = 35
-BUCKET_SPEED = 8
+class Particle:
+    """View of one particle slot in an EntityPool.
 
-# Falling object settings 
-OBJECT_SIZE = 35
-OBJECT_SPEED = 5
-OBJECT_SPAWN_RATE = 60
-DANGER_SPAWN_CHANCE = 15 
+    Views are only valid until the pool is next compacted; use ``spawn``
+    or a ``particles.ParticleSystem`` to create particles and ``draw_all``
+    to draw them.
+    """
 
-# Game settings
-MAX_LIVES = 5
+    __slots__ = ("pool", "index")
 
-class Particle:
-    def __init__(self, x, y, color, velocity_x=0, velocity_y=0, life=60):
-        self.x = x
-        self.y = y
-        self.color = color
-        self.velocity_x = velocity_x
-        self.velocity_y = velocity_y
-        self.life = life
-        self.max_life = life
-        self.size = random.randint(2, 6)
-
-    def update(self):
-        self.x += self.velocity_x
-        self.y += self.velocity_y
-        self.life -= 1
-        self.velocity_y += 0.1 
-
-    def draw(self, screen):
+    def __init__(self, pool, index):
+        self.pool = pool
+        self.index = index
+
+    @staticmethod
+    def color_index(color):
+        index = PARTICLE_COLOR_INDEX.get(tuple(color[:3]))
+        if index is None:
+            raise ValueError(f"{color} is not in PARTICLE_COLORS")
+        return index
+
+    @classmethod
+    def spawn(cls, pool, x, y, color, velocity_x=0, velocity_y=0, life=PARTICLE_LIFE):
+        size = random.randint(PARTICLE_MIN_SIZE, PARTICLE_MAX_SIZE)
+        return cls(pool, pool.spawn(x, y, velocity_x, velocity_y, life, size, cls.color_index(color)))
+
+    @property
+    def x(self):
+        return float(self.pool.x[self.index])
+
+    @property
+    def y(self):
+        return float(self.pool.y[self.index])
+
+    @property
+    def color(self):
+        return PARTICLE_COLORS[self.pool.color[self.index]]
+
+    @property
+    def size(self):
+        return int(self.pool.size[self.index])
+
+    @property
+    def life(self):
+        return int(self.pool.life[self.index])
+
+    @property
+    def max_life(self):
+        return int(self.pool.max_life[self.index])
+
+    def draw(self, screen, atlas):
         if self.life > 0:
-            alpha = int(255 * (self.life / self.max_life))
-            color_with_alpha = (*self.color[:3], alpha)
-            particle_surface = pygame.Surface((self.size * 2, self.size * 2), pygame.SRCALPHA)
-            pygame.draw.circle(particle_surface, color_with_alpha, (self.size, self.size), self.size)
-            screen.blit(particle_surface, (int(self.x - self.size), int(self.y - self.size)))
+            sprite = atlas.particle(self.color, self.size, 255 * (self.life / self.max_life))
+            if sprite is not None:
+                screen.blit(sprite, (int((self.x - self.size) * atlas.scale),
+                                     int((self.y - self.size) * atlas.scale)))
 
     def is_alive(self):
         return self.life > 0
 
+    @staticmethod
+    def draw_all(pool, screen, atlas, alpha=1.0, doreturn=False, splat=None):
+        """Draw every live particle in ``pool`` with one batched blit call.
+
+        ``alpha`` interpolates between each particle's previous and current
+        position. Past ``PARTICLE_SPRITE_LIMIT`` particles, ``splat`` (a
+        ParticleSplat) draws them as one layer instead. With ``doreturn``
+        the list of drawn rects is returned.
+        """
+        n = pool.count
+        if not n:
+            return []
+        if splat is not None and n > PARTICLE_SPRITE_LIMIT:
+            return splat.draw(pool, screen, atlas.scale, alpha)
+        sizes = pool.size[:n]
+        opacity = (255 * (pool.life[:n] / pool.max_life[:n])).astype(np.int32)
+        levels = atlas.particle_levels(opacity)
+        xs = ((pool.px[:n] + (pool.x[:n] - pool.px[:n]) * alpha - sizes) * atlas.scale).astype(np.int32)
+        ys = ((pool.py[:n] + (pool.y[:n] - pool.py[:n]) * alpha - sizes) * atlas.scale).astype(np.int32)
+        sprites = atlas.particle_palette()
+
+        blits = []
+        for color, size, level, x, y in zip(pool.color[:n].tolist(), sizes.tolist(), levels.tolist(),
+                                            xs.tolist(), ys.tolist()):
+            if level > 0:
+                blits.append((sprites[color][size][level], (x, y)))
+        return screen.blits(blits, doreturn=doreturn)
+
+class ParticleSplat:
+    """Dense particle clouds drawn as one soft layer.
+
+    Every particle adds its colour, weighted by its remaining life, to one
+    cell of a low-resolution layer with ``np.bincount``; the layer is then
+    smoothed up to the screen and blended in a single premultiplied blit.
+    The cost follows the screen size, not the particle count, so tens of
+    thousands of particles fit in a frame where a blit each would not.
+    """
+
+    def __init__(self):
+        self._layers = {}
+        self._palette = np.array(PARTICLE_COLORS, dtype=np.float64)
+
+    def _layer(self, cell, size):
+        key = (cell, size)
+        layer = self._layers.get(key)
+        if layer is None:
+            width, height = size
+            layer = self._layers[key] = new_surface((-(-width // cell), -(-height // cell)), pygame.SRCALPHA)
+        return layer
+
+    def draw(self, pool, screen, scale, alpha=1.0):
+        """Blend the particles in ``pool`` into ``screen``; return the rects drawn."""
+        n = pool.count
+        sizes = pool.size[:n]
+        weight = pool.life[:n] / pool.max_life[:n]
+        xs = (pool.px[:n] + (pool.x[:n] - pool.px[:n]) * alpha) * scale
+        ys = (pool.py[:n] + (pool.y[:n] - pool.py[:n]) * alpha) * scale
+        colors = self._palette[pool.color[:n]]
+        screen_size = screen.get_size()
+
+        rects = []
+        smallest = 0
+        for largest, cell in PARTICLE_SPLAT_CELLS:
+            chosen = np.flatnonzero((sizes > smallest) & (sizes <= largest) & (weight > 0))
+            smallest = largest
+            if not chosen.size:
+                continue
+            cell = max(1, int(round(cell * scale)))
+            layer = self._layer(cell, screen_size)
+            width, height = layer.get_size()
+            cx = np.clip((xs[chosen] / cell).astype(np.intp), 0, width - 1)
+            cy = np.clip((ys[chosen] / cell).astype(np.intp), 0, height - 1)
+            # surfarray views are indexed [x, y]
+            cells = cx * height + cy
+            w = weight[chosen]
+            coverage = np.bincount(cells, w, width * height)
+            # Premultiplied colour; overlapping particles saturate at full coverage
+            norm = 1.0 / np.maximum(coverage, 1.0)
+            packed = (np.minimum(coverage, 1.0) * 255).astype(np.uint32) << layer.get_shifts()[3]
+            for channel in range(3):
+                value = np.bincount(cells, w * colors[chosen, channel], width * height) * norm
+                packed |= value.astype(np.uint32) << layer.get_shifts()[channel]
+            pixels = pygame.surfarray.pixels2d(layer)
+            pixels[...] = packed.reshape(width, height)
+            del pixels
+
+            # Only the cells around this group's particles are scaled and blended
+            left, top = int(cx.min()) - 1, int(cy.min()) - 1
+            box = pygame.Rect(left, top, int(cx.max()) - left + 2, int(cy.max()) - top + 2).clip(layer.get_rect())
+            smooth = pygame.transform.smoothscale(layer.subsurface(box), (box.width * cell, box.height * cell))
+            count_surfaces()
+            rects.append(screen.blit(smooth, (box.x * cell, box.y * cell), special_flags=pygame.BLEND_PREMULTIPLIED))
+        return rects
+
+class AnimatedBackground:
+    """Wave gradient for the welcome screen, computed in one NumPy pass.
+
+    The gradient is evaluated on a low-res grid (one cell per
+    ``pixel_size`` block) and scaled up to the screen with a single
+    transform. With ``ring_frames`` set, one full wave period is
+    precomputed and frames are looked up by ``animation_time`` phase;
+    ``async_ring`` builds the ring on a worker thread and computes
+    frames on the fly until their slot is filled.
+    """
+
+    DARK_BLUE = (0, 51, 102)
+    MID_BLUE = (30, 144, 255)
+    PALE_BLUE = (173, 216, 230)
+
+    def __init__(self, width, height, pixel_size=BACKGROUND_PIXEL_SIZE, ring_frames=0, async_ring=False):
+        self.width = width
+        self.height = height
+        self.pixel_size = pixel_size
+
+        cols = -(-width // pixel_size)
+        rows = -(-height // pixel_size)
+        # surfarray buffers are indexed [x, y]
+        self._cell_x = (np.arange(cols, dtype=np.float64) * pixel_size)[:, None]
+        self._cell_y = (np.arange(rows, dtype=np.float64) * pixel_size)[None, :]
+        self._phase = self._cell_y * 0.06 + self._cell_x * 0.02
+
+        self._dark = np.array(self.DARK_BLUE, dtype=np.float64)
+        self._mid = np.array(self.MID_BLUE, dtype=np.float64)
+        self._pale = np.array(self.PALE_BLUE, dtype=np.float64)
+
+        self._low_res = new_surface((cols, rows)).convert()
+        self._scaled_size = (cols * pixel_size, rows * pixel_size)
+        self._scaled = None
+        self._ring = []
+        self._ring_thread = None
+        if ring_frames:
+            self.build_ring(ring_frames, async_ring)
+
+    def render_pixels(self, animation_time):
+        """Return the (cols, rows, 3) uint8 gradient for a given time."""
+        wave_offset = sin_array(animation_time + self._phase) * 16
+        color_ratio = np.clip((self._cell_y + wave_offset) / self.height, 0, 1)
+
+        lower = (color_ratio < 0.5)[..., None]
+        ratio = np.where(lower, color_ratio[..., None] / 0.5, (color_ratio[..., None] - 0.5) / 0.5)
+        start = np.where(lower, self._dark, self._mid)
+        end = np.where(lower, self._mid, self._pale)
+        # astype truncates, matching int() on the per-cell colour channels
+        return (start * (1 - ratio) + end * ratio).astype(np.uint8)
+
+    def build_ring(self, frame_count, async_ring=False):
+        """Precompute one full wave period as ``frame_count`` low-res frames."""
+        ring = self._ring = [None] * frame_count
+        if async_ring:
+            self._ring_thread = threading.Thread(target=self._fill_ring, args=(ring,), name="background-ring",
+                                                 daemon=True)
+            self._ring_thread.start()
+        else:
+            self._fill_ring(ring)
+
+    def wait_ring(self):
+        """Block until a ring being built in the background is complete."""
+        if self._ring_thread is not None:
+            self._ring_thread.join()
+            self._ring_thread = None
+
+    def _fill_ring(self, ring):
+        for i in range(len(ring)):
+            # Same format as the low-res surface, without reading its pixels
+            frame = new_surface(self._low_res.get_size(), 0, self._low_res)
+            pygame.surfarray.blit_array(frame, self.render_pixels(i * math.tau / len(ring)))
+            ring[i] = frame
+
+    def frame_for(self, animation_time):
+        """Return the low-res surface for ``animation_time``."""
+        if self._ring:
+            index = int((animation_time % math.tau) / math.tau * len(self._ring)) % len(self._ring)
+            frame = self._ring[index]
+            if frame is not None:
+                return frame
+        pygame.surfarray.blit_array(self._low_res, self.render_pixels(animation_time))
+        return self._low_res
+
+    def draw(self, screen, animation_time):
+        low_res = self.frame_for(animation_time)
+        # Screens smaller or larger than width x height get the same cells, resized
+        scale = screen.get_width() / self.width
+        scaled_size = (int(self._scaled_size[0] * scale), int(self._scaled_size[1] * scale))
+        if screen.get_size() == scaled_size:
+            pygame.transform.scale(low_res, scaled_size, screen)
+            return
+
+        if self._scaled is None or self._scaled.get_size() != scaled_size:
+            self._scaled = new_surface(scaled_size).convert()
+        pygame.transform.scale(low_res, scaled_size, self._scaled)
+        screen.blit(self._scaled, (0, 0))
+
+class BackdropCache:
+    """Prebaked full-screen backdrops, keyed by screen size and theme.
+
+    Each kind of backdrop keeps a single surface and is rebuilt only when
+    the requested size or theme differs from the one it was baked for.
+    """
+
+    def __init__(self):
+        self._entries = {}
+
+    def _get(self, kind, size, theme, build):
+        key = (size, tuple(sorted(theme.items())))
+        entry = self._entries.get(kind)
+        if entry is None or entry[0] != key:
+            entry = (key, build(size, theme))
+            self._entries[kind] = entry
+        return entry[1]
+
+    def game_backdrop(self, size, theme):
+        """Vertical gradient plus grid behind the playing field."""
+        return self._get("game", size, theme, self._build_game_backdrop)
+
+    def game_over_overlay(self, size, theme):
+        """Translucent gradient drawn over the field on the game over screen."""
+        return self._get("game_over", size, theme, self._build_game_over_overlay)
+
+    @staticmethod
+    def _build_game_backdrop(size, theme):
+        width, height = size
+        top = theme["gradient_top"]
+        bottom = theme["gradient_bottom"]
+        surface = new_surface(size).convert()
+
+        for y in range(height):
+            ratio = y / height
+            r = int(top[0] * (1 - ratio) + bottom[0] * ratio)
+            g = int(top[1] * (1 - ratio) + bottom[1] * ratio)
+            b = int(top[2] * (1 - ratio) + bottom[2] * ratio)
+            pygame.draw.line(surface, (r, g, b), (0, y), (width, y))
+
+        scale = width / WINDOW_WIDTH
+        for i in range(0, WINDOW_WIDTH, theme["grid_spacing"]):
+            x = int(i * scale)
+            pygame.draw.line(surface, theme["grid_color"][:3], (x, 0), (x, height))
+        return surface
+
+    @staticmethod
+    def _build_game_over_overlay(size, theme):
+        width, height = size
+        color = theme["overlay_color"][:3]
+        overlay = new_surface(size, pygame.SRCALPHA)
+        for y in range(height):
+            alpha = int(theme["overlay_alpha"] * (y / height))
+            pygame.draw.line(overlay, (*color, alpha), (0, y), (width, y))
+        return overlay.convert_alpha()
+
+class SpriteAtlas:
+    """Pre-rendered sprites for tears, particles, life icons and the welcome screen.
+
+    Built once after the display exists. Every sprite is stored together
+    with the offset of its anchor point, so drawing an entity is a single
+    blit at ``(x * scale - anchor_x, y * scale - anchor_y)``. Sprites are
+    drawn at logical size and resized once when ``scale`` is not 1.
+    """
+
+    def __init__(self, scale=1.0):
+        self.scale = scale
+        self._tears = {}
+        for color in BLUE_TEAR_COLORS:
+            self.tear(color)
+
+        # Red tear pulse phases per (glow layer count, size), see set_glow_layers
+        self._danger_tear_sets = {}
+        self._danger_tears = None
+        self.glow_layers = None
+        self.set_glow_layers(DANGER_GLOW_LAYERS)
+
+        # Sprites per tear kind for the last tear types drawn, see tear_sets
+        self._kind_types = None
+        self._kind_sets = None
+
+        self._particles = {}
+        self._particle_palette = None
+
+        # Welcome screen decorations per alpha, rendered as first used
+        self._floating_tears = {}
+        self._sparkles = {}
+
+        self._life_icons = {
+            True: self._fit(self._render_life_icon(TEARS_MEDIUM, WHITE)),
+            False: self._fit(self._render_life_icon(LOST_LIFE_COLOR, LOST_LIFE_HIGHLIGHT)),
+        }
+
+    def _fit(self, sprite):
+        """Resize an ``(surface, anchor)`` pair to the atlas scale."""
+        if self.scale == 1:
+            return sprite
+        surface, (anchor_x, anchor_y) = sprite
+        size = (max(1, int(surface.get_width() * self.scale)), max(1, int(surface.get_height() * self.scale)))
+        count_surfaces()
+        return (pygame.transform.smoothscale(surface, size),
+                (int(anchor_x * self.scale), int(anchor_y * self.scale)))
+
+    def tear(self, color, size=OBJECT_SIZE):
+        sprite = self._tears.get((color, size))
+        if sprite is None:
+            sprite = self._tears[color, size] = self._fit(self._render_tear(size, color, TEARS_DARK, WHITE))
+        return sprite
+
+    def danger_tears(self, size=OBJECT_SIZE):
+        """Return the red tear pulse phases of ``size`` at the current glow."""
+        key = (self.glow_layers, size)
+        tears = self._danger_tear_sets.get(key)
+        if tears is None:
+            tears = self._danger_tear_sets[key] = []
+            for phase in range(DANGER_PULSE_PHASES):
+                pulse_offset = math.sin(phase * math.tau / DANGER_PULSE_PHASES) * 3
+                tears.append(self._fit(self._render_tear(size + pulse_offset, DANGER_RED, DANGER_DARK_RED,
+                                                         DANGER_LIGHT_RED, glow_layers=self.glow_layers)))
+        return tears
+
+    def set_glow_layers(self, layers):
+        """Switch red tears to sprites with ``layers`` glow rings."""
+        self.glow_layers = layers
+        self._danger_tears = self.danger_tears()
+        self._kind_types = None
+
+    def tear_sets(self, tear_types):
+        """Return ``(pulsing, sprites)`` per tear kind of ``tear_types``.
+
+        Pulsing kinds pick their sprite by pulse phase, the others by the
+        tear's colour index.
+        """
+        if tear_types is not self._kind_types:
+            sets = []
+            for tear_type in tear_types:
+                if tear_type.sprite == "danger":
+                    sets.append((True, self.danger_tears(tear_type.size)))
+                elif tear_type.color is not None:
+                    sets.append((False, [self.tear(tear_type.color, tear_type.size)]))
+                else:
+                    sets.append((False, [self.tear(color, tear_type.size) for color in BLUE_TEAR_COLORS]))
+            self._kind_types = tear_types
+            self._kind_sets = sets
+        return self._kind_sets
+
+    def danger_tear(self, pulse_time):
+        phase = int(pulse_time / math.tau * DANGER_PULSE_PHASES) % DANGER_PULSE_PHASES
+        return self._danger_tears[phase]
+
+    def particle(self, color, size, alpha):
+        """Return the particle sprite for ``alpha`` (0-255), or None if invisible."""
+        level = int(alpha * (PARTICLE_ALPHA_LEVELS - 1) / 255 + 0.5)
+        if level <= 0:
+            return None
+        return self.particle_sprites(color)[size][level]
+
+    def particle_palette(self):
+        """Return the ``particle_sprites`` of every colour in ``PARTICLE_COLORS``, by palette index."""
+        if self._particle_palette is None:
+            self._particle_palette = [self.particle_sprites(color) for color in PARTICLE_COLORS]
+        return self._particle_palette
+
+    def particle_sprites(self, color):
+        """Return ``{size: [sprite per alpha level]}`` for a particle colour."""
+        color = tuple(color[:3])
+        sprites = self._particles.get(color)
+        if sprites is None:
+            sprites = self._render_particles(color)
+            if self.scale != 1:
+                sprites = {size: [None] + [self._fit((sprite, (0, 0)))[0] for sprite in levels[1:]]
+                           for size, levels in sprites.items()}
+            self._particles[color] = sprites
+        return sprites
+
+    @staticmethod
+    def particle_levels(alpha):
+        """Vectorised alpha (0-255) to sprite level quantisation."""
+        return (alpha * (PARTICLE_ALPHA_LEVELS - 1) / 255 + 0.5).astype(np.int32)
+
+    def life_icon(self, active):
+        return self._life_icons[active]
+
+    def floating_tear(self, alpha):
+        sprite = self._floating_tears.get(alpha)
+        if sprite is None:
+            surface = new_surface((20, 25), pygame.SRCALPHA)
+            pygame.draw.ellipse(surface, (*TEARS_MEDIUM[:3], alpha), (3, 7, 14, 16))
+            pygame.draw.polygon(surface, (*TEARS_MEDIUM[:3], alpha), [(10, 3), (6, 10), (14, 10)])
+            sprite = self._floating_tears[alpha] = self._fit((surface.convert_alpha(), (10, 12)))
+        return sprite
+
+    def sparkle(self, alpha):
+        sprite = self._sparkles.get(alpha)
+        if sprite is None:
+            surface = new_surface((6, 6), pygame.SRCALPHA)
+            pygame.draw.circle(surface, (255, 255, 255, alpha), (3, 3), 3)
+            sprite = self._sparkles[alpha] = self._fit((surface.convert_alpha(), (0, 0)))
+        return sprite
+
+    @staticmethod
+    def _render_tear(size, color, secondary_color, highlight_color, glow_layers=0):
+        box = int(size) + 28
+        surface = new_surface((box, box), pygame.SRCALPHA)
+        x = y = box // 2
+
+        if glow_layers:
+            # The glow layers share one colour, so each ring is drawn
+            # once with the alpha of every layer stacked over it.
+            alphas = [50 - (i * 15) for i in range(glow_layers)]
+            for i in range(glow_layers - 1, -1, -1):
+                transparency = 1.0
+                for alpha in alphas[i:]:
+                    transparency *= 1 - alpha / 255
+                glow_size = size + (i * 8)
+                pygame.draw.circle(surface, (*DANGER_RED[:3], int(round(255 * (1 - transparency)))),
+                                   (x, y), int(glow_size // 2))
+
+        teardrop_rect = pygame.Rect(int(x - size // 4), y, size // 2, size // 2)
+        pygame.draw.ellipse(surface, color, teardrop_rect)
+
+        gradient_rect = pygame.Rect(int(x - size // 6), y + 2, size // 3, size // 3)
+        pygame.draw.ellipse(surface, secondary_color, gradient_rect)
+
+        point_size = int(size // 3)
+        points = [
+            (x, y - point_size // 2),
+            (x - point_size // 4, y + point_size // 4),
+            (x + point_size // 4, y + point_size // 4)
+        ]
+        pygame.draw.polygon(surface, color, points)
+
+        # Smooth connection
+        pygame.draw.circle(surface, color, (x, y + point_size // 4), point_size // 4)
+
+        highlight_size = max(3, int(size // 8))
+        pygame.draw.ellipse(surface, highlight_color,
+                            (x - highlight_size, y + 2, highlight_size * 2, highlight_size * 3))
+        pygame.draw.circle(surface, highlight_color, (x - 2, y + 3), max(1, highlight_size // 2))
+        return surface.convert_alpha(), (x, y)
+
+    @staticmethod
+    def _render_particles(color):
+        sprites = {}
+        for size in range(PARTICLE_MIN_SIZE, PARTICLE_MAX_SIZE + 1):
+            levels = [None]
+            for level in range(1, PARTICLE_ALPHA_LEVELS):
+                alpha = int(255 * level / (PARTICLE_ALPHA_LEVELS - 1))
+                surface = new_surface((size * 2, size * 2), pygame.SRCALPHA)
+                pygame.draw.circle(surface, (*color[:3], alpha), (size, size), size)
+                levels.append(surface.convert_alpha())
+            sprites[size] = levels
+        return sprites
+
+    @staticmethod
+    def _render_life_icon(color, highlight):
+        surface = new_surface((32, 32), pygame.SRCALPHA)
+        x = y = 12
+
+        # Opaque on purpose: alpha in draw colours is ignored on the display surface
+        pygame.draw.circle(surface, BLACK, (x + 1, y + 4), 10)
+        pygame.draw.circle(surface, color, (x, y + 3), 10)
+
+        mini_points = [
+            (x, y - 7),
+            (x - 5, y + 3),
+            (x + 5, y + 3)
+        ]
+        pygame.draw.polygon(surface, color, mini_points)
+
+        pygame.draw.circle(surface, highlight, (x - 3, y + 1), 3)
+        pygame.draw.circle(surface, highlight, (x - 2, y), 1)
+        return surface.convert_alpha(), (x, y)
+
+class TextCache:
+    """LRU cache of rendered text surfaces keyed by (font, size, text, colour).
+
+    Fonts are loaded once per (name, size) and kept for the lifetime of
+    the cache; pulsing text rounds its size to whole points so it draws
+    from a small set of pre-sized fonts. Sizes are logical and opened at
+    ``size * scale`` points.
+    """
+
+    def __init__(self, capacity=TEXT_CACHE_SIZE, scale=1.0):
+        self.capacity = capacity
+        self.scale = scale
+        self._fonts = {}
+        self._surfaces = OrderedDict()
+
+    def font(self, size, name=None):
+        key = (name, size)
+        font = self._fonts.get(key)
+        if font is None:
+            font = self._fonts[key] = pygame.font.Font(name, max(1, int(size * self.scale)))
+        return font
+
+    def render(self, text, size, color, name=None, antialias=True):
+        key = (name, size, text, tuple(color), antialias)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self._surfaces.move_to_end(key)
+            return surface
+
+        surface = self.font(size, name).render(text, antialias, color)
+        count_surfaces()
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.capacity:
+            self._surfaces.popitem(last=False)
+        return surface
+
+class DirtyRectTracker:
+    """Pushes only the screen regions that changed since the last frame.
+
+    Each frame starts by restoring the backdrop under everything drawn in
+    the previous frame, then records the rects drawn this frame. The
+    display is updated with the union of both lists, or with a full flip
+    when that area is a large share of the screen or the screen contents
+    were invalidated (for example by a state change).
+    """
+
+    def __init__(self, full_threshold=DIRTY_RECT_FULL_THRESHOLD):
+        self.full_threshold = full_threshold
+        self.previous = []
+        self.current = []
+        self.valid = False
+
+    def invalidate(self):
+        self.valid = False
+
+    def begin(self, screen, backdrop, redrawn=()):
+        """Restore the backdrop under last frame's rects and ``redrawn``.
+
+        ``redrawn`` covers things drawn every frame but only pushed when
+        their content changes, such as the HUD.
+        """
+        if self.valid:
+            for rect in self.previous:
+                screen.blit(backdrop, rect, rect)
+            for rect in redrawn:
+                screen.blit(backdrop, rect, rect)
+        else:
+            screen.blit(backdrop, (0, 0))
+        self.current = []
+
+    def add(self, rects):
+        self.current.extend(rects)
+
+    def present(self, screen):
+        dirty = self.previous + self.current
+        self.previous = self.current
+        if self.valid:
+            area = sum(rect.width * rect.height for rect in dirty)
+            if area < self.full_threshold * screen.get_width() * screen.get_height():
+                pygame.display.update(dirty)
+                return
+        pygame.display.flip()
+        self.valid = True
+
+def scale_rect(rect, scale):
+    """Scale ``(x, y, width, height)``, truncating like ``pygame.Rect`` does."""
+    x, y, width, height = rect
+    return pygame.Rect(int(x * scale), int(y * scale), int(width * scale), int(height * scale))
+
+class Viewport:
+    """The display plus the internal framebuffer the scene is drawn into.
+
+    Game code works in logical WINDOW_WIDTH x WINDOW_HEIGHT units and
+    multiplies by ``scale`` when drawing into ``framebuffer``. When the
+    framebuffer and display sizes differ, ``present`` scales the frame
+    once onto the display, letterboxed to keep the aspect ratio, with
+    nearest-neighbour or smooth filtering. Otherwise the framebuffer is
+    the display surface itself and nothing is copied.
+    """
+
+    def __init__(self, render_size=None, window_size=None, fullscreen=False, smooth=False):
+        render_width, render_height = render_size or (WINDOW_WIDTH, WINDOW_HEIGHT)
+        self.scale = min(render_width / WINDOW_WIDTH, render_height / WINDOW_HEIGHT)
+        self.render_size = (round(WINDOW_WIDTH * self.scale), round(WINDOW_HEIGHT * self.scale))
+        self.smooth = smooth
+
+        if fullscreen:
+            self.display = pygame.display.set_mode(window_size or (0, 0), pygame.FULLSCREEN)
+        else:
+            self.display = pygame.display.set_mode(window_size or self.render_size)
+
+        display_width, display_height = self.display.get_size()
+        self.scaled = self.display.get_size() != self.render_size
+        if self.scaled:
+            self.framebuffer = new_surface(self.render_size).convert()
+            fit = min(display_width / self.render_size[0], display_height / self.render_size[1])
+            self.target = pygame.Rect(0, 0, round(self.render_size[0] * fit), round(self.render_size[1] * fit))
+            self.target.center = (display_width // 2, display_height // 2)
+            self.display.fill(BLACK)
+            self._target_surface = self.display.subsurface(self.target)
+        else:
+            self.framebuffer = self.display
+            self.target = self.display.get_rect()
+
+    def px(self, value):
+        """Logical length or coordinate to framebuffer pixels."""
+        return int(value * self.scale)
+
+    def point(self, x, y):
+        return (int(x * self.scale), int(y * self.scale))
+
+    def rect(self, rect):
+        return scale_rect(rect, self.scale)
+
+    def to_logical(self, pos):
+        """Display pixel position (e.g. the mouse) to logical coordinates."""
+        fit = self.target.width / WINDOW_WIDTH
+        return (int((pos[0] - self.target.x) / fit), int((pos[1] - self.target.y) / fit))
+
+    def present(self):
+        if self.scaled:
+            if self.smooth:
+                pygame.transform.smoothscale(self.framebuffer, self.target.size, self._target_surface)
+            else:
+                pygame.transform.scale(self.framebuffer, self.target.size, self._target_surface)
+        pygame.display.flip()
+
 class Button:
     def __init__(self, x, y, width, height, text, color, text_color):
         self.rect = pygame.Rect(x, y, width, height)
         self.text = text
         self.color = color
         self.text_color = text_color
-        self.font = pygame.font.Font(None, 36)
         self.hovered = False
-        self.pulse_time = 0
 
-    def draw(self, screen):
-        self.pulse_time += 0.1
-        pulse_offset = math.sin(self.pulse_time) * 3 if self.hovered else 0
+        self.gradient_surface = new_surface((self.rect.width, self.rect.height // 2), pygame.SRCALPHA)
+        for i in range(self.rect.height // 2):
+            alpha = int(50 * (1 - i / (self.rect.height // 2)))
+            pygame.draw.line(self.gradient_surface, (*WHITE[:3], alpha), (0, i), (self.rect.width, i))
+
+    def draw(self, screen, text_cache, scale=1.0, clock=None):
+        pulse_offset = clock.wave(BUTTON_PULSE_FREQUENCY) * 3 if self.hovered and clock is not None else 0
+        radius = int(10 * scale)
         
-        shadow_rect = pygame.Rect(self.rect.x + 4, self.rect.y + 4, self.rect.width, self.rect.height)
-        pygame.draw.rect(screen, (0, 0, 0, 100), shadow_rect, border_radius=10)
+        shadow_rect = scale_rect((self.rect.x + 4, self.rect.y + 4, self.rect.width, self.rect.height), scale)
+        pygame.draw.rect(screen, (0, 0, 0, 100), shadow_rect, border_radius=radius)
         
-        button_rect = pygame.Rect(self.rect.x, self.rect.y - pulse_offset, self.rect.width, self.rect.height)
+        button_rect = scale_rect((self.rect.x, self.rect.y - pulse_offset, self.rect.width, self.rect.height), scale)
         current_color = TEARS_MEDIUM if self.hovered else self.color
-        pygame.draw.rect(screen, current_color, button_rect, border_radius=10)
+        pygame.draw.rect(screen, current_color, button_rect, border_radius=radius)
         
-        gradient_surface = pygame.Surface((self.rect.width, self.rect.height // 2), pygame.SRCALPHA)
-        for i in range(self.rect.height // 2):
-            alpha = int(50 * (1 - i / (self.rect.height // 2)))
-            pygame.draw.line(gradient_surface, (*WHITE[:3], alpha), (0, i), (self.rect.width, i))
-        screen.blit(gradient_surface, (button_rect.x, button_rect.y))
+        if self.gradient_surface.get_width() != button_rect.width:
+            self.gradient_surface = pygame.transform.smoothscale(
+                self.gradient_surface, (button_rect.width, max(1, int(self.rect.height // 2 * scale))))
+            count_surfaces()
+        screen.blit(self.gradient_surface, (button_rect.x, button_rect.y))
         
-        pygame.draw.rect(screen, TEARS_DARK, button_rect, 3, border_radius=10)
+        pygame.draw.rect(screen, TEARS_DARK, button_rect, max(1, int(3 * scale)), border_radius=radius)
         
-        text_surface = self.font.render(self.text, True, self.text_color)
+        text_surface = text_cache.render(self.text, BUTTON_FONT_SIZE, self.text_color)
         text_rect = text_surface.get_rect(center=button_rect.center)
         screen.blit(text_surface, text_rect)
 
@@ -117,136 +874,114 @@ class Button:
         self.hovered = self.rect.collidepoint(pos)
 
 class Bucket:
-    def __init__(self, x, y):
+    def __init__(self, x, y, palette=PLAYER_PALETTES[0]):
         self.x = x
         self.y = y
         self.width = BUCKET_WIDTH
         self.height = BUCKET_HEIGHT
-        self.speed = BUCKET_SPEED
-
-    def move_left(self):
-        if self.x > 0:
-            self.x -= self.speed
-
-    def move_right(self):
-        if self.x < WINDOW_WIDTH - self.width:
-            self.x += self.speed
-
-    def draw(self, screen):
-        shadow_points = [
-            (self.x + 12, self.y + 2),
-            (self.x + self.width - 8, self.y + 2),
-            (self.x + self.width + 2, self.y + self.height + 2),
-            (self.x + 2, self.y + self.height + 2)
-        ]
+        self.dark, self.medium, self.light = palette
+
+    def draw(self, screen, scale=1.0):
+        x, y, width, height = self.x, self.y, self.width, self.height
+
+        def points(*offsets):
+            return [((x + dx) * scale, (y + dy) * scale) for dx, dy in offsets]
+
+        shadow_points = points((12, 2), (width - 8, 2), (width + 2, height + 2), (2, height + 2))
         pygame.draw.polygon(screen, (0, 0, 0, 80), shadow_points)
         
-        bucket_points = [
-            (self.x + 10, self.y),
-            (self.x + self.width - 10, self.y),
-            (self.x + self.width, self.y + self.height),
-            (self.x, self.y + self.height)
-        ]
-        pygame.draw.polygon(screen, TEARS_DARK, bucket_points)
+        bucket_points = points((10, 0), (width - 10, 0), (width, height), (0, height))
+        pygame.draw.polygon(screen, self.dark, bucket_points)
         
-        interior_points = [
-            (self.x + 12, self.y + 3),
-            (self.x + self.width - 12, self.y + 3),
-            (self.x + self.width - 3, self.y + self.height - 3),
-            (self.x + 3, self.y + self.height - 3)
-        ]
-        pygame.draw.polygon(screen, TEARS_MEDIUM, interior_points)
+        interior_points = points((12, 3), (width - 12, 3), (width - 3, height - 3), (3, height - 3))
+        pygame.draw.polygon(screen, self.medium, interior_points)
         
-        shine_points = [
-            (self.x + 15, self.y + 5),
-            (self.x + self.width - 15, self.y + 5),
-            (self.x + self.width - 20, self.y + 15),
-            (self.x + 20, self.y + 15)
-        ]
-        pygame.draw.polygon(screen, TEARS_LIGHT, shine_points)
+        shine_points = points((15, 5), (width - 15, 5), (width - 20, 15), (20, 15))
+        pygame.draw.polygon(screen, self.light, shine_points)
         
-        self._draw_handle(screen, self.x - 8, self.y + 8)
-        self._draw_handle(screen, self.x + self.width - 5, self.y + 8)
+        self._draw_handle(screen, x - 8, y + 8, scale)
+        self._draw_handle(screen, x + width - 5, y + 8, scale)
         
-        pygame.draw.line(screen, WHITE, (self.x + 10, self.y), (self.x + self.width - 10, self.y), 4)
-        pygame.draw.line(screen, TEARS_LIGHT, (self.x + 12, self.y + 1), (self.x + self.width - 12, self.y + 1), 2)
+        pygame.draw.line(screen, WHITE, *points((10, 0), (width - 10, 0)), max(1, int(4 * scale)))
+        pygame.draw.line(screen, self.light, *points((12, 1), (width - 12, 1)), max(1, int(2 * scale)))
 
-    def _draw_handle(self, screen, x, y):
+    def _draw_handle(self, screen, x, y, scale=1.0):
 
-        handle_rect = pygame.Rect(x, y, 13, 8)
-        pygame.draw.rect(screen, TEARS_DARK, handle_rect, border_radius=3)
-        pygame.draw.rect(screen, TEARS_MEDIUM, (x + 1, y + 1, 11, 6), border_radius=2)
-        pygame.draw.line(screen, TEARS_LIGHT, (x + 2, y + 2), (x + 10, y + 2), 1)
+        handle_rect = scale_rect((x, y, 13, 8), scale)
+        pygame.draw.rect(screen, self.dark, handle_rect, border_radius=int(3 * scale))
+        pygame.draw.rect(screen, self.medium, scale_rect((x + 1, y + 1, 11, 6), scale),
+                         border_radius=int(2 * scale))
+        pygame.draw.line(screen, self.light, ((x + 2) * scale, (y + 2) * scale),
+                         ((x + 10) * scale, (y + 2) * scale), max(1, int(scale)))
 
     def get_rect(self):
         return pygame.Rect(self.x, self.y, self.width, self.height)
 
+    def get_box(self):
+        return (self.x, self.y, self.width, self.height)
+
+    def get_bounds(self):
+        """Screen area touched by ``draw``, handles and shadow included."""
+        return pygame.Rect(int(self.x) - 9, self.y - 1, self.width + 19, self.height + 5)
+
 class FallingObject:
-    def __init__(self, x, y, is_dangerous=False):
-        self.x = x
-        self.y = y
-        self.size = OBJECT_SIZE
-        self.speed = OBJECT_SPEED
-        self.is_dangerous = is_dangerous
-        self.rotation = 0
-        self.pulse_time = 0
-        
-        if is_dangerous:
-            self.color = DANGER_RED
-            self.secondary_color = DANGER_DARK_RED
-            self.highlight_color = DANGER_LIGHT_RED
-            self.speed *= 1.2  
+    """View of one falling tear slot in an EntityPool.
+
+    Views are only valid until the pool is next compacted; use ``spawn``
+    to create tears and ``draw_all`` to draw them.
+    """
+
+    __slots__ = ("pool", "index", "tear_types")
+
+    def __init__(self, pool, index, tear_types=CLASSIC_TEAR_TYPES):
+        self.pool = pool
+        self.index = index
+        self.tear_types = tear_types
+
+    @classmethod
+    def spawn(cls, pool, x, y, is_dangerous=False, rng=random, config=None):
+        return cls(pool, spawn_tear(pool, x, y, is_dangerous, rng, config or SimConfig()))
+
+    @property
+    def x(self):
+        return float(self.pool.x[self.index])
+
+    @property
+    def y(self):
+        return float(self.pool.y[self.index])
+
+    @property
+    def size(self):
+        return int(self.pool.size[self.index])
+
+    @property
+    def speed(self):
+        return float(self.pool.vy[self.index])
+
+    @property
+    def tear_type(self):
+        return self.tear_types[self.pool.kind[self.index]]
+
+    @property
+    def is_dangerous(self):
+        return self.tear_type.damage > 0
+
+    @property
+    def color(self):
+        tear_type = self.tear_type
+        if tear_type.sprite == "danger":
+            return DANGER_RED
+        if tear_type.color is not None:
+            return tear_type.color
+        return BLUE_TEAR_COLORS[self.pool.color[self.index]]
+
+    def draw(self, screen, atlas, pulse_time=0.0):
+        tear_type = self.tear_type
+        if tear_type.sprite == "danger":
+            sprite, (anchor_x, anchor_y) = atlas.danger_tear(pulse_time)
         else:
-            self.color = random.choice([TEARS_MEDIUM, SKY_BLUE, POWDER_BLUE, OCEAN_BLUE])
-            self.secondary_color = TEARS_DARK
-            self.highlight_color = WHITE
-
-    def update(self):
-        self.y += self.speed
-        self.rotation += 2
-        self.pulse_time += 0.2
-
-    def draw(self, screen):
-        pulse_offset = 0
-        if self.is_dangerous:
-            pulse_offset = math.sin(self.pulse_time) * 3
-        
-        current_size = self.size + pulse_offset
-        
-        if self.is_dangerous:
-            for i in range(3):
-                glow_size = current_size + (i * 8)
-                glow_alpha = 50 - (i * 15)
-                glow_surface = pygame.Surface((glow_size, glow_size), pygame.SRCALPHA)
-                pygame.draw.circle(glow_surface, (*DANGER_RED[:3], glow_alpha), 
-                                 (glow_size // 2, glow_size // 2), glow_size // 2)
-                screen.blit(glow_surface, (int(self.x - glow_size // 2), int(self.y - glow_size // 2)))
-        
-        teardrop_rect = pygame.Rect(int(self.x - current_size // 4), int(self.y), 
-                                  current_size // 2, current_size // 2)
-        pygame.draw.ellipse(screen, self.color, teardrop_rect)
-        
-        gradient_rect = pygame.Rect(int(self.x - current_size // 6), int(self.y + 2), 
-                                  current_size // 3, current_size // 3)
-        pygame.draw.ellipse(screen, self.secondary_color, gradient_rect)
-        
-        point_size = int(current_size // 3)
-        points = [
-            (int(self.x), int(self.y - point_size // 2)),
-            (int(self.x - point_size // 4), int(self.y + point_size // 4)),
-            (int(self.x + point_size // 4), int(self.y + point_size // 4))
-        ]
-        pygame.draw.polygon(screen, self.color, points)
-        
-        # Smooth connection
-        pygame.draw.circle(screen, self.color, (int(self.x), int(self.y + point_size // 4)), point_size // 4)
-        
-        highlight_size = max(3, int(current_size // 8))
-        pygame.draw.ellipse(screen, self.highlight_color, 
-                          (int(self.x - highlight_size), int(self.y + 2), 
-                           highlight_size * 2, highlight_size * 3))
-        pygame.draw.circle(screen, self.highlight_color, 
-                         (int(self.x - 2), int(self.y + 3)), max(1, highlight_size // 2))
+            sprite, (anchor_x, anchor_y) = atlas.tear(self.color, tear_type.size)
+        screen.blit(sprite, (int(self.x * atlas.scale) - anchor_x, int(self.y * atlas.scale) - anchor_y))
 
     def get_rect(self):
         return pygame.Rect(self.x - self.size // 2, self.y - self.size // 2, self.size, self.size)
@@ -254,158 +989,300 @@ class FallingObject:
     def is_off_screen(self):
         return self.y > WINDOW_HEIGHT + self.size
 
+    @staticmethod
+    def draw_all(pool, screen, atlas, alpha=1.0, doreturn=False, tear_types=CLASSIC_TEAR_TYPES, pulse=0):
+        """Draw every live tear in ``pool`` with one batched blit call.
+
+        ``alpha`` interpolates between each tear's previous and current
+        simulated position; ``tear_types`` are the simulation's, indexed by
+        each tear's kind. Pulsing tears all show pulse phase ``pulse``.
+        With ``doreturn`` the list of drawn rects is returned.
+        """
+        n = pool.count
+        if not n:
+            return []
+        xs = (pool.px[:n] + (pool.x[:n] - pool.px[:n]) * alpha) * atlas.scale
+        ys = (pool.py[:n] + (pool.y[:n] - pool.py[:n]) * alpha) * atlas.scale
+        sets = atlas.tear_sets(tear_types)
+        blits = []
+        for kind, color, x, y in zip(pool.kind[:n].tolist(), pool.color[:n].tolist(),
+                                     xs.astype(np.int32).tolist(), ys.astype(np.int32).tolist()):
+            pulsing, sprites = sets[kind]
+            if pulsing:
+                sprite, (anchor_x, anchor_y) = sprites[pulse]
+            else:
+                sprite, (anchor_x, anchor_y) = sprites[color]
+            blits.append((sprite, (x - anchor_x, y - anchor_y)))
+        return screen.blits(blits, doreturn=doreturn)
+
+class RenderState:
+    """What the playing screen draws, captured after a simulation tick.
+
+    Captured with ``copy`` (by the simulation thread) the pools are
+    private copies and the state is never modified after it is
+    published; without it the pools are the live ones.
+    """
+
+    __slots__ = ("time", "tick", "tears", "tear_types", "particles", "player_x", "player_prev_x", "player_score",
+                 "player_lives")
+
+    def __init__(self, game, copy=True):
+        sim = game.sim
+        self.time = time.perf_counter()
+        self.tick = sim.tick
+        self.tears = sim.tears.copy() if copy else sim.tears
+        self.tear_types = sim.tear_types
+        self.particles = game.particles.pool.copy() if copy else game.particles.pool
+        self.player_x = tuple(sim.player_x)
+        self.player_prev_x = tuple(sim.player_prev_x)
+        self.player_score = tuple(sim.player_score)
+        self.player_lives = tuple(sim.player_lives)
+
+class SimulationThread:
+    """Input sampling and simulation ticks on their own thread.
+
+    Every tick publishes a fresh RenderState by swapping ``latest``, a
+    single reference assignment, so the render loop never waits on the
+    simulation; it draws the newest state interpolated from that state's
+    previous tick. Session changes made by the main thread (start,
+    restart) hold ``game.sim_lock`` so they never interleave with a tick.
+    """
+
+    def __init__(self, game):
+        self.game = game
+        self.latest = None
+        self.running = False
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self.running = True
+            self._thread = threading.Thread(target=self._run, name="simulation", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self.running = False
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def publish(self):
+        self.latest = RenderState(self.game)
+
+    def _run(self):
+        game = self.game
+        next_tick = time.perf_counter()
+        while self.running:
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+                continue
+            with game.sim_lock:
+                if game.state == PLAYING:
+                    game.update_game()
+                    game.audio.flush()
+                if game.state != WELCOME_SCREEN:
+                    game.particles.update()
+                    self.publish()
+            next_tick += TICK_SECONDS
+            if time.perf_counter() - next_tick > MAX_TICKS_PER_FRAME * TICK_SECONDS:
+                # Far behind (e.g. the machine was suspended): skip ahead instead of catching up
+                next_tick = time.perf_counter()
+
 class Game:
-    def __init__(self):
-        self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    def __init__(self, seed=None, record_dir=None, replay=None, replay_seek=0, profile=False, profile_out=None,
+                 dirty_rects=False, render_size=None, window_size=None, fullscreen=False, smooth=False,
+                 quality="auto", threaded=False, waves=DEFAULT_WAVES, players=1, serve=None, remote_players=0,
+                 stats=None, late_latch=False, latency=False, latency_log=None):
+        # The scene is drawn into self.screen, the viewport's internal framebuffer
+        self.viewport = Viewport(render_size, window_size, fullscreen, smooth)
+        self.screen = self.viewport.framebuffer
+        self.scale = self.viewport.scale
         pygame.display.set_caption("Tears PyGame- Catch the Falling Tears!")
         self.clock = pygame.time.Clock()
+        self.frame_start = time.perf_counter()
+        self.busy_ms = 0.0
         self.state = WELCOME_SCREEN
 
-        self.title_font = pygame.font.Font(None, 84)
-        self.subtitle_font = pygame.font.Font(None, 42)
-        self.score_font = pygame.font.Font(None, 48)
-        self.text_font = pygame.font.Font(None, 28)
-
-        self.bucket = Bucket(WINDOW_WIDTH // 2 - BUCKET_WIDTH // 2, WINDOW_HEIGHT - 60)
-        self.falling_objects = []
-        self.particles = []
-
-        self.score = 0
-        self.lives = MAX_LIVES
-        self.spawn_timer = 0
-        self.animation_time = 0
+        self.text_cache = TextCache(scale=self.scale)
+
+        self.atlas = SpriteAtlas(self.scale)
+        self.theme = GAME_THEME
+        self.backdrops = BackdropCache()
+        self.backgrounds = {}
+
+        # Optional simulation thread; sim_lock guards session changes against its ticks
+        self.sim_lock = threading.Lock()
+        self.sim_thread = None
+        self.threaded = threaded
+
+        # Particles and their emitters; quality levels set how many may live at once
+        self.particles = ParticleSystem(MAX_PARTICLES, gravity=PARTICLE_GRAVITY)
+        self.particle_splat = ParticleSplat()
+        self.trails = None
+
+        # Quality levels: "auto" adapts to the frame rate, a level name pins it
+        adaptive = quality == "auto"
+        self.quality = QualityGovernor(FPS, 0 if adaptive else QUALITY_NAMES.index(quality), adaptive)
+        self.apply_quality()
+
+        self.first_seed = seed
+        if replay is not None:
+            players = replay.config.players
+        # Spawns follow the wave file; without one, the original random spawner
+        self.sim = Simulation(seed, SimConfig(waves=waves, players=players))
+        self.players = players
+        self.buckets = [Bucket(self.sim.player_x[player], self.sim.config.bucket_y, PLAYER_PALETTES[player])
+                        for player in range(players)]
+
+        self.animation = AnimationClock()
+        self.interpolation = 1.0
+
+        # Optional dirty-rect presentation for the PLAYING screen
+        # Only when the framebuffer is the display, scaled frames are always pushed whole
+        self.dirty_rects = DirtyRectTracker() if dirty_rects and not self.viewport.scaled else None
+        self.dirty_frame = False
+        self.hud_state = None
+        self.hud_rects = []
+        self.hud_score_rect = None
+        self.hud_panels = {}
 
         self.start_button = Button(WINDOW_WIDTH // 2 - 120, WINDOW_HEIGHT // 2 + 120, 240, 70, "START GAME", TEARS_LIGHT, WHITE)
         self.restart_button = Button(WINDOW_WIDTH // 2 - 120, WINDOW_HEIGHT // 2 + 50, 240, 70, "PLAY AGAIN", TEARS_LIGHT, WHITE)
         self.quit_button = Button(WINDOW_WIDTH // 2 - 120, WINDOW_HEIGHT // 2 + 140, 240, 70, "QUIT", TEARS_DARK, WHITE)
 
+        # Sounds and music load in the background while the welcome screen animates
+        self.audio = VoicePool()
+        self.assets = AssetManager(on_ready=self.register_sound_cues)
+        self.assets.start()
         self.music_started = False
-        
-        # Sound effects
-        self.tear_sound = None
-        self.load_sounds()
-
-    def load_sounds(self):
-        """Load sound effects"""
-        try:
-            base_path = os.path.dirname(os.path.abspath(__file__))
-            tear_sound_path = os.path.join(base_path, "tear-drop-sound.mp3")
-            self.tear_sound = pygame.mixer.Sound(tear_sound_path)
-            self.tear_sound.set_volume(0.9) 
-            print("Tear sound effect loaded successfully.")
-        except Exception as e:
-            print(f"Error loading tear sound effect: {e}")
-            self.tear_sound = None
-
-    def play_tear_sound(self):
-        """Play the tear catch sound effect"""
-        if self.tear_sound:
-            try:
-                self.tear_sound.play()
-            except Exception as e:
-                print(f"Error playing tear sound: {e}")
+        self.first_frame_seconds = None
+
+        # Frame profiler (F3 toggles the overlay)
+        self.profiler = FrameProfiler()
+        self.profile_out = profile_out
+        if profile or profile_out:
+            self.profiler.enable(self)
+
+        if threaded:
+            self.sim_thread = SimulationThread(self)
+
+        # Optional state streaming; the last remote_players slots are played over the network
+        self.server = None
+        self.remote_players = remote_players if serve else 0
+        if serve:
+            remote_slots = range(players - self.remote_players, players)
+            self.server = StateServer(*serve, config=self.sim.config.overrides(), remote_slots=remote_slots)
+            self.server.start()
+
+        # Event-driven input for the local players; late latching reads it again just before drawing
+        local_players = players - self.remote_players
+        self.controls = Controls(SOLO_KEYS if local_players == 1 else PLAYER_KEYS[:local_players],
+                                 self.sim.config, self.viewport)
+        self.late_latch = late_latch
+        self.events = []
+        self.input_time = None
+        self.drawn_tick = 0
+        mode = ["threaded" if threaded else "fixed-step"] + (["late-latch"] if late_latch else [])
+        self.latency = LatencyMeter("+".join(mode), latency_log)
+        self.report_latency = latency or bool(latency_log)
+
+        # Optional high scores and session telemetry, saved by the store's writer thread
+        self.stats = stats
+        self.telemetry = None
+        self.new_high_score = False
+        if stats is not None:
+            stats.start()
+
+        # Replay recording and playback
+        self.record_dir = record_dir
+        self.recorder = None
+        self.replay = replay
+        self.replay_seek = replay_seek
+        self.replay_inputs = None
+        if replay is not None:
+            self.state = PLAYING
+            self.reset_game()
+
+    def register_sound_cues(self, assets):
+        for cue, (sound, priority) in SOUND_CUES.items():
+            if sound in assets.variants:
+                self.audio.add_cue(cue, assets.variants[sound], priority)
 
     def create_particles(self, x, y, color, count=8):
-        for _ in range(count):
-            velocity_x = random.uniform(-3, 3)
-            velocity_y = random.uniform(-5, -1)
-            self.particles.append(Particle(x, y, color, velocity_x, velocity_y))
-
-    def load_music(self):
-        try:
-            base_path = os.path.dirname(os.path.abspath(__file__))
-            music_path = os.path.join(base_path, "bgmusic.mp3")
-            pygame.mixer.music.load(music_path)
-            pygame.mixer.music.set_volume(0.3)
-            pygame.mixer.music.play(-1)
-            print("Background music loaded and playing.")
-        except Exception as e:
-            print(f"Error loading music: {e}")
+        self.particles.burst(x, y, Particle.color_index(color), count, self.quality.settings["particle_life"])
+
+    def add_trails(self, tears):
+        """Shed particles behind every tear drawn with the danger sprite."""
+        kinds = [kind for kind, tear_type in enumerate(self.sim.tear_types) if tear_type.sprite == "danger"]
+        self.trails = self.particles.add(TrailEmitter(tears, kinds, Particle.color_index(DANGER_LIGHT_RED),
+                                                      self.quality.settings["trail_rate"], TRAIL_LIFE))
+
+    def apply_quality(self):
+        """Switch sprites and the welcome background to the current quality level."""
+        settings = self.quality.settings
+        self.particles.limit = settings["particle_cap"]
+        if self.trails is not None:
+            self.trails.rate = settings["trail_rate"]
+        self.atlas.set_glow_layers(settings["glow_layers"])
+        pixel_size = settings["background_pixel"]
+        if pixel_size not in self.backgrounds:
+            ring_frames = BACKGROUND_RING_FRAMES * BACKGROUND_PIXEL_SIZE // pixel_size
+            # Built in the background so neither startup nor a quality drop stalls a frame
+            self.backgrounds[pixel_size] = AnimatedBackground(WINDOW_WIDTH, WINDOW_HEIGHT, pixel_size, ring_frames,
+                                                              async_ring=True)
+        self.background = self.backgrounds[pixel_size]
 
     def draw_animated_background(self):
-        self.animation_time += 0.02
-
-        pixel_size = 8  
-
-        DARK_BLUE = (0, 51, 102)     
-        MID_BLUE = (30, 144, 255)  
-        PALE_BLUE = (173, 216, 230)   
-
-        for y in range(0, WINDOW_HEIGHT, pixel_size):
-            for x in range(0, WINDOW_WIDTH, pixel_size):
-                wave_offset = math.sin(self.animation_time + y * 0.06 + x * 0.02) * 16
-                color_ratio = (y + wave_offset) / WINDOW_HEIGHT
-                color_ratio = max(0, min(1, color_ratio))
-
-                # Color blending
-                if color_ratio < 0.5:
-                    ratio = color_ratio / 0.5
-                    r = int(DARK_BLUE[0] * (1 - ratio) + MID_BLUE[0] * ratio)
-                    g = int(DARK_BLUE[1] * (1 - ratio) + MID_BLUE[1] * ratio)
-                    b = int(DARK_BLUE[2] * (1 - ratio) + MID_BLUE[2] * ratio)
-                else:
-                    ratio = (color_ratio - 0.5) / 0.5
-                    r = int(MID_BLUE[0] * (1 - ratio) + PALE_BLUE[0] * ratio)
-                    g = int(MID_BLUE[1] * (1 - ratio) + PALE_BLUE[1] * ratio)
-                    b = int(MID_BLUE[2] * (1 - ratio) + PALE_BLUE[2] * ratio)
-
-                pygame.draw.rect(self.screen, (r, g, b), (x, y, pixel_size, pixel_size))
-
+        self.background.draw(self.screen, self.animation.time)
 
     def draw_floating_tears(self):
-
-        for i in range(8):
-            x = 60 + i * 100 + math.sin(self.animation_time * 0.5 + i) * 20
-            y = 200 + math.cos(self.animation_time * 0.3 + i * 0.7) * 60
-            
-            alpha = 30 + math.sin(self.animation_time + i) * 20
-            small_surface = pygame.Surface((20, 25), pygame.SRCALPHA)
-            
-            pygame.draw.ellipse(small_surface, (*TEARS_MEDIUM[:3], int(alpha)), (3, 7, 14, 16))
-            points = [(10, 3), (6, 10), (14, 10)]
-            pygame.draw.polygon(small_surface, (*TEARS_MEDIUM[:3], int(alpha)), points)
-            
-            self.screen.blit(small_surface, (int(x - 10), int(y - 12)))
-
-        for i in range(15):
-            x = (i * 70 + int(math.sin(self.animation_time + i) * 20)) % WINDOW_WIDTH
-            y = (i * 40 + int(math.cos(self.animation_time * 1.2 + i) * 15)) % WINDOW_HEIGHT
-            alpha = 40 + int(20 * math.sin(self.animation_time + i))
-            glow_color = (255, 255, 255, alpha)
-            
-            glow_surface = pygame.Surface((6, 6), pygame.SRCALPHA)
-            pygame.draw.circle(glow_surface, glow_color, (3, 3), 3)
-            self.screen.blit(glow_surface, (x, y))
-
+        settings = self.quality.settings
+        t = self.animation.time
+
+        i = np.arange(settings["floating_tears"])
+        xs = 60 + i * 100 + sin_array(t * 0.5 + i) * 20
+        ys = 200 + cos_array(t * 0.3 + i * 0.7) * 60
+        alphas = 30 + sin_array(t + i) * 20
+        for x, y, alpha in zip(xs.tolist(), ys.tolist(), alphas.tolist()):
+            sprite, (anchor_x, anchor_y) = self.atlas.floating_tear(int(alpha))
+            self.screen.blit(sprite, (int(x * self.scale) - anchor_x, int(y * self.scale) - anchor_y))
+
+        i = np.arange(settings["sparkles"])
+        xs = (i * 70 + (sin_array(t + i) * 20).astype(np.int64)) % WINDOW_WIDTH
+        ys = (i * 40 + (cos_array(t * 1.2 + i) * 15).astype(np.int64)) % WINDOW_HEIGHT
+        alphas = 40 + (sin_array(t + i) * 20).astype(np.int64)
+        for x, y, alpha in zip(xs.tolist(), ys.tolist(), alphas.tolist()):
+            sprite, _ = self.atlas.sparkle(alpha)
+            self.screen.blit(sprite, self.viewport.point(x, y))
 
     def draw_welcome_screen(self):
         self.draw_animated_background()
         self.draw_floating_tears()
         
         title_text = "TEARS PYGAME"
+        title_shadow = self.text_cache.render(title_text, TITLE_FONT_SIZE, TEARS_DARK)
         for offset in range(5, 0, -1):
-            alpha = 255 - (offset * 40)
-            title_surface = self.title_font.render(title_text, True, (*TEARS_DARK[:3], alpha))
-            title_rect = title_surface.get_rect(center=(WINDOW_WIDTH // 2 + offset, 120 + offset))  
-
-            glow_surface = pygame.Surface(title_surface.get_size(), pygame.SRCALPHA)
-            glow_surface.blit(title_surface, (0, 0))
-            self.screen.blit(glow_surface, title_rect)
+            title_rect = title_shadow.get_rect(center=self.viewport.point(WINDOW_WIDTH // 2 + offset, 120 + offset))
+            self.screen.blit(title_shadow, title_rect)
         
         # Main title
-        title_surface = self.title_font.render(title_text, True, WHITE)
-        title_rect = title_surface.get_rect(center=(WINDOW_WIDTH // 2, 120))
+        title_surface = self.text_cache.render(title_text, TITLE_FONT_SIZE, WHITE)
+        title_rect = title_surface.get_rect(center=self.viewport.point(WINDOW_WIDTH // 2, 120))
         self.screen.blit(title_surface, title_rect)
         
-        pulse = math.sin(self.animation_time * 2) * 0.1 + 1
-        subtitle_font = pygame.font.Font(None, int(42 * pulse))
-        subtitle_text = subtitle_font.render("Catch the Falling Tears", True, TEARS_LIGHT)
-        subtitle_rect = subtitle_text.get_rect(center=(WINDOW_WIDTH // 2, 180))
+        pulse = self.animation.wave(2) * 0.1 + 1
+        subtitle_text = self.text_cache.render("Catch the Falling Tears", int(SUBTITLE_FONT_SIZE * pulse), TEARS_LIGHT)
+        subtitle_rect = subtitle_text.get_rect(center=self.viewport.point(WINDOW_WIDTH // 2, 180))
         self.screen.blit(subtitle_text, subtitle_rect)
 
         # Game instructions
+        if self.players == 1:
+            controls = "• Use Arrow Keys or A/D to move the bucket"
+        else:
+            controls = "• " + "  ".join(f"{player + 1}: {PLAYER_KEYS[player][2]}" for player in range(self.players))
         instructions = [
-            "• Use Arrow Keys or A/D to move the bucket",
+            controls,
             "• Catch blue tears to score points (+10)",
             "• AVOID red tears - they cost you a life! (-1)",
             "•  You have 5 lives - don't let tears fall!",
@@ -414,205 +1291,407 @@ class Game:
         
         for i, instruction in enumerate(instructions):
             color = WHITE if i % 2 == 0 else TEARS_LIGHT
-            text = self.text_font.render(instruction, True, color)
-            text_rect = text.get_rect(center=(WINDOW_WIDTH // 2, 240 + i * 35))
+            text = self.text_cache.render(instruction, TEXT_FONT_SIZE, color)
+            text_rect = text.get_rect(center=self.viewport.point(WINDOW_WIDTH // 2, 240 + i * 35))
             
-            shadow_text = self.text_font.render(instruction, True, TEARS_DARK)
+            shadow_text = self.text_cache.render(instruction, TEXT_FONT_SIZE, TEARS_DARK)
             shadow_rect = text_rect.copy()
-            shadow_rect.x += 2
-            shadow_rect.y += 2
+            shadow_rect.x += self.viewport.px(2)
+            shadow_rect.y += self.viewport.px(2)
             self.screen.blit(shadow_text, shadow_rect)
             self.screen.blit(text, text_rect)
 
-        self.start_button.draw(self.screen)
+        self.start_button.draw(self.screen, self.text_cache, self.scale, self.animation)
 
     def draw_game_screen(self):
-        ALMOST_WHITE = (250, 252, 255)  
-        SOFT_BLUE = (200, 225, 245)     
-
-        for y in range(WINDOW_HEIGHT):
-            ratio = y / WINDOW_HEIGHT
-            r = int(ALMOST_WHITE[0] * (1 - ratio) + SOFT_BLUE[0] * ratio)
-            g = int(ALMOST_WHITE[1] * (1 - ratio) + SOFT_BLUE[1] * ratio)
-            b = int(ALMOST_WHITE[2] * (1 - ratio) + SOFT_BLUE[2] * ratio)
-            pygame.draw.line(self.screen, (r, g, b), (0, y), (WINDOW_WIDTH, y))
-
-        for i in range(0, WINDOW_WIDTH, 50):
-            alpha = 15
-            pygame.draw.line(self.screen, (*TEARS_LIGHT[:3], alpha), (i, 0), (i, WINDOW_HEIGHT))
-
-        for particle in self.particles[:]:
-            particle.update()
-            if particle.is_alive():
-                particle.draw(self.screen)
+        backdrop = self.backdrops.game_backdrop(self.screen.get_size(), self.theme)
+        tracker = self.dirty_rects if self.dirty_frame else None
+        if tracker is not None:
+            tracker.begin(self.screen, backdrop, self.hud_rects)
+        else:
+            self.screen.blit(backdrop, (0, 0))
+
+        state, alpha = self.render_state()
+        self.drawn_tick = state.tick
+        latched = self.late_latch and self.state == PLAYING
+        if latched:
+            # Input read just before drawing moves the local buckets on from the newest tick
+            self.latency.used_by(time.perf_counter(), state.tick)
+        particle_rects = Particle.draw_all(state.particles, self.screen, self.atlas, alpha,
+                                           doreturn=tracker is not None, splat=self.particle_splat)
+
+        bucket_rects = []
+        for player, bucket in enumerate(self.buckets):
+            if state.player_lives[player] <= 0 and self.players > 1:
+                # Out of lives: the bucket leaves the field
+                continue
+            if latched and player < self.players - self.remote_players:
+                bucket.x = self.latched_bucket_x(state, player, alpha)
             else:
-                self.particles.remove(particle)
-
-        self.bucket.draw(self.screen)
-        for obj in self.falling_objects:
-            obj.draw(self.screen)
-
-        self.draw_ui()
+                prev_x = state.player_prev_x[player]
+                bucket.x = prev_x + (state.player_x[player] - prev_x) * alpha
+            bucket.draw(self.screen, self.scale)
+            bucket_rects.append(self.viewport.rect(bucket.get_bounds()))
+        tear_rects = FallingObject.draw_all(state.tears, self.screen, self.atlas, alpha,
+                                            doreturn=tracker is not None, tear_types=state.tear_types,
+                                            pulse=self.animation.step(DANGER_PULSE_FREQUENCY, DANGER_PULSE_PHASES))
+
+        if self.players == 1:
+            self.hud_rects = self.draw_ui(state.player_score[0], state.player_lives[0])
+        else:
+            self.hud_rects = self.draw_player_panels(state.player_score, state.player_lives)
+
+        if tracker is not None:
+            tracker.add(particle_rects)
+            tracker.add(tear_rects)
+            tracker.add(bucket_rects)
+            hud_state = (state.player_score, state.player_lives)
+            if hud_state != self.hud_state:
+                tracker.add(self.hud_rects)
+                self.hud_state = hud_state
+
+    def latched_bucket_x(self, state, player, alpha):
+        """Where the controls are taking ``player``'s bucket from the newest tick, ``alpha`` of a tick on."""
+        config = self.sim.config
+        x = state.player_x[player]
+        x += self.controls.steer(player, x + config.bucket_width / 2, config.bucket_speed * alpha)
+        return max(0, min(config.width - config.bucket_width, x))
+
+    def render_state(self):
+        """Return the state to draw this frame and how far to interpolate it."""
+        if self.sim_thread is not None:
+            # Particles advance on the simulation thread; draw its latest published state
+            state = self.sim_thread.latest
+            return state, min(1.0, (time.perf_counter() - state.time) / TICK_SECONDS)
+        return RenderState(self, copy=False), self.interpolation
+
+    def final_scores(self):
+        return self.sim.player_score
+
+    def draw_ui(self, score, lives):
+        """Draw the score and lives; return the rects they cover."""
+        score_label = f"Score: {score}"
+        score_text = self.text_cache.render(score_label, SCORE_FONT_SIZE, TEARS_DARK)
+        score_shadow = self.text_cache.render(score_label, SCORE_FONT_SIZE, WHITE)
+        rects = [self.screen.blit(score_shadow, self.viewport.point(22, 22)),
+                 self.screen.blit(score_text, self.viewport.point(20, 20))]
+        if self.hud_score_rect is not None:
+            # A shorter score must still clear the previous, wider one
+            rects.append(self.hud_score_rect)
+        self.hud_score_rect = rects[0].union(rects[1])
 
-    def draw_ui(self):
-        score_text = self.score_font.render(f"Score: {self.score}", True, TEARS_DARK)
-        score_shadow = self.score_font.render(f"Score: {self.score}", True, WHITE)
-        self.screen.blit(score_shadow, (22, 22))
-        self.screen.blit(score_text, (20, 20))
-        
         for i in range(MAX_LIVES):
             tear_x = WINDOW_WIDTH - 60 - (i * 35)
             tear_y = 45
-            
-            if i < self.lives:
-                # Active life - bright teardrop
-                color = TEARS_MEDIUM
-                highlight = WHITE
-            else:
-                # Lost life - faded teardrop
-                color = (100, 100, 100)
-                highlight = (150, 150, 150)
-            
-            pygame.draw.circle(self.screen, (0, 0, 0, 50), (tear_x + 1, tear_y + 4), 10)
-            pygame.draw.circle(self.screen, color, (tear_x, tear_y + 3), 10)
-            
-            mini_points = [
-                (tear_x, tear_y - 7),
-                (tear_x - 5, tear_y + 3),
-                (tear_x + 5, tear_y + 3)
-            ]
-            pygame.draw.polygon(self.screen, color, mini_points)
-            
-            pygame.draw.circle(self.screen, highlight, (tear_x - 3, tear_y + 1), 3)
-            pygame.draw.circle(self.screen, highlight, (tear_x - 2, tear_y), 1)
+            sprite, (anchor_x, anchor_y) = self.atlas.life_icon(i < lives)
+            x, y = self.viewport.point(tear_x, tear_y)
+            rects.append(self.screen.blit(sprite, (x - anchor_x, y - anchor_y)))
+        return rects
+
+    def draw_player_panels(self, scores, lives):
+        """Draw one score and lives panel per player; return the rects they cover."""
+        width = WINDOW_WIDTH // self.players
+        rects = []
+        for player in range(self.players):
+            key = (scores[player], lives[player])
+            cached = self.hud_panels.get(player)
+            if cached is None or cached[0] != key:
+                cached = self.hud_panels[player] = (key, self._render_player_panel(player, width, *key))
+            position = self.viewport.point(player * width + HUD_PANEL_MARGIN // 2, HUD_PANEL_MARGIN)
+            rects.append(self.screen.blit(cached[1], position))
+        return rects
+
+    def _render_player_panel(self, player, width, score, lives):
+        dark, medium, light = PLAYER_PALETTES[player] if lives > 0 else (LOST_LIFE_COLOR, LOST_LIFE_COLOR,
+                                                                         LOST_LIFE_HIGHLIGHT)
+        viewport = self.viewport
+        surface = new_surface(viewport.point(width - HUD_PANEL_MARGIN, HUD_PANEL_HEIGHT), pygame.SRCALPHA)
+        frame = surface.get_rect()
+        pygame.draw.rect(surface, (*TEARS_PALE, 200), frame, border_radius=viewport.px(8))
+        pygame.draw.rect(surface, medium, frame, max(1, viewport.px(2)), border_radius=viewport.px(8))
+
+        text = self.text_cache.render(f"P{player + 1}  {score}", HUD_PANEL_FONT_SIZE, dark)
+        surface.blit(text, viewport.point(8, 4))
+        for i in range(self.sim.config.max_lives):
+            color = light if i >= lives else medium
+            center = viewport.point(14 + i * 3 * HUD_LIFE_DOT_RADIUS, HUD_PANEL_HEIGHT - 10)
+            pygame.draw.circle(surface, color, center, viewport.px(HUD_LIFE_DOT_RADIUS))
+        return surface
 
     def draw_game_over_screen(self):
-        overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.SRCALPHA)
-        for y in range(WINDOW_HEIGHT):
-            alpha = int(180 * (y / WINDOW_HEIGHT))
-            pygame.draw.line(overlay, (*TEARS_DARK[:3], alpha), (0, y), (WINDOW_WIDTH, y))
-        self.screen.blit(overlay, (0, 0))
+        self.screen.blit(self.backdrops.game_over_overlay(self.screen.get_size(), self.theme), (0, 0))
 
         game_over_text = "GAME OVER"
+        glow_surface = self.text_cache.render(game_over_text, TITLE_FONT_SIZE, DANGER_RED)
         for offset in range(3, 0, -1):
-            glow_surface = self.title_font.render(game_over_text, True, DANGER_RED)
-            glow_rect = glow_surface.get_rect(center=(WINDOW_WIDTH // 2 + offset, 200))
+            glow_rect = glow_surface.get_rect(center=self.viewport.point(WINDOW_WIDTH // 2 + offset, 200))
             self.screen.blit(glow_surface, glow_rect)
         
-        main_text = self.title_font.render(game_over_text, True, DANGER_DARK_RED)
-        main_rect = main_text.get_rect(center=(WINDOW_WIDTH // 2, 200))
+        main_text = self.text_cache.render(game_over_text, TITLE_FONT_SIZE, DANGER_DARK_RED)
+        main_rect = main_text.get_rect(center=self.viewport.point(WINDOW_WIDTH // 2, 200))
         self.screen.blit(main_text, main_rect)
 
-        pulse = math.sin(self.animation_time * 3) * 0.1 + 1
-        score_font = pygame.font.Font(None, int(36 * pulse))
-        final_score_text = score_font.render(f"Final Score: {self.score}", True, DEEP_BLUE)
-        final_score_rect = final_score_text.get_rect(center=(WINDOW_WIDTH // 2, 260))
+        pulse = self.animation.wave(3) * 0.1 + 1
+        scores = self.final_scores()
+        if self.players == 1:
+            result = f"Final Score: {scores[0]}"
+        else:
+            best = max(scores)
+            winners = [player for player in range(self.players) if scores[player] == best]
+            if len(winners) == 1:
+                result = f"Player {winners[0] + 1} wins with {best}"
+            else:
+                result = f"Tie at {best}"
+        final_score_text = self.text_cache.render(result, int(FINAL_SCORE_FONT_SIZE * pulse), DEEP_BLUE)
+        final_score_rect = final_score_text.get_rect(center=self.viewport.point(WINDOW_WIDTH // 2, 260))
         self.screen.blit(final_score_text, final_score_rect)
 
-        self.restart_button.draw(self.screen)
-        self.quit_button.draw(self.screen)
+        if self.stats is not None and self.replay is None:
+            best = "New high score!" if self.new_high_score else f"High score: {self.stats.best_score}"
+            best_text = self.text_cache.render(best, TEXT_FONT_SIZE, TEARS_DARK)
+            self.screen.blit(best_text, best_text.get_rect(center=self.viewport.point(WINDOW_WIDTH // 2, 305)))
+
+        self.restart_button.draw(self.screen, self.text_cache, self.scale, self.animation)
+        self.quit_button.draw(self.screen, self.text_cache, self.scale, self.animation)
 
     def reset_game(self):
-        self.score = 0
-        self.lives = MAX_LIVES
-        self.falling_objects = []
-        self.particles = []
-        self.spawn_timer = 0
-        self.bucket.x = WINDOW_WIDTH // 2 - BUCKET_WIDTH // 2
+        self.stop_recording()
+        if self.replay is not None:
+            self.sim = self.replay.simulation(self.replay_seek)
+            self.replay_inputs = self.replay.input_stream(self.sim.tick)
+        else:
+            seed = self.first_seed if self.first_seed is not None else random.randrange(2 ** 32)
+            self.first_seed = None
+            self.sim.reset(seed)
+            if self.record_dir:
+                self.start_recording()
+            if self.stats is not None:
+                self.telemetry = SessionTelemetry(self.sim.seed, self.players, self.sim.config.waves,
+                                                  self.quality.level)
+        self.particles.clear()
+        self.add_trails(self.sim.tears)
+        self.controls.reset()
+        self.interpolation = 1.0
+        for player, bucket in enumerate(self.buckets):
+            bucket.x = self.sim.player_x[player]
+        if self.sim_thread is not None:
+            self.sim_thread.publish()
+        if self.server is not None:
+            self.server.publish(self.sim, NET_STATES[self.state])
+
+    def start_recording(self):
+        os.makedirs(self.record_dir, exist_ok=True)
+        stem = f"{time.strftime('%Y%m%d-%H%M%S')}-{self.sim.seed}"
+        attempt = 0
+        while self.recorder is None:
+            # Sessions started within the same second get numbered rather than overwritten
+            name = f"{stem}-{attempt}.replay" if attempt else f"{stem}.replay"
+            try:
+                self.recorder = ReplayRecorder(os.path.join(self.record_dir, name), self.sim, exclusive=True)
+            except FileExistsError:
+                attempt += 1
+        print(f"Recording replay to {self.recorder.path}")
+
+    def stop_recording(self):
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+
+    def finish_session(self, completed):
+        """Queue the session's telemetry for the stats store."""
+        telemetry = self.telemetry
+        if telemetry is None:
+            return
+        self.telemetry = None
+        self.new_high_score = completed and max(self.sim.player_score) > self.stats.best_score
+        self.stats.record(telemetry.result(self.sim, completed))
+        if self.new_high_score:
+            self.particles.add(ContinuousEmitter(WINDOW_WIDTH // 2, 305, Particle.color_index(HIGH_SCORE_GOLD),
+                                                 rate=3, life=PARTICLE_LIFE, ticks=HIGH_SCORE_SPARKLE_TICKS,
+                                                 spread=120))
+
+    def read_input(self):
+        """Sample the controls into a simulation input bitmask for the next tick."""
+        # The run loop spreads a frame's ticks over the time since the last frame
+        until = self.input_time if self.input_time is not None else time.perf_counter()
+        inputs = self.server.inputs() if self.server is not None else 0
+        inputs |= self.controls.sample(until, self.sim.player_x)
+        self.latency.used_by(until, self.sim.tick + 1)
+        return inputs
 
     def update_game(self):
-        self.animation_time += 0.02
-        
-        keys = pygame.key.get_pressed()
-        if keys[pygame.K_LEFT] or keys[pygame.K_a]:
-            self.bucket.move_left()
-        if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
-            self.bucket.move_right()
-
-        self.spawn_timer += 1
-        if self.spawn_timer >= OBJECT_SPAWN_RATE:
-            self.spawn_timer = 0
-            x = random.randint(OBJECT_SIZE // 2, WINDOW_WIDTH - OBJECT_SIZE // 2)
-            
-            # Determine if this should be a dangerous tear
-            is_dangerous = random.randint(1, 100) <= DANGER_SPAWN_CHANCE
-            self.falling_objects.append(FallingObject(x, -OBJECT_SIZE, is_dangerous))
-
-        for obj in self.falling_objects[:]:
-            obj.update()
-            if self.bucket.get_rect().colliderect(obj.get_rect()):
-                self.falling_objects.remove(obj)
-                
-                # Play sound effect when tear is caught
-                self.play_tear_sound()
-                
-                if obj.is_dangerous:
-                    # Red tear caught - lose a life and create red particles
-                    self.lives -= 1
-                    self.create_particles(obj.x, obj.y, DANGER_RED, 12)
-                    
-                    if self.lives <= 0:
-                        self.state = GAME_OVER
-                        pygame.mixer.music.stop()
-                else:
-                    # Blue tear caught - gain points and create blue particles
-                    self.score += 10
-                    self.create_particles(obj.x, obj.y, TEARS_MEDIUM, 8)
-                    
-            elif obj.is_off_screen():
-                self.falling_objects.remove(obj)
-                if not obj.is_dangerous:  # Only lose life for missing blue tears
-                    self.lives -= 1
-                    if self.lives <= 0:
-                        self.state = GAME_OVER
-                        pygame.mixer.music.stop()
+        """Advance the simulation one tick and play its effects."""
+        if self.replay_inputs is not None:
+            inputs = next(self.replay_inputs, None)
+            if inputs is None:
+                # End of the recording
+                self.state = GAME_OVER
+                return
+        else:
+            inputs = self.read_input()
+        if self.recorder is not None:
+            self.recorder.record(inputs)
+
+        telemetry = self.telemetry
+        for event, x, y, player in self.sim.step(inputs):
+            if telemetry is not None:
+                telemetry.event(event, player)
+            if event == EVENT_CATCH:
+                # Blue tear caught - play sound and create particles in the player's colour
+                self.audio.queue("catch")
+                self.create_particles(x, y, PLAYER_PALETTES[player][1], 8)
+            elif event == EVENT_HIT:
+                # Red tear caught - play sound and create red particles
+                self.audio.queue("hit")
+                self.create_particles(x, y, DANGER_RED, 12)
+        if telemetry is not None:
+            telemetry.tick(self.sim)
+
+        if self.sim.game_over:
+            self.state = GAME_OVER
+            self.stop_recording()
+            self.finish_session(completed=True)
+            self.assets.stop_music()
+        if self.server is not None:
+            self.server.publish(self.sim, NET_STATES[self.state])
+
+    def start_session(self):
+        with self.sim_lock:
+            self.state = PLAYING
+            self.reset_game()
+        if not self.music_started:
+            self.assets.play_music()
+            self.music_started = True
+
+    def restart_session(self):
+        with self.sim_lock:
+            self.state = PLAYING
+            self.reset_game()
+        # Restart the already loaded music when playing again
+        if self.music_started:
+            self.assets.play_music()
+
+    def poll_input(self):
+        """Take events off the queue now, so movement input reaches the controls with its arrival time."""
+        now = time.perf_counter()
+        playing = self.state == PLAYING
+        events = pygame.event.get()
+        for event in events:
+            if self.controls.handle(event, now, pointer=playing) and playing:
+                self.latency.input(now)
+        # Everything else is handled by handle_events
+        self.events.extend(events)
+
+    def handle_events(self):
+        """Process pending events; return False once the game should quit."""
+        running = True
+        mouse_pos = self.viewport.to_logical(pygame.mouse.get_pos())
+        self.poll_input()
+        events = self.events
+        self.events = []
+        for event in events:
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.MOUSEBUTTONDOWN:
+                if self.state == WELCOME_SCREEN:
+                    if self.start_button.is_clicked(mouse_pos):
+                        self.start_session()
+                elif self.state == GAME_OVER:
+                    if self.restart_button.is_clicked(mouse_pos):
+                        self.restart_session()
+                    elif self.quit_button.is_clicked(mouse_pos):
+                        running = False
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_SPACE and self.state == WELCOME_SCREEN:
+                    self.start_session()
+                elif event.key == pygame.K_r and self.state == GAME_OVER:
+                    self.restart_session()
+                elif event.key == pygame.K_F3:
+                    self.profiler.toggle(self)
+
+        if self.state == WELCOME_SCREEN:
+            self.start_button.update_hover(mouse_pos)
+        elif self.state == GAME_OVER:
+            self.restart_button.update_hover(mouse_pos)
+            self.quit_button.update_hover(mouse_pos)
+        return running
+
+    def draw_profiler_overlay(self):
+        self.profiler.draw_overlay(self.screen, self.text_cache)
+
+    def present(self):
+        if self.dirty_frame:
+            self.dirty_rects.present(self.screen)
+        else:
+            self.viewport.present()
+
+    def report_first_frame(self):
+        self.first_frame_seconds = time.perf_counter() - STARTUP_TIME
+        print(f"First frame after {self.first_frame_seconds * 1000:.0f} ms")
+
+    def wait_frame(self):
+        """Sleep to the frame rate cap; return seconds since the previous frame.
+
+        The sleep is cut into short slices that poll input, so an input is
+        timestamped, and seen by the simulation thread, when it arrives
+        rather than when the next frame starts.
+        """
+        self.busy_ms = (time.perf_counter() - self.frame_start) * 1000.0
+        deadline = self.frame_start + 1.0 / FPS
+        while deadline - time.perf_counter() > INPUT_POLL_SECONDS:
+            self.poll_input()
+            time.sleep(INPUT_POLL_SECONDS)
+        frame_time = self.clock.tick(FPS) / 1000.0
+        self.frame_start = time.perf_counter()
+        return frame_time
 
     def run(self):
         running = True
+        accumulator = 0.0
+        frame_time = 0.0
+        profiler = self.profiler
+        if self.sim_thread is not None:
+            # Hand the GIL over sooner so ticks stay on time while the main thread draws
+            sys.setswitchinterval(THREADED_SWITCH_INTERVAL)
+            self.sim_thread.start()
         while running:
-            mouse_pos = pygame.mouse.get_pos()
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    running = False
-                elif event.type == pygame.MOUSEBUTTONDOWN:
-                    if self.state == WELCOME_SCREEN:
-                        if self.start_button.is_clicked(mouse_pos):
-                            self.state = PLAYING
-                            self.reset_game()
-                            if not self.music_started:
-                                self.load_music()
-                                self.music_started = True
-                    elif self.state == GAME_OVER:
-                        if self.restart_button.is_clicked(mouse_pos):
-                            self.state = PLAYING
-                            self.reset_game()
-                            # Restart music when playing again
-                            if self.music_started:
-                                self.load_music()
-                        elif self.quit_button.is_clicked(mouse_pos):
-                            running = False
-                elif event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_SPACE and self.state == WELCOME_SCREEN:
-                        self.state = PLAYING
-                        self.reset_game()
-                        if not self.music_started:
-                            self.load_music()
-                            self.music_started = True
-                    elif event.key == pygame.K_r and self.state == GAME_OVER:
-                        self.state = PLAYING
-                        self.reset_game()
-                        # Restart music when playing again with R key
-                        if self.music_started:
-                            self.load_music()
+            if profiler.enabled:
+                profiler.begin_frame()
+
+            running = self.handle_events()
+
+            if self.state != WELCOME_SCREEN and self.sim_thread is None:
+                # Fixed timestep: rendering speed never changes gameplay or particle speed
+                accumulator += frame_time
+                ticks = int(accumulator / TICK_SECONDS)
+                if ticks >= MAX_TICKS_PER_FRAME:
+                    ticks = MAX_TICKS_PER_FRAME
+                    accumulator = 0.0
+                else:
+                    accumulator -= ticks * TICK_SECONDS
+                # Each tick takes the input held during its share of the time up to now
+                now = time.perf_counter()
+                for tick in range(ticks):
+                    self.input_time = now - (ticks - 1 - tick) * TICK_SECONDS
+                    if self.state == PLAYING:
+                        self.update_game()
+                    self.particles.update()
+                self.input_time = None
+                self.interpolation = min(1.0, accumulator / TICK_SECONDS) if self.state == PLAYING else 1.0
+                # Catches from every tick this frame share one voice per cue
+                self.audio.flush()
+            else:
+                accumulator = 0.0
 
-            if self.state == WELCOME_SCREEN:
-                self.start_button.update_hover(mouse_pos)
-            elif self.state == GAME_OVER:
-                self.restart_button.update_hover(mouse_pos)
-                self.quit_button.update_hover(mouse_pos)
+            if self.dirty_rects is not None:
+                # The profiler overlay covers the field, so push whole frames while it is up
+                self.dirty_frame = self.state == PLAYING and not profiler.enabled
+                if not self.dirty_frame:
+                    self.dirty_rects.invalidate()
 
-            if self.state == PLAYING:
-                self.update_game()
+            if self.late_latch and self.state == PLAYING:
+                # Late latch: input that arrived while the frame was simulated still moves its buckets
+                running = self.handle_events() and running
 
             if self.state == WELCOME_SCREEN:
                 self.draw_welcome_screen()
@@ -621,15 +1700,128 @@ class Game:
             elif self.state == GAME_OVER:
                 self.draw_game_screen()
                 self.draw_game_over_screen()
-
-            pygame.display.flip()
-            self.clock.tick(FPS)
-
+            if profiler.enabled:
+                self.draw_profiler_overlay()
+
+            self.present()
+            if self.state != WELCOME_SCREEN:
+                self.latency.presented(self.drawn_tick, time.perf_counter())
+            if self.first_frame_seconds is None:
+                self.report_first_frame()
+            frame_time = self.wait_frame()
+            self.animation.advance(frame_time)
+            if self.quality.observe(frame_time * 1000.0, self.busy_ms):
+                self.apply_quality()
+                print(f"Quality {self.quality.name} (level {self.quality.level})")
+            telemetry = self.telemetry
+            if telemetry is not None and self.state == PLAYING:
+                telemetry.frame(frame_time * 1000.0, self.quality.level)
+
+            if profiler.enabled:
+                profiler.end_frame(self.sim.tears.count, self.particles.count, self.quality.level)
+
+        if self.sim_thread is not None:
+            self.sim_thread.stop()
+        if self.server is not None:
+            self.server.stop()
+        self.stop_recording()
+        if self.stats is not None:
+            # A session quit part way through is kept, marked as not completed
+            self.finish_session(completed=False)
+            self.stats.close()
+        if self.profile_out:
+            self.profiler.dump(self.profile_out)
+        if self.report_latency:
+            print(self.latency.summary())
+        self.latency.close()
         pygame.quit()
         sys.exit()
 
+def parse_size(text):
+    """Parse a ``WIDTHxHEIGHT`` command line value."""
+    try:
+        width, height = (int(part) for part in text.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected WIDTHxHEIGHT, got {text!r}")
+    if width <= 0 or height <= 0:
+        raise argparse.ArgumentTypeError(f"size must be positive, got {text!r}")
+    return width, height
+
 def main():
-    game = Game()
+    parser = argparse.ArgumentParser(description="Tears PyGame - catch the falling tears!")
+    parser.add_argument("--seed", type=int, help="RNG seed for the first session")
+    parser.add_argument("--record", metavar="DIR", help="save a replay of every session to DIR")
+    parser.add_argument("--replay", metavar="FILE", help="watch a recorded replay")
+    parser.add_argument("--seek", type=float, default=0.0, metavar="SECONDS",
+                        help="start the replay this many seconds in")
+    parser.add_argument("--profile", action="store_true", help="start with the frame profiler overlay on")
+    parser.add_argument("--profile-out", metavar="FILE",
+                        help="dump profiled frames to FILE (.csv or .json) on exit")
+    parser.add_argument("--dirty-rects", action="store_true",
+                        help="only push changed screen regions while playing (low-power or remote displays)")
+    parser.add_argument("--render-size", type=parse_size, metavar="WxH",
+                        help=f"internal framebuffer resolution (default {WINDOW_WIDTH}x{WINDOW_HEIGHT})")
+    parser.add_argument("--window-size", type=parse_size, metavar="WxH",
+                        help="window or fullscreen mode size (default: the render size, or the desktop when fullscreen)")
+    parser.add_argument("--fullscreen", action="store_true", help="run fullscreen")
+    parser.add_argument("--filter", choices=("nearest", "smooth"), default="nearest",
+                        help="how the framebuffer is scaled to the window")
+    parser.add_argument("--quality", choices=("auto",) + QUALITY_NAMES, default="auto",
+                        help="pin a quality level instead of adapting it to the frame rate")
+    parser.add_argument("--threaded", action="store_true",
+                        help="run input and simulation on their own thread, independent of render cost")
+    parser.add_argument("--audio-buffer", type=int, metavar="SAMPLES",
+                        help=f"mixer buffer size (default {DEFAULT_BUFFER}); lower means less sound latency")
+    parser.add_argument("--waves", metavar="FILE", default=DEFAULT_WAVES,
+                        help=f"tear types and spawn waves to play (default {DEFAULT_WAVES})")
+    parser.add_argument("--classic-spawns", action="store_true",
+                        help="spawn tears with the original fixed-rate random spawner instead of waves")
+    parser.add_argument("--players", type=int, default=1, choices=range(1, MAX_PLAYERS + 1), metavar="N",
+                        help=f"players sharing the field, 1-{MAX_PLAYERS} (default 1)")
+    parser.add_argument("--serve", metavar="[HOST:]PORT", nargs="?", const=str(DEFAULT_PORT),
+                        help=f"stream the game to spectator.py clients (default port {DEFAULT_PORT}, localhost)")
+    parser.add_argument("--remote-players", type=int, default=0, metavar="N",
+                        help="with --serve, leave the last N player slots to clients that join over the network")
+    parser.add_argument("--stats-db", metavar="FILE", default=DEFAULT_DB,
+                        help=f"where high scores and session telemetry are kept (default {DEFAULT_DB})")
+    parser.add_argument("--no-stats", action="store_true", help="do not keep high scores or session telemetry")
+    parser.add_argument("--late-latch", action="store_true",
+                        help="read input again just before drawing and move your bucket by it straight away")
+    parser.add_argument("--latency", action="store_true", help="print an input-to-present latency summary on exit")
+    parser.add_argument("--latency-log", metavar="FILE",
+                        help="append every measured input latency to FILE (CSV, one row per input)")
+    args = parser.parse_args()
+
+    waves = None if args.classic_spawns else args.waves
+    if not 0 <= args.remote_players < args.players:
+        parser.error("--remote-players must leave at least one local player")
+    try:
+        serve = parse_address(args.serve) if args.serve else None
+    except ValueError:
+        parser.error(f"expected [HOST:]PORT, got {args.serve!r}")
+    if waves is not None:
+        try:
+            load_waves(waves)
+        except WaveError as e:
+            parser.error(str(e))
+
+    if args.audio_buffer:
+        pygame.mixer.quit()
+        pygame.mixer.init(buffer=args.audio_buffer)
+
+    try:
+        replay = Replay.load(args.replay) if args.replay else None
+    except (OSError, ReplayError) as e:
+        parser.error(str(e))
+    stats = None if args.no_stats or replay is not None else StatsStore(args.stats_db)
+    game = Game(seed=args.seed, record_dir=args.record, replay=replay,
+                replay_seek=int(args.seek * TICK_RATE), profile=args.profile,
+                profile_out=args.profile_out, dirty_rects=args.dirty_rects,
+                render_size=args.render_size, window_size=args.window_size,
+                fullscreen=args.fullscreen, smooth=args.filter == "smooth", quality=args.quality,
+                threaded=args.threaded, waves=waves, players=args.players, serve=serve,
+                remote_players=args.remote_players, stats=stats, late_latch=args.late_latch,
+                latency=args.latency, latency_log=args.latency_log)
     game.run()
 
 if __name__ == "__main__":
@@ -0,0 +1,98 @@
+"""Broad-phase collision between falling tears and buckets."""
+
+from collections import namedtuple
+
+import numpy as np
+
+Contacts = namedtuple("Contacts", ["hits", "owners", "off_screen"])
+Contacts.__doc__ = """Result of one collision pass.
+
+hits: pool slot indices of tears that touched a bucket.
+owners: index into ``buckets`` of the bucket that owns each hit.
+off_screen: pool slot indices of tears that fell past the bottom edge.
+"""
+
+_EMPTY = np.zeros(0, dtype=np.intp)
+
+def tear_boxes(pool):
+    """Return the integer AABBs (left, top, right, bottom) of every live tear.
+
+    Boxes match ``pygame.Rect(x - size // 2, y - size // 2, size, size)``,
+    which truncates float coordinates toward zero.
+    """
+    n = pool.count
+    half = pool.size[:n] // 2
+    left = np.trunc(pool.x[:n] - half)
+    top = np.trunc(pool.y[:n] - half)
+    return left, top, left + pool.size[:n], top + pool.size[:n]
+
+def collide_tears(pool, buckets, bottom):
+    """Test every live tear in ``pool`` against every bucket in one pass.
+
+    ``buckets`` is a sequence of ``(x, y, width, height)`` boxes. Tears are
+    sorted along x once and each bucket only tests the contiguous run of
+    tears whose x extent can overlap it (sweep and prune); the candidates
+    are then checked exactly with ``pygame.Rect.colliderect`` semantics.
+    A tear touching several buckets is owned by the bucket whose centre is
+    horizontally closest to the tear's, the first one listed on a tie.
+    """
+    n = pool.count
+    if not n:
+        return Contacts(_EMPTY, _EMPTY, _EMPTY)
+
+    boxes = np.asarray(buckets, dtype=np.float64).reshape(-1, 4)
+    max_width = int(pool.size[:n].max())
+    lowest = pool.y[:n].max()
+    # Fast reject: every tear is still above every bucket and on screen.
+    if lowest + max_width <= boxes[:, 1].min() and lowest <= bottom:
+        return Contacts(_EMPTY, _EMPTY, _EMPTY)
+
+    left, top, right, lower = tear_boxes(pool)
+    b_left = boxes[:, 0]
+    b_top = boxes[:, 1]
+    b_right = b_left + boxes[:, 2]
+    b_lower = b_top + boxes[:, 3]
+
+    order = np.argsort(left, kind="stable")
+    sorted_left = left[order]
+    # Candidates satisfy b_left - max_width < tear_left < b_right.
+    start = np.searchsorted(sorted_left, b_left - max_width, side="right")
+    stop = np.searchsorted(sorted_left, b_right, side="left")
+    lengths = np.maximum(stop - start, 0)
+    total = int(lengths.sum())
+
+    hit = np.zeros(n, dtype=bool)
+    owner = np.full(n, len(boxes), dtype=np.intp)
+    if total:
+        pair_bucket = np.repeat(np.arange(len(boxes)), lengths)
+        offsets = np.arange(total) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        pair_tear = order[np.repeat(start, lengths) + offsets]
+
+        overlap = ((left[pair_tear] < b_right[pair_bucket])
+                   & (right[pair_tear] > b_left[pair_bucket])
+                   & (top[pair_tear] < b_lower[pair_bucket])
+                   & (lower[pair_tear] > b_top[pair_bucket]))
+        pair_tear = pair_tear[overlap]
+        pair_bucket = pair_bucket[overlap]
+        distance = np.abs((left[pair_tear] + right[pair_tear]) - (b_left + b_right)[pair_bucket])
+        # Group the pairs by tear, best owner first, and keep each group's head
+        rank = np.lexsort((pair_bucket, distance, pair_tear))
+        pair_tear = pair_tear[rank]
+        pair_bucket = pair_bucket[rank]
+        first = np.ones(pair_tear.size, dtype=bool)
+        first[1:] = pair_tear[1:] != pair_tear[:-1]
+        owner[pair_tear[first]] = pair_bucket[first]
+        hit[pair_tear] = True
+
+    hits = np.flatnonzero(hit)
+    off_screen = np.flatnonzero(~hit & (pool.y[:n] > bottom + pool.size[:n]))
+    return Contacts(hits, owner[hits], off_screen)
+
+def nearest_buckets(x, buckets):
+    """Index into ``buckets`` of the bucket whose centre is closest to each ``x``.
+
+    Ties go to the first bucket listed.
+    """
+    boxes = np.asarray(buckets, dtype=np.float64).reshape(-1, 4)
+    centres = boxes[:, 0] + boxes[:, 2] / 2
+    return np.argmin(np.abs(np.asarray(x, dtype=np.float64)[:, None] - centres), axis=1)
@@ -0,0 +1,248 @@
+"""Event-driven keyboard, mouse and touch input, and input latency measurement.
+
+``Controls`` is handed every event as the game's event loop receives it
+and timestamps each movement key going down and coming back up. Each
+simulation tick ``sample`` turns the time every direction was held up to
+that tick into the input bitmask, carrying fractions of a tick over: how
+far a bucket goes follows how long its key was held, not how often the
+keyboard happened to be polled, and a tap shorter than a tick still
+moves it. The simulation still only sees the bitmask, so replays and
+netplay are unchanged.
+
+The mouse, or a finger on a touch screen, steers the first player's
+bucket towards the pointer once it moves over the field while playing;
+a movement key for that player hands control back to the keyboard.
+
+``LatencyMeter`` measures input-to-present latency: from the event loop
+receiving a movement input to the display flip of the first frame drawn
+from a tick that used it. pygame does not expose the OS event
+timestamps, so time spent in the OS queue before the event loop pumps it
+is not included, nor is the display's own scan-out.
+"""
+
+import csv
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import pygame
+
+from simulation import INPUT_BITS, INPUT_LEFT, INPUT_RIGHT, TICK_SECONDS
+
+LEFT = 0
+RIGHT = 1
+DIRECTION_BITS = (INPUT_LEFT, INPUT_RIGHT)
+POINTER_EVENTS = (pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN, pygame.FINGERDOWN, pygame.FINGERMOTION)
+LATENCY_PENDING_LIMIT = 256
+LATENCY_LOG_COLUMNS = ("time", "mode", "latency_ms", "tick")
+
+class Controls:
+    """Movement keys and pointer of the local players, sampled once per simulation tick.
+
+    ``bindings`` is a list of ``(left_keys, right_keys, label)`` per local
+    player. Events may be fed on one thread and sampled on another.
+    """
+
+    def __init__(self, bindings, config, viewport=None):
+        self.config = config
+        self.viewport = viewport
+        self.players = len(bindings)
+        self.slots = {}
+        for player, (left_keys, right_keys, _) in enumerate(bindings):
+            for key in left_keys:
+                self.slots[key] = 2 * player + LEFT
+            for key in right_keys:
+                self.slots[key] = 2 * player + RIGHT
+        slot_count = 2 * self.players
+        self.pressed = set()
+        # Keys held now, per player and direction, for late latching
+        self.live = [0] * slot_count
+        # Key changes not yet sampled, as (time, slot, down)
+        self.events = deque()
+        # The same counts as of the last sample, and the hold time it has not used yet
+        self.down = [0] * slot_count
+        self.since = [0.0] * slot_count
+        self.held = [0.0] * slot_count
+        self.carry = [0.0] * slot_count
+        self.fresh = [False] * slot_count
+        self.sampled_until = 0.0
+        # Pointer target in logical x, or None while the keyboard has control
+        self.pointer_x = None
+        self.lock = threading.Lock()
+
+    def handle(self, event, now, pointer=True):
+        """Note ``event`` as received at ``now``; return True if it was movement input."""
+        if event.type in (pygame.KEYDOWN, pygame.KEYUP):
+            slot = self.slots.get(event.key)
+            if slot is None:
+                return False
+            down = event.type == pygame.KEYDOWN
+            with self.lock:
+                if down == (event.key in self.pressed):
+                    # Key repeat, or a release whose press went to another window
+                    return False
+                if down:
+                    self.pressed.add(event.key)
+                    self.live[slot] += 1
+                    if slot // 2 == 0:
+                        self.pointer_x = None
+                else:
+                    self.pressed.discard(event.key)
+                    self.live[slot] -= 1
+                self.events.append((now, slot, down))
+            return True
+        if event.type == pygame.WINDOWFOCUSLOST:
+            # The key releases will go to another window
+            self.release_all(now)
+            return False
+        if pointer and event.type in POINTER_EVENTS and self.viewport is not None:
+            if event.type in (pygame.FINGERDOWN, pygame.FINGERMOTION):
+                width, height = self.viewport.display.get_size()
+                pos = (event.x * width, event.y * height)
+            else:
+                pos = event.pos
+            with self.lock:
+                self.pointer_x = self.viewport.to_logical(pos)[0]
+            return True
+        return False
+
+    def release_all(self, now):
+        with self.lock:
+            for key in self.pressed:
+                slot = self.slots[key]
+                self.live[slot] -= 1
+                self.events.append((now, slot, False))
+            self.pressed.clear()
+
+    def reset(self):
+        """Forget the pointer and any part-used hold time, e.g. when a session starts."""
+        with self.lock:
+            self.pointer_x = None
+            self.carry = [0.0] * len(self.carry)
+
+    def sample(self, until=None, player_x=()):
+        """Input bitmask for the tick that ends at ``until`` (default now).
+
+        ``player_x`` holds the buckets' left edges, for the pointer.
+        """
+        if until is None:
+            until = time.perf_counter()
+        with self.lock:
+            until = max(until, self.sampled_until)
+            self.sampled_until = until
+            events = self.events
+            down = self.down
+            while events and events[0][0] <= until:
+                at, slot, pressed = events.popleft()
+                if pressed:
+                    if not down[slot]:
+                        self.since[slot] = at
+                        self.fresh[slot] = True
+                    down[slot] += 1
+                else:
+                    down[slot] -= 1
+                    if not down[slot]:
+                        self.held[slot] += at - self.since[slot]
+
+            inputs = 0
+            for slot in range(len(down)):
+                held = self.held[slot]
+                if down[slot]:
+                    held += until - self.since[slot]
+                    self.since[slot] = until
+                self.held[slot] = 0.0
+                if held <= 0.0:
+                    self.carry[slot] = 0.0
+                    continue
+                ticks = self.carry[slot] + held / TICK_SECONDS
+                # A new press always moves at least once, however short
+                if ticks >= 0.5 or self.fresh[slot]:
+                    inputs |= DIRECTION_BITS[slot % 2] << (INPUT_BITS * (slot // 2))
+                    ticks -= 1.0
+                self.fresh[slot] = False
+                self.carry[slot] = max(-0.5, min(0.5, ticks))
+
+            if self.pointer_x is not None and player_x:
+                # The pointer replaces player 1's keys; half a step of slack stops it dithering
+                offset = self.pointer_x - (player_x[0] + self.config.bucket_width / 2)
+                inputs &= ~(INPUT_LEFT | INPUT_RIGHT)
+                if offset < -self.config.bucket_speed / 2:
+                    inputs |= INPUT_LEFT
+                elif offset > self.config.bucket_speed / 2:
+                    inputs |= INPUT_RIGHT
+        return inputs
+
+    def steer(self, player, centre, reach):
+        """How far, at most ``reach``, ``player`` is steering a bucket centred at ``centre`` right now."""
+        with self.lock:
+            if player == 0 and self.pointer_x is not None:
+                return max(-reach, min(reach, self.pointer_x - centre))
+            left = self.live[2 * player + LEFT] > 0
+            right = self.live[2 * player + RIGHT] > 0
+        return (right - left) * reach
+
+class LatencyMeter:
+    """Input-to-present latency of movement input, with an optional CSV log.
+
+    ``mode`` names the loop options in use and goes into every log row,
+    so runs with different options can share one log and be compared.
+    """
+
+    def __init__(self, mode, log_path=None):
+        self.mode = mode
+        self.log_path = log_path
+        self.samples = []
+        # Input times not yet used by a tick, then (input time, tick) not yet on screen
+        self.pending = deque(maxlen=LATENCY_PENDING_LIMIT)
+        self.used = deque()
+        self.lock = threading.Lock()
+        self._log = None
+        self._writer = None
+        if log_path:
+            new = not os.path.exists(log_path)
+            try:
+                self._log = open(log_path, "a", newline="")
+            except OSError as e:
+                print(f"Could not open latency log {log_path}: {e}")
+            else:
+                self._writer = csv.writer(self._log)
+                if new:
+                    self._writer.writerow(LATENCY_LOG_COLUMNS)
+
+    def input(self, now):
+        with self.lock:
+            self.pending.append(now)
+
+    def used_by(self, until, tick):
+        """Inputs received up to ``until`` went into ``tick``."""
+        with self.lock:
+            pending = self.pending
+            while pending and pending[0] <= until:
+                self.used.append((pending.popleft(), tick))
+
+    def presented(self, tick, now):
+        """A frame drawn from ``tick`` has just been flipped to the display at ``now``."""
+        with self.lock:
+            used = self.used
+            while used and used[0][1] <= tick:
+                at, used_tick = used.popleft()
+                latency = (now - at) * 1000.0
+                self.samples.append(latency)
+                if self._writer is not None:
+                    self._writer.writerow((f"{at:.6f}", self.mode, f"{latency:.3f}", used_tick))
+
+    def summary(self):
+        if not self.samples:
+            return f"Input latency ({self.mode}): no samples"
+        samples = np.array(self.samples)
+        p50, p95, p99 = np.percentile(samples, (50, 95, 99))
+        return (f"Input latency ({self.mode}): {samples.size} inputs, mean {samples.mean():.1f} ms, "
+                f"p50 {p50:.1f} / p95 {p95:.1f} / p99 {p99:.1f} / max {samples.max():.1f} ms")
+
+    def close(self):
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+            self._writer = None
@@ -0,0 +1,162 @@
+"""Array-backed entity pools for falling tears and particles."""
+
+import numpy as np
+
+class EntityPool:
+    """Structure-of-arrays store for short-lived moving entities.
+
+    Every attribute lives in its own NumPy array and the first ``count``
+    slots hold the live entities; ``px``/``py`` keep each entity's position
+    from before the last ``update`` for render interpolation. Removal swaps
+    entities from the end of the live range into the freed slots, so the
+    live range stays dense and removing k entities costs O(k) regardless of
+    pool size.
+    """
+
+    FIELDS = {
+        "x": np.float64,
+        "y": np.float64,
+        "px": np.float64,
+        "py": np.float64,
+        "vx": np.float64,
+        "vy": np.float64,
+        "life": np.int32,
+        "max_life": np.int32,
+        "size": np.int32,
+        "color": np.int16,
+        "kind": np.int8,
+    }
+    # Packed layout of older replays, whose entities still carried an unused per-entity animation phase
+    LEGACY_FIELDS = dict(FIELDS, phase=np.float64)
+
+    def __init__(self, capacity=64, gravity=0.0):
+        self.gravity = gravity
+        self.count = 0
+        self.capacity = max(1, capacity)
+        for name, dtype in self.FIELDS.items():
+            setattr(self, name, np.zeros(self.capacity, dtype=dtype))
+
+    def __len__(self):
+        return self.count
+
+    def _reserve(self, extra):
+        needed = self.count + extra
+        if needed <= self.capacity:
+            return
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        for name in self.FIELDS:
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+        self.capacity = capacity
+
+    def spawn(self, x, y, vx=0.0, vy=0.0, life=0, size=0, color=0, kind=0):
+        """Add one entity and return its slot index."""
+        self._reserve(1)
+        i = self.count
+        self.x[i] = self.px[i] = x
+        self.y[i] = self.py[i] = y
+        self.vx[i] = vx
+        self.vy[i] = vy
+        self.life[i] = life
+        self.max_life[i] = life
+        self.size[i] = size
+        self.color[i] = color
+        self.kind[i] = kind
+        self.count += 1
+        return i
+
+    def spawn_many(self, x, y, vx=0.0, vy=0.0, life=0, size=0, color=0, kind=0):
+        """Add a batch of entities; scalar arguments are broadcast."""
+        x = np.asarray(x, dtype=np.float64)
+        n = x.size
+        if n == 0:
+            return
+        self._reserve(n)
+        live = slice(self.count, self.count + n)
+        self.x[live] = self.px[live] = x
+        self.y[live] = self.py[live] = y
+        self.vx[live] = vx
+        self.vy[live] = vy
+        self.life[live] = life
+        self.max_life[live] = life
+        self.size[live] = size
+        self.color[live] = color
+        self.kind[live] = kind
+        self.count += n
+
+    def update(self):
+        """Advance every live entity by one tick."""
+        n = self.count
+        if not n:
+            return
+        self.px[:n] = self.x[:n]
+        self.py[:n] = self.y[:n]
+        self.x[:n] += self.vx[:n]
+        self.y[:n] += self.vy[:n]
+        self.life[:n] -= 1
+        if self.gravity:
+            self.vy[:n] += self.gravity
+
+    def remove(self, indices):
+        """Swap-remove the entities at ``indices`` (live slot numbers)."""
+        indices = np.unique(np.asarray(indices, dtype=np.intp))
+        k = indices.size
+        if not k:
+            return
+        new_count = self.count - k
+        holes = indices[indices < new_count]
+        if holes.size:
+            tail = np.ones(k, dtype=bool)
+            tail[indices[indices >= new_count] - new_count] = False
+            movers = np.flatnonzero(tail) + new_count
+            for name in self.FIELDS:
+                array = getattr(self, name)
+                array[holes] = array[movers]
+        self.count = new_count
+
+    def remove_dead(self):
+        """Drop every entity whose life has run out."""
+        if self.count:
+            self.remove(np.flatnonzero(self.life[:self.count] <= 0))
+
+    def clear(self):
+        self.count = 0
+
+    def copy(self):
+        """Return a new pool holding copies of the live entities only."""
+        pool = EntityPool.__new__(EntityPool)
+        pool.gravity = self.gravity
+        pool.count = self.count
+        pool.capacity = max(1, self.count)
+        for name in self.FIELDS:
+            setattr(pool, name, getattr(self, name)[:pool.capacity].copy())
+        return pool
+
+    def pack(self):
+        """Serialise the live entities to bytes (count, then each field)."""
+        n = self.count
+        parts = [np.uint32(n).tobytes()]
+        for name in self.FIELDS:
+            parts.append(getattr(self, name)[:n].tobytes())
+        return b"".join(parts)
+
+    def unpack(self, data, fields=None):
+        """Replace the pool contents with entities produced by ``pack``.
+
+        ``fields`` gives the packed layout when it is not ``FIELDS``, e.g.
+        ``LEGACY_FIELDS``; packed fields the pool no longer has are skipped.
+        """
+        n = int(np.frombuffer(data, dtype=np.uint32, count=1)[0])
+        self.count = 0
+        self._reserve(n)
+        offset = 4
+        for name, dtype in (fields or self.FIELDS).items():
+            if name in self.FIELDS:
+                getattr(self, name)[:n] = np.frombuffer(data, dtype=dtype, count=n, offset=offset)
+            offset += n * np.dtype(dtype).itemsize
+        self.count = n
+        return offset
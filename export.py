@@ -0,0 +1,273 @@
+"""Export sessions as PNG sequences or raw video, faster than real time.
+
+A ``Game`` runs headless under SDL's dummy drivers, from a seed and a
+scripted bucket policy or from a replay file, and draws every frame with
+its own draw methods. Frames are copied into a fixed ring of shared
+memory slots; a pool of worker processes encodes and writes them while
+the next frames are drawn. When every slot is taken the renderer waits
+for a worker, so memory stays flat however long the session is::
+
+    python export.py --seed 7 --seconds 600 --out frames/
+    python export.py --replay session.replay --format raw --out session.rgb
+
+Raw output is one file of packed RGB24 frames, ready for e.g.
+``ffmpeg -f rawvideo -pix_fmt rgb24 -s 800x600 -r 60 -i session.rgb out.mp4``.
+"""
+
+import argparse
+import os
+import struct
+import time
+import zlib
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import get_context, shared_memory
+
+# The drivers must be chosen before pygame is initialised by catch_game
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import numpy as np
+import pygame
+
+from simulation import INPUT_BITS, INPUT_LEFT, INPUT_RIGHT, TICK_RATE
+
+FORMATS = ("png", "raw")
+POLICIES = ("idle", "track")
+DEFAULT_FPS = 60
+DEFAULT_SECONDS = 600
+DEFAULT_TAIL_SECONDS = 2.0
+DEFAULT_SLOTS = 16  # frames in flight between the renderer and the encoders
+FRAME_NAME = "frame_{:06d}.png"
+PNG_LEVEL = 1  # zlib level: 1 encodes about five times faster than 6 for files twice the size
+PROGRESS_SECONDS = 5.0
+
+_worker = {}
+
+def _png_chunk(kind, data):
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+def encode_png(pixels, width, height, level=PNG_LEVEL):
+    """Encode packed RGB24 ``pixels`` as a PNG file's bytes, every row unfiltered."""
+    rows = np.zeros((height, width * 3 + 1), dtype=np.uint8)
+    rows[:, 1:] = np.frombuffer(pixels, dtype=np.uint8).reshape(height, width * 3)
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (b"\x89PNG\r\n\x1a\n" + _png_chunk(b"IHDR", header)
+            + _png_chunk(b"IDAT", zlib.compress(rows.tobytes(), level)) + _png_chunk(b"IEND", b""))
+
+def _init_worker(shm_name, size, fmt, out, level):
+    _worker["shm"] = shared_memory.SharedMemory(name=shm_name)
+    _worker["size"] = size
+    _worker["fmt"] = fmt
+    _worker["out"] = out
+    _worker["level"] = level
+    if fmt == "raw":
+        _worker["file"] = open(out, "r+b")
+
+def _encode(slot, frame):
+    """Encode the frame in ``slot`` as frame number ``frame``; return the slot once it is free."""
+    width, height = _worker["size"]
+    frame_bytes = width * height * 3
+    view = _worker["shm"].buf[slot * frame_bytes:(slot + 1) * frame_bytes]
+    try:
+        if _worker["fmt"] == "png":
+            with open(os.path.join(_worker["out"], FRAME_NAME.format(frame)), "wb") as f:
+                f.write(encode_png(view, width, height, _worker["level"]))
+        else:
+            f = _worker["file"]
+            f.seek(frame * frame_bytes)
+            f.write(view)
+            f.flush()
+    finally:
+        view.release()
+    return slot
+
+class FrameExporter:
+    """Hands frames to a process pool through a fixed ring of shared memory slots."""
+
+    def __init__(self, size, fmt, out, workers=None, slots=DEFAULT_SLOTS, level=PNG_LEVEL):
+        self.size = size
+        self.fmt = fmt
+        self.out = out
+        self.frame_bytes = size[0] * size[1] * 3
+        if fmt == "png":
+            os.makedirs(out, exist_ok=True)
+        else:
+            # Workers write their frames in place, so the file must exist first
+            open(out, "wb").close()
+        self.shm = shared_memory.SharedMemory(create=True, size=slots * self.frame_bytes)
+        self.free = list(range(slots))
+        self.pending = set()
+        self.frames = 0
+        # Spawned workers import only this module, never the game's display
+        self.pool = ProcessPoolExecutor(workers, mp_context=get_context("spawn"), initializer=_init_worker,
+                                        initargs=(self.shm.name, size, fmt, out, level))
+
+    def write(self, surface):
+        """Queue ``surface`` as the next frame, waiting for a free slot if every one is in use."""
+        if not self.free:
+            self._reclaim(wait(self.pending, return_when=FIRST_COMPLETED).done)
+        slot = self.free.pop()
+        start = slot * self.frame_bytes
+        self.shm.buf[start:start + self.frame_bytes] = pygame.image.tobytes(surface, "RGB")
+        self.pending.add(self.pool.submit(_encode, slot, self.frames))
+        self.frames += 1
+
+    def _reclaim(self, done):
+        for future in done:
+            self.pending.discard(future)
+            # Re-raises a worker's error, e.g. a full disk
+            self.free.append(future.result())
+
+    def close(self):
+        """Wait for every queued frame to be written and free the slots."""
+        try:
+            if self.pending:
+                self._reclaim(wait(self.pending).done)
+        finally:
+            self.pool.shutdown(cancel_futures=True)
+            self.shm.close()
+            self.shm.unlink()
+
+def tracking_input(sim, harmless):
+    """Scripted players: each steers under the lowest harmless tear nearest its bucket."""
+    tears = sim.tears
+    n = tears.count
+    targets = np.flatnonzero(harmless[tears.kind[:n]])
+    if not targets.size:
+        return 0
+    width = sim.config.bucket_width
+    centres = np.asarray(sim.player_x, dtype=np.float64) + width / 2
+    owner = np.argmin(np.abs(tears.x[targets, None] - centres[None, :]), axis=1)
+    inputs = 0
+    for player in range(sim.players):
+        mine = targets[owner == player]
+        if not mine.size:
+            continue
+        target = tears.x[mine[np.argmax(tears.y[mine])]]
+        if target < centres[player] - 4:
+            inputs |= INPUT_LEFT << (INPUT_BITS * player)
+        elif target > centres[player] + 4:
+            inputs |= INPUT_RIGHT << (INPUT_BITS * player)
+    return inputs
+
+def export_session(game, exporter, fps, max_seconds, tail_seconds):
+    """Play ``game`` to the end, or ``max_seconds``, and write every frame; return the ticks played."""
+    from catch_game import GAME_OVER, PLAYING
+
+    ticks_per_frame = TICK_RATE / fps
+    max_ticks = int(max_seconds * TICK_RATE)
+    tail_frames = int(tail_seconds * fps)
+    due = 0.0
+    ticks = 0
+    start = last_report = time.perf_counter()
+    while tail_frames > 0:
+        due += ticks_per_frame
+        while due >= 1.0:
+            if game.state == PLAYING:
+                game.update_game()
+                ticks += 1
+                if ticks >= max_ticks:
+                    game.state = GAME_OVER
+            game.particles.update()
+            due -= 1.0
+        game.interpolation = due if game.state == PLAYING else 1.0
+        # Nothing listens, but the queued cues must not pile up
+        game.audio.flush()
+
+        game.draw_game_screen()
+        if game.state == GAME_OVER:
+            game.draw_game_over_screen()
+            tail_frames -= 1
+        exporter.write(game.screen)
+        game.animation.advance(1.0 / fps)
+
+        now = time.perf_counter()
+        if now - last_report >= PROGRESS_SECONDS:
+            last_report = now
+            print(f"{exporter.frames} frames, {ticks / TICK_RATE:.0f}s of play, "
+                  f"{exporter.frames / (now - start):.0f} frames/s")
+    return ticks
+
+def main():
+    parser = argparse.ArgumentParser(description="Render a catch game session to image files, headless.")
+    parser.add_argument("--out", required=True,
+                        help="folder for the PNG frames, or the file for --format raw")
+    parser.add_argument("--format", choices=FORMATS, default="png",
+                        help="png: one numbered PNG per frame; raw: one file of RGB24 frames (default png)")
+    parser.add_argument("--replay", metavar="FILE", help="export a recorded replay instead of a scripted session")
+    parser.add_argument("--seed", type=int, default=0, help="RNG seed of the scripted session (default 0)")
+    parser.add_argument("--policy", choices=POLICIES, default="track",
+                        help="how the scripted buckets move (default track)")
+    parser.add_argument("--players", type=int, default=1, metavar="N", help="scripted players (default 1)")
+    parser.add_argument("--waves", metavar="FILE", help="tear types and spawn waves (default: the game's)")
+    parser.add_argument("--classic-spawns", action="store_true", help="use the original random spawner")
+    parser.add_argument("--seconds", type=float, default=DEFAULT_SECONDS,
+                        help=f"stop after this much play (default {DEFAULT_SECONDS})")
+    parser.add_argument("--tail", type=float, default=DEFAULT_TAIL_SECONDS,
+                        help=f"seconds of game over screen at the end (default {DEFAULT_TAIL_SECONDS:g})")
+    parser.add_argument("--fps", type=int, default=DEFAULT_FPS, help=f"frames per second (default {DEFAULT_FPS})")
+    parser.add_argument("--size", metavar="WxH", help="frame size (default the game's 800x600)")
+    parser.add_argument("--quality", default="high", help="quality level to draw at (default high)")
+    parser.add_argument("--png-level", type=int, default=PNG_LEVEL, choices=range(10), metavar="0-9",
+                        help=f"PNG compression, higher is smaller and slower (default {PNG_LEVEL})")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="encoding processes (default: one per CPU)")
+    parser.add_argument("--buffer", type=int, default=DEFAULT_SLOTS, metavar="FRAMES",
+                        help=f"frames held between rendering and encoding (default {DEFAULT_SLOTS})")
+    args = parser.parse_args()
+
+    # Imported here: catch_game opens the display, which the spawned encoders must not do
+    from catch_game import DEFAULT_WAVES, MAX_PLAYERS, PLAYING, QUALITY_NAMES, Game, parse_size
+    from replay import Replay, ReplayError
+
+    if args.quality not in QUALITY_NAMES:
+        parser.error(f"--quality must be one of {', '.join(QUALITY_NAMES)}")
+    if not 1 <= args.players <= MAX_PLAYERS:
+        parser.error(f"--players must be 1-{MAX_PLAYERS}")
+    if args.fps <= 0 or args.buffer <= 0:
+        parser.error("--fps and --buffer must be positive")
+    try:
+        size = parse_size(args.size) if args.size else None
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+
+    try:
+        replay = Replay.load(args.replay) if args.replay else None
+    except (OSError, ReplayError) as e:
+        parser.error(str(e))
+    waves = None if args.classic_spawns else args.waves or DEFAULT_WAVES
+    if replay is not None:
+        waves = replay.config.waves
+    game = Game(seed=args.seed, replay=replay, render_size=size, quality=args.quality, waves=waves,
+                players=args.players)
+    if replay is None:
+        game.state = PLAYING
+        game.reset_game()
+        if args.policy == "track":
+            harmless = np.array([tear_type.damage == 0 for tear_type in game.sim.tear_types])
+            game.read_input = lambda: tracking_input(game.sim, harmless)
+        else:
+            game.read_input = lambda: 0
+
+    exporter = FrameExporter(game.screen.get_size(), args.format, args.out, args.workers, args.buffer,
+                             args.png_level)
+    start = time.perf_counter()
+    try:
+        ticks = export_session(game, exporter, args.fps, args.seconds, args.tail)
+    finally:
+        exporter.close()
+    elapsed = time.perf_counter() - start
+
+    seconds = exporter.frames / args.fps
+    print(f"Wrote {exporter.frames} frames ({seconds:.1f}s, {ticks} ticks, score {game.sim.total_score}) "
+          f"to {args.out} in {elapsed:.1f}s: {exporter.frames / elapsed:.0f} frames/s, "
+          f"{seconds / elapsed:.1f}x real time")
+    if args.format == "raw":
+        width, height = exporter.size
+        print(f"Encode with: ffmpeg -f rawvideo -pix_fmt rgb24 -s {width}x{height} -r {args.fps} "
+              f"-i {args.out} out.mp4")
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,389 @@
+"""Live streaming of game state to spectators and remote players.
+
+``StateServer`` runs an asyncio TCP server on its own thread. The game
+calls ``publish`` after every simulation tick; the state is quantised
+into a few small integer columns (players, then tears) and each column is
+sent as the difference from the previous tick's column, zlib compressed.
+Tears barely move between ticks and scores rarely change, so most of a
+delta is zero and compresses to a few bytes. A client that has just
+connected, or skipped ticks because its socket backed up, gets a
+keyframe (the difference from all zeros) instead.
+
+``StateClient`` is the receiving end (see ``spectator.py``). A client may
+ask to join; it is then given one of the player slots the host reserved
+for remote players and sends its input bits whenever they change.
+
+Messages are framed as ``length:u32`` followed by a one byte type::
+
+    b"H" json            server hello: config overrides, tick rate, player slot
+    b"K"/b"D" snapshot   keyframe / delta, see SNAPSHOT_HEADER
+    b"J"                 client asks for a player slot
+    b"I" inputs:u8       client input bits (INPUT_LEFT | INPUT_RIGHT)
+
+This module has no pygame dependency.
+"""
+
+import asyncio
+import collections
+import json
+import struct
+import threading
+import time
+import zlib
+
+import numpy as np
+
+from simulation import INPUT_BITS, TICK_RATE
+
+DEFAULT_PORT = 7777
+STATS_INTERVAL = 5.0       # seconds between bandwidth reports
+MAX_CLIENT_BUFFER = 64 * 1024  # bytes queued for a client before it skips ticks
+COMPRESS_LEVEL = 1
+
+# Session states carried in every snapshot
+STATE_WAITING = 0
+STATE_PLAYING = 1
+STATE_OVER = 2
+
+_FRAME = struct.Struct("<I")
+# type, tick, session state, players, tears
+SNAPSHOT_HEADER = struct.Struct("<cIBBH")
+
+# Quantised columns: (name, dtype, scale); values are stored as round(value * scale)
+PLAYER_COLUMNS = (
+    ("x", np.int16, 1),
+    ("score", np.int32, 1),
+    ("lives", np.int8, 1),
+)
+TEAR_COLUMNS = (
+    ("x", np.uint16, 1),
+    ("y", np.int16, 4),
+    ("vy", np.uint16, 16),  # up to 4095 px/tick: repeated laps keep speeding the tears up
+    ("kind", np.uint8, 1),
+    ("color", np.uint8, 1),
+)
+
+def parse_address(text, default_host="127.0.0.1"):
+    """Split ``[HOST:]PORT`` into ``(host, port)``."""
+    host, _, port = text.rpartition(":")
+    return host or default_host, int(port)
+
+def state_columns(sim):
+    """Quantise the players and tears of ``sim`` into integer columns."""
+    players = (sim.player_x, sim.player_score, sim.player_lives)
+    columns = [np.asarray(values).astype(dtype) for values, (_, dtype, _) in zip(players, PLAYER_COLUMNS)]
+    tears = sim.tears
+    n = tears.count
+    for values, (_, dtype, scale) in zip((tears.x[:n], tears.y[:n], tears.vy[:n], tears.kind[:n],
+                                          tears.color[:n]), TEAR_COLUMNS):
+        if scale != 1:
+            values = np.round(values * scale)
+        info = np.iinfo(dtype)
+        # Out of range values are clamped: off-field positions stay off the field, and a tear faster
+        # than the vy column allows crosses the whole field within a tick at the clamped speed too
+        columns.append(np.clip(values, info.min, info.max).astype(dtype))
+    return columns
+
+def _aligned(previous, column):
+    """``previous`` cut or zero-padded to the length of ``column``."""
+    if previous is None:
+        return np.zeros_like(column)
+    if previous.size >= column.size:
+        return previous[:column.size]
+    return np.concatenate((previous, np.zeros(column.size - previous.size, dtype=column.dtype)))
+
+def encode_delta(columns, previous=None):
+    """Compress ``columns`` as their difference from ``previous`` (a keyframe when None)."""
+    parts = []
+    for i, column in enumerate(columns):
+        base = _aligned(None if previous is None else previous[i], column)
+        # Integer subtraction wraps around, and decoding adds it back the same way
+        parts.append((column - base).tobytes())
+    return zlib.compress(b"".join(parts), COMPRESS_LEVEL)
+
+def decode_delta(data, players, tears, previous=None):
+    """Rebuild the columns of a snapshot from ``encode_delta`` output."""
+    raw = zlib.decompress(data)
+    columns = []
+    offset = 0
+    specs = [(dtype, players) for _, dtype, _ in PLAYER_COLUMNS] + [(dtype, tears) for _, dtype, _ in TEAR_COLUMNS]
+    for i, (dtype, count) in enumerate(specs):
+        delta = np.frombuffer(raw, dtype=dtype, count=count, offset=offset)
+        offset += delta.nbytes
+        base = _aligned(None if previous is None else previous[i], delta)
+        columns.append(base + delta)
+    return columns
+
+class Snapshot:
+    """One decoded tick as seen by a client."""
+
+    __slots__ = ("tick", "state", "received", "columns")
+
+    def __init__(self, tick, state, received, columns):
+        self.tick = tick
+        self.state = state
+        self.received = received
+        self.columns = columns
+
+    def player(self, name):
+        return self.columns[[column for column, _, _ in PLAYER_COLUMNS].index(name)].tolist()
+
+    def tears(self):
+        """Return ``{column: float array}`` for the tears, scaled back to game units."""
+        offset = len(PLAYER_COLUMNS)
+        return {name: self.columns[offset + i].astype(np.float64) / scale
+                for i, (name, _, scale) in enumerate(TEAR_COLUMNS)}
+
+def _frame(payload):
+    return _FRAME.pack(len(payload)) + payload
+
+class _Peer:
+    __slots__ = ("writer", "baseline", "bytes_sent", "player")
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.baseline = None
+        self.bytes_sent = 0
+        self.player = None
+
+class StateServer:
+    """Streams simulation snapshots to every connected client."""
+
+    def __init__(self, host, port, config=None, remote_slots=()):
+        self.host = host
+        self.port = port
+        self.config = config or {}
+        self.free_slots = list(remote_slots)
+        self.remote_inputs = {}
+        self.peers = []
+        self.loop = None
+        self._thread = None
+        self._server = None
+        self._ready = threading.Event()
+
+        self._previous = None
+        self._previous_tick = None
+        self._last = None
+        self.encode_seconds = 0.0
+        self.encoded_ticks = 0
+        self._stats_bytes = 0
+        self._stats_start = time.perf_counter()
+
+    def start(self):
+        """Start listening on a background thread; return once the port is bound."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="state-server", daemon=True)
+            self._thread.start()
+            self._ready.wait()
+
+    def stop(self):
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join()
+            self._thread = None
+            self.loop = None
+
+    def inputs(self):
+        """Combined input bitmask of the remote players."""
+        mask = 0
+        # Copied first: the server thread adds and removes players
+        for player, bits in list(self.remote_inputs.items()):
+            mask |= bits << (INPUT_BITS * player)
+        return mask
+
+    def publish(self, sim, state):
+        """Encode the current tick of ``sim`` and queue it for every client.
+
+        Safe to call from any thread; the encoding runs on the caller's.
+        """
+        if self.loop is None:
+            return
+        start = time.perf_counter()
+        columns = state_columns(sim)
+        header = (sim.tick, state, sim.players, sim.tears.count)
+        # Kept for clients that connect while nothing is being published (e.g. after game over)
+        self._last = (header, columns)
+        if not self.peers:
+            self._previous = None
+            return
+        delta = encode_delta(columns, self._previous) if self._previous is not None else None
+        self.encode_seconds += time.perf_counter() - start
+        self.encoded_ticks += 1
+        self.loop.call_soon_threadsafe(self._broadcast, header, columns, delta, self._previous_tick)
+        self._previous = columns
+        self._previous_tick = sim.tick
+
+    def _broadcast(self, header, columns, delta, base_tick):
+        tick = header[0]
+        keyframe = None
+        for peer in self.peers:
+            transport = peer.writer.transport
+            if transport.is_closing() or transport.get_write_buffer_size() > MAX_CLIENT_BUFFER:
+                # Backed up: skip this tick; the client resyncs with a keyframe later
+                continue
+            if delta is not None and peer.baseline == base_tick:
+                message = _frame(SNAPSHOT_HEADER.pack(b"D", *header) + delta)
+            else:
+                if keyframe is None:
+                    start = time.perf_counter()
+                    keyframe = _frame(SNAPSHOT_HEADER.pack(b"K", *header) + encode_delta(columns))
+                    self.encode_seconds += time.perf_counter() - start
+                message = keyframe
+            peer.writer.write(message)
+            peer.baseline = tick
+            peer.bytes_sent += len(message)
+            self._stats_bytes += len(message)
+        self._report()
+
+    def _report(self):
+        elapsed = time.perf_counter() - self._stats_start
+        if elapsed < STATS_INTERVAL:
+            return
+        if self.peers and self.encoded_ticks:
+            per_client = self._stats_bytes / elapsed / len(self.peers)
+            encode_ms = self.encode_seconds * 1000.0 / self.encoded_ticks
+            print(f"Streaming to {len(self.peers)} clients: {per_client / 1024:.2f} KB/s per client, "
+                  f"encode {encode_ms:.3f} ms/tick")
+        self._stats_bytes = 0
+        self.encode_seconds = 0.0
+        self.encoded_ticks = 0
+        self._stats_start = time.perf_counter()
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            self._server = self.loop.run_until_complete(asyncio.start_server(self._serve, self.host, self.port))
+            self.port = self._server.sockets[0].getsockname()[1]
+        except OSError as e:
+            print(f"Could not listen on {self.host}:{self.port}: {e}")
+            self.loop = None
+            self._ready.set()
+            return
+        print(f"Serving game state on {self.host}:{self.port}")
+        self._ready.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            self._server.close()
+            for peer in self.peers:
+                peer.writer.close()
+
+    async def _serve(self, reader, writer):
+        peer = _Peer(writer)
+        writer.transport.set_write_buffer_limits(high=MAX_CLIENT_BUFFER)
+        self._send_hello(peer)
+        if self._last is not None:
+            header, columns = self._last
+            writer.write(_frame(SNAPSHOT_HEADER.pack(b"K", *header) + encode_delta(columns)))
+            peer.baseline = header[0]
+        self.peers.append(peer)
+        try:
+            while True:
+                (length,) = _FRAME.unpack(await reader.readexactly(_FRAME.size))
+                message = await reader.readexactly(length)
+                kind = message[:1]
+                if kind == b"J" and peer.player is None and self.free_slots:
+                    peer.player = self.free_slots.pop(0)
+                    self.remote_inputs[peer.player] = 0
+                    self._send_hello(peer)
+                elif kind == b"I" and peer.player is not None:
+                    self.remote_inputs[peer.player] = message[1] & ((1 << INPUT_BITS) - 1)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.peers.remove(peer)
+            if peer.player is not None:
+                self.remote_inputs.pop(peer.player, None)
+                self.free_slots.insert(0, peer.player)
+            writer.close()
+
+    def _send_hello(self, peer):
+        hello = {"config": self.config, "tick_rate": TICK_RATE, "player": peer.player}
+        peer.writer.write(_frame(b"H" + json.dumps(hello).encode()))
+
+class StateClient:
+    """Receives snapshots from a ``StateServer`` on a background thread.
+
+    ``snapshots`` keeps the most recent decoded ticks, oldest first.
+    """
+
+    def __init__(self, host, port, join=False, history=32):
+        self.host = host
+        self.port = port
+        self.join = join
+        self.hello = None
+        self.player = None
+        self.snapshots = collections.deque(maxlen=history)
+        self.connected = threading.Event()
+        self.closed = False
+        self.error = None
+        self.bytes_received = 0
+        self.loop = None
+        self._writer = None
+        self._thread = None
+        self._inputs = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="state-client", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        if self.loop is not None and self.loop.is_running():
+            self.loop.call_soon_threadsafe(self._close)
+        if self._thread is not None:
+            self._thread.join(1.0)
+            self._thread = None
+
+    def send_inputs(self, bits):
+        """Send this client's input bits when they changed and it holds a player slot."""
+        if self.player is None or bits == self._inputs or self.loop is None:
+            return
+        self._inputs = bits
+        self.loop.call_soon_threadsafe(self._send, b"I" + bytes((bits,)))
+
+    def _send(self, payload):
+        if self._writer is not None and not self._writer.transport.is_closing():
+            self._writer.write(_frame(payload))
+
+    def _close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        try:
+            self.loop.run_until_complete(self._receive())
+        except (OSError, asyncio.IncompleteReadError, ConnectionError) as e:
+            self.error = e
+        finally:
+            self.closed = True
+            self.connected.set()
+            self.loop.close()
+
+    async def _receive(self):
+        reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        if self.join:
+            self._send(b"J")
+        previous = None
+        while True:
+            header = await reader.read(_FRAME.size)
+            if not header:
+                return
+            if len(header) < _FRAME.size:
+                header += await reader.readexactly(_FRAME.size - len(header))
+            (length,) = _FRAME.unpack(header)
+            message = await reader.readexactly(length)
+            self.bytes_received += _FRAME.size + length
+            kind = message[:1]
+            if kind == b"H":
+                self.hello = json.loads(message[1:])
+                self.player = self.hello["player"]
+                self.connected.set()
+            elif kind in (b"K", b"D"):
+                _, tick, state, players, tears = SNAPSHOT_HEADER.unpack_from(message)
+                base = previous if kind == b"D" else None
+                columns = decode_delta(message[SNAPSHOT_HEADER.size:], players, tears, base)
+                previous = columns
+                self.snapshots.append(Snapshot(tick, state, time.perf_counter(), columns))
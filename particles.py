@@ -0,0 +1,144 @@
+"""Particle emitters and the bounded pool they fill.
+
+``ParticleSystem`` owns an ``EntityPool`` that never grows past its
+capacity and a list of emitters. ``update`` runs once per simulation
+tick: every emitter adds its particles, then the whole pool is
+integrated and the dead are dropped, all as NumPy array operations.
+Drawing is separate (``Particle.draw_all`` in catch_game.py), so
+particles move at the tick rate however fast frames are drawn.
+"""
+
+import numpy as np
+
+from entities import EntityPool
+
+MAX_PARTICLES = 20000
+PARTICLE_MIN_SIZE = 2
+PARTICLE_MAX_SIZE = 6
+
+class ParticleSystem:
+    def __init__(self, capacity=MAX_PARTICLES, gravity=0.0):
+        self.pool = EntityPool(capacity=capacity, gravity=gravity)
+        self.capacity = capacity
+        # Quality levels lower the limit; spawns beyond it are dropped
+        self.limit = capacity
+        self.emitters = []
+
+    @property
+    def count(self):
+        return self.pool.count
+
+    def room(self):
+        return max(0, min(self.limit, self.capacity) - self.pool.count)
+
+    def emit(self, x, y, vx, vy, life, size, color):
+        """Add particles from per-particle arrays, dropping those that do not fit."""
+        x = np.asarray(x, dtype=np.float64)
+        n = min(x.size, self.room())
+        if n <= 0:
+            return 0
+        self.pool.spawn_many(x[:n], _head(y, n), _head(vx, n), _head(vy, n), life, _head(size, n), _head(color, n))
+        return n
+
+    def burst(self, x, y, color, count, life):
+        """Spray ``count`` particles up and out from one point."""
+        count = min(count, self.room())
+        if count <= 0:
+            return 0
+        return self.emit(np.full(count, x, dtype=np.float64), y,
+                         vx=np.random.uniform(-3, 3, count),
+                         vy=np.random.uniform(-5, -1, count),
+                         life=life,
+                         size=np.random.randint(PARTICLE_MIN_SIZE, PARTICLE_MAX_SIZE + 1, count),
+                         color=color)
+
+    def add(self, emitter):
+        self.emitters.append(emitter)
+        return emitter
+
+    def update(self):
+        """Run the emitters, then advance every particle one tick."""
+        if self.emitters:
+            self.emitters = [emitter for emitter in self.emitters if emitter.emit(self)]
+        self.pool.update()
+        self.pool.remove_dead()
+
+    def clear(self):
+        """Drop every particle and emitter."""
+        self.pool.clear()
+        self.emitters = []
+
+def _head(values, n):
+    """First ``n`` entries of a per-particle array; scalars pass through."""
+    return values[:n] if np.ndim(values) else values
+
+class ContinuousEmitter:
+    """``rate`` particles per tick (fractions carry over) around a point.
+
+    Runs for ``ticks`` ticks, or until removed when ``ticks`` is None.
+    """
+
+    def __init__(self, x, y, color, rate, life, ticks=None, spread=10.0, speed=2.0):
+        self.x = x
+        self.y = y
+        self.color = color
+        self.rate = rate
+        self.life = life
+        self.ticks = ticks
+        self.spread = spread
+        self.speed = speed
+        self._due = 0.0
+
+    def emit(self, system):
+        self._due += self.rate
+        count = int(self._due)
+        self._due -= count
+        if count:
+            angle = np.random.uniform(0, 2 * np.pi, count)
+            speed = np.random.uniform(0.2, 1.0, count) * self.speed
+            system.emit(self.x + np.random.uniform(-self.spread, self.spread, count),
+                        self.y + np.random.uniform(-self.spread, self.spread, count) / 2,
+                        vx=np.cos(angle) * speed,
+                        vy=np.sin(angle) * speed - self.speed,
+                        life=self.life,
+                        size=np.random.randint(PARTICLE_MIN_SIZE, PARTICLE_MAX_SIZE + 1, count),
+                        color=self.color)
+        if self.ticks is None:
+            return True
+        self.ticks -= 1
+        return self.ticks > 0
+
+class TrailEmitter:
+    """Particles shed behind every entity of ``kinds`` in another pool, e.g. falling tears.
+
+    Each matching entity sheds a particle with probability ``rate`` per
+    tick from its top edge; the trail stays behind as the entity falls.
+    """
+
+    def __init__(self, source, kinds, color, rate, life):
+        self.source = source
+        # Entity kinds are int8, so a 256 entry table covers every value
+        self.kinds = np.zeros(256, dtype=bool)
+        self.kinds[list(kinds)] = True
+        self.color = color
+        self.rate = rate
+        self.life = life
+
+    def emit(self, system):
+        source = self.source
+        n = source.count
+        if not n or self.rate <= 0:
+            return True
+        matching = self.kinds[source.kind[:n].astype(np.uint8)]
+        shed = np.flatnonzero(matching & (np.random.random(n) < self.rate))
+        if shed.size:
+            count = shed.size
+            half = source.size[shed] / 2
+            system.emit(source.x[shed] + np.random.uniform(-0.3, 0.3, count) * half,
+                        source.y[shed] - half,
+                        vx=np.random.uniform(-0.4, 0.4, count),
+                        vy=np.random.uniform(-1.5, -0.5, count),
+                        life=self.life,
+                        size=np.random.randint(PARTICLE_MIN_SIZE, PARTICLE_MIN_SIZE + 2, count),
+                        color=self.color)
+        return True
@@ -0,0 +1,238 @@
+"""Frame-time profiler and instrumentation overlay for the catch game.
+
+While enabled, ``FrameProfiler`` wraps the game's per-frame methods on
+the instance with timers and records one row per frame into a fixed-size
+ring buffer: exclusive time per phase, entity counts and allocations.
+Disabling it removes the wrappers again, so the only cost left in the
+frame loop is a single ``enabled`` check.
+
+Wrapped methods called from any other thread, i.e. the threaded mode's
+simulation steps, skip the phase timers of the frame loop; the ``sim
+thread`` column holds the time of those calls that finished during the
+frame. Surfaces are counted where the game creates them, through
+``new_surface`` and ``count_surfaces``.
+"""
+
+import csv
+import json
+import sys
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import pygame
+
+# Game method -> phase label, in display order
+PHASES = (
+    ("handle_events", "events"),
+    ("update_game", "update"),
+    ("draw_animated_background", "background"),
+    ("draw_floating_tears", "floating tears"),
+    ("draw_welcome_screen", "welcome"),
+    ("draw_game_screen", "game screen"),
+    ("draw_ui", "hud"),
+    ("draw_game_over_screen", "game over"),
+    ("draw_profiler_overlay", "overlay"),
+    ("present", "flip"),
+    ("wait_frame", "idle"),
+)
+COUNTERS = ("tears", "particles", "quality", "surfaces", "py_blocks")
+RING_SIZE = 600
+STATS_INTERVAL = 30
+GRAPH_BUDGET_MS = 1000.0 / 60
+
+THREAD_LABEL = "sim thread"
+
+surfaces_created = 0
+
+def count_surfaces(count=1):
+    """Note surfaces pygame made for the game, e.g. rendered text or a scaled copy."""
+    global surfaces_created
+    surfaces_created += count
+
+def new_surface(*args, **kwargs):
+    """``pygame.Surface(*args, **kwargs)``, counted for the profiler."""
+    global surfaces_created
+    surfaces_created += 1
+    return pygame.Surface(*args, **kwargs)
+
+class FrameProfiler:
+    def __init__(self, capacity=RING_SIZE):
+        self.capacity = capacity
+        self.labels = [label for _, label in PHASES] + [THREAD_LABEL, "frame"]
+        self.columns = self.labels + list(COUNTERS)
+        self.ring = np.zeros((capacity, len(self.columns)))
+        self.frames = 0
+        self.enabled = False
+        self.overlay = None
+
+        self._game = None
+        self._current = np.zeros(len(self.columns))
+        self._stack = []
+        self._frame_start = 0.0
+        self._blocks = 0
+        self._surfaces = 0
+        self._owner = None
+        # Times of wrapped calls made on other threads, drained by end_frame
+        self._thread_steps = deque()
+        self._stats = None
+
+    def enable(self, game):
+        if self.enabled:
+            return
+        self._game = game
+        self._owner = threading.get_ident()
+        for index, (method, _) in enumerate(PHASES):
+            setattr(game, method, self._wrap(index, getattr(game, method)))
+        self._thread_steps.clear()
+        self.enabled = True
+
+    def disable(self):
+        if not self.enabled:
+            return
+        for method, _ in PHASES:
+            # Drop the instance attribute so the class method shows through again
+            self._game.__dict__.pop(method, None)
+        self.enabled = False
+        self.overlay = None
+
+    def toggle(self, game):
+        if self.enabled:
+            self.disable()
+        else:
+            self.enable(game)
+
+    def _wrap(self, index, method):
+        current = self._current
+        stack = self._stack
+        steps = self._thread_steps
+        clock = time.perf_counter
+        get_ident = threading.get_ident
+
+        def timed(*args, **kwargs):
+            start = clock()
+            if get_ident() != self._owner:
+                try:
+                    return method(*args, **kwargs)
+                finally:
+                    steps.append(clock() - start)
+            stack.append(0.0)
+            try:
+                return method(*args, **kwargs)
+            finally:
+                elapsed = clock() - start
+                children = stack.pop()
+                current[index] += elapsed - children
+                if stack:
+                    stack[-1] += elapsed
+        return timed
+
+    def begin_frame(self):
+        self._current[:] = 0.0
+        self._frame_start = time.perf_counter()
+        self._blocks = sys.getallocatedblocks()
+        self._surfaces = surfaces_created
+
+    def end_frame(self, tears=0, particles=0, quality=0):
+        row = self._current
+        phase_count = len(PHASES)
+        row[:phase_count] *= 1000.0
+        steps = self._thread_steps
+        thread = 0.0
+        while steps:
+            thread += steps.popleft()
+        row[phase_count] = thread * 1000.0
+        row[phase_count + 1] = (time.perf_counter() - self._frame_start) * 1000.0
+        row[phase_count + 2:] = (tears, particles, quality, surfaces_created - self._surfaces,
+                                 sys.getallocatedblocks() - self._blocks)
+        self.ring[self.frames % self.capacity] = row
+        self.frames += 1
+        if self.frames % STATS_INTERVAL == 0:
+            self._stats = None
+            self.overlay = None
+
+    def recorded(self):
+        """Return the ring rows in chronological order."""
+        if self.frames <= self.capacity:
+            return self.ring[:self.frames]
+        start = self.frames % self.capacity
+        return np.concatenate((self.ring[start:], self.ring[:start]))
+
+    def stats(self):
+        """Per-column p50/p95/p99 and mean over the frames in the ring."""
+        if self._stats is None:
+            rows = self.recorded()
+            if not len(rows):
+                return {}
+            p50, p95, p99 = np.percentile(rows, (50, 95, 99), axis=0)
+            means = rows.mean(axis=0)
+            self._stats = {name: (means[i], p50[i], p95[i], p99[i]) for i, name in enumerate(self.columns)}
+        return self._stats
+
+    def draw_overlay(self, screen, text_cache):
+        """Draw the stats panel and frame-time graph in the top-left corner."""
+        if self.overlay is None:
+            self.overlay = self._render_overlay(text_cache)
+        if self.overlay is not None:
+            screen.blit(self.overlay, (10, 80))
+
+    def _render_overlay(self, text_cache):
+        stats = self.stats()
+        if not stats:
+            return None
+        frame = stats["frame"]
+        fps = 1000.0 / frame[0] if frame[0] else 0.0
+        # Each row is a label followed by right-aligned numeric columns
+        rows = [(f"{fps:.1f} fps, frame p50 {frame[1]:.2f} / p99 {frame[3]:.2f} ms",),
+                ("phase (ms)", "mean", "p50", "p95", "p99")]
+        for label in self.labels[:-1]:
+            mean, p50, p95, p99 = stats[label]
+            if p99 > 0:
+                rows.append((label, f"{mean:.2f}", f"{p50:.2f}", f"{p95:.2f}", f"{p99:.2f}"))
+        rows.append(("  ".join(f"{name} {stats[name][0]:.0f}" for name in COUNTERS),))
+
+        line_height = 16
+        graph_height = 60
+        width = 360
+        column_right = (170, 218, 266, 314)
+        height = len(rows) * line_height + graph_height + 16
+        panel = new_surface((width, height), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 170))
+        for i, row in enumerate(rows):
+            y = 4 + i * line_height
+            panel.blit(text_cache.render(row[0], 18, (255, 255, 255)), (6, y))
+            for right, cell in zip(column_right, row[1:]):
+                text = text_cache.render(cell, 18, (255, 255, 255))
+                panel.blit(text, (right - text.get_width(), y))
+
+        # Frame-time graph: one column per recorded frame, budget line at 60 FPS
+        times = self.recorded()[-(width - 12):, self.labels.index("frame")]
+        top = height - graph_height - 6
+        scale = graph_height / (2 * GRAPH_BUDGET_MS)
+        for x, ms in enumerate(times):
+            bar = min(graph_height, int(ms * scale))
+            color = (120, 220, 120) if ms <= GRAPH_BUDGET_MS else (240, 90, 90)
+            pygame.draw.line(panel, color, (6 + x, top + graph_height), (6 + x, top + graph_height - bar))
+        budget_y = top + graph_height - int(GRAPH_BUDGET_MS * scale)
+        pygame.draw.line(panel, (255, 255, 255), (6, budget_y), (width - 6, budget_y))
+        return panel
+
+    def dump(self, path):
+        """Write the ring to ``path`` as CSV or JSON, chosen by extension."""
+        rows = self.recorded()
+        if path.endswith(".json"):
+            with open(path, "w") as f:
+                json.dump({
+                    "columns": self.columns,
+                    "units": "ms for phases and frame, counts otherwise",
+                    "stats": {name: dict(zip(("mean", "p50", "p95", "p99"), map(float, values)))
+                              for name, values in self.stats().items()},
+                    "frames": rows.tolist(),
+                }, f)
+        else:
+            with open(path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(self.columns)
+                writer.writerows(rows.tolist())
+        print(f"Wrote {len(rows)} profiled frames to {path}")
@@ -0,0 +1,88 @@
+"""Adaptive quality levels that keep the frame rate at its target.
+
+``QualityGovernor`` is fed the frame time returned by ``Clock.tick`` and
+the busy part of it, before the game waits for the next frame, once per
+frame. When frames run over budget for a while it steps one level down;
+once there has been plenty of headroom for longer it steps back up.
+Gameplay runs on a fixed timestep, so quality only changes how much is
+drawn, never how fast the game plays.
+"""
+
+import collections
+
+# Highest quality first. Each level sets the knobs the game reads:
+#   particle_cap      live particles kept at most; "high" allows the whole pool,
+#                     whose densest clouds are drawn by the splat renderer
+#   particle_life     ticks a new particle lives
+#   trail_rate        chance per tick that a red tear sheds a trail particle
+#   glow_layers       glow rings around red tears (0-3)
+#   floating_tears    decorative tears on the welcome screen
+#   sparkles          sparkles on the welcome screen
+#   background_pixel  cell size of the welcome background wave
+QUALITY_LEVELS = (
+    {"name": "high", "particle_cap": 20000, "particle_life": 60, "trail_rate": 0.5, "glow_layers": 3,
+     "floating_tears": 8, "sparkles": 15, "background_pixel": 8},
+    {"name": "medium", "particle_cap": 600, "particle_life": 45, "trail_rate": 0.3, "glow_layers": 2,
+     "floating_tears": 6, "sparkles": 10, "background_pixel": 8},
+    {"name": "low", "particle_cap": 200, "particle_life": 30, "trail_rate": 0.15, "glow_layers": 1,
+     "floating_tears": 4, "sparkles": 5, "background_pixel": 16},
+    {"name": "minimal", "particle_cap": 60, "particle_life": 20, "trail_rate": 0, "glow_layers": 0,
+     "floating_tears": 0, "sparkles": 0, "background_pixel": 32},
+)
+QUALITY_NAMES = tuple(level["name"] for level in QUALITY_LEVELS)
+
+WINDOW_FRAMES = 60        # frames averaged before deciding
+DOWNGRADE_RATIO = 1.15    # step down when frames average this much over budget
+UPGRADE_RATIO = 0.6       # step up when busy time stays under this share of budget
+UPGRADE_FRAMES = 180      # ...for this many frames in a row
+MAX_UPGRADE_FRAMES = 3600 # upgrades that had to be undone double the wait up to this
+
+class QualityGovernor:
+    def __init__(self, fps, level=0, adaptive=True, levels=QUALITY_LEVELS):
+        self.budget_ms = 1000.0 / fps
+        self.levels = levels
+        self.level = level
+        self.adaptive = adaptive
+        self.changes = 0
+        self._frames = collections.deque(maxlen=WINDOW_FRAMES)
+        self._headroom_frames = 0
+        self._upgrade_frames = UPGRADE_FRAMES
+        self._last_change = 0
+
+    @property
+    def settings(self):
+        return self.levels[self.level]
+
+    @property
+    def name(self):
+        return self.settings["name"]
+
+    def observe(self, frame_ms, busy_ms):
+        """Record one frame; return True when the level changed."""
+        if not self.adaptive:
+            return False
+        self._frames.append(frame_ms)
+        if busy_ms < self.budget_ms * UPGRADE_RATIO:
+            self._headroom_frames += 1
+        else:
+            self._headroom_frames = 0
+
+        if len(self._frames) == self._frames.maxlen:
+            average = sum(self._frames) / len(self._frames)
+            if average > self.budget_ms * DOWNGRADE_RATIO and self.level < len(self.levels) - 1:
+                if self._last_change < 0:
+                    # The last upgrade did not hold, so wait longer before the next one
+                    self._upgrade_frames = min(self._upgrade_frames * 2, MAX_UPGRADE_FRAMES)
+                return self._set(self.level + 1)
+        if self._headroom_frames >= self._upgrade_frames and self.level > 0:
+            return self._set(self.level - 1)
+        return False
+
+    def _set(self, level):
+        self._last_change = level - self.level
+        self.level = level
+        self.changes += 1
+        # Judge the new level on its own frames only
+        self._frames.clear()
+        self._headroom_frames = 0
+        return True
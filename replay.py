@@ -0,0 +1,271 @@
+"""Deterministic input recording and replay of catch game sessions.
+
+A replay stores the session's RNG seed, its non-default ``SimConfig``
+settings and the per-tick input bitmask as run-length-encoded records,
+plus a full ``Simulation.snapshot`` every ``SNAPSHOT_INTERVAL`` ticks so
+playback can seek without re-simulating from tick 0.
+
+The config only names the wave file, so the header also holds the digest
+of the waves the session was played with; a replay whose wave file has
+since changed is refused rather than played into a different game.
+
+File layout (little endian)::
+
+    b"TEARREP" version:u8 seed:u64 tick_rate:u16 config_len:u32 config_json
+    waves_digest:32 bytes (zero for the classic spawner; version 3 on)
+    records:
+        b"I" run_length:varint inputs:varint
+        b"S" tick:u32 size:u32 zlib(snapshot)
+        b"E" ticks:u32 score:i64 lives:i64
+
+Inputs hold two bits per player; version 1 files stored them as a u8.
+Version 1 and 2 files have no wave digest and are played unchecked.
+Snapshots before version 4 store an extra ``phase`` column per tear.
+The end record holds the score and lives summed over all players.
+
+Play a replay headless at full speed with ``python replay.py FILE``, or
+rendered with ``python catch_game.py --replay FILE``.
+"""
+
+import argparse
+import bisect
+import json
+import struct
+import time
+import zlib
+
+from entities import EntityPool
+from simulation import TICK_RATE, SimConfig, Simulation
+from waves import WaveError, load_waves
+
+MAGIC = b"TEARREP"
+FORMAT_VERSION = 4
+SNAPSHOT_INTERVAL = 30 * TICK_RATE
+
+_HEADER = struct.Struct("<BQHI")
+_SNAPSHOT = struct.Struct("<II")
+_END = struct.Struct("<Iqq")
+_NO_WAVES = bytes(32)
+
+class ReplayError(Exception):
+    pass
+
+def waves_digest(config):
+    """Digest of the waves ``config`` spawns from, or zeros for the classic spawner."""
+    return load_waves(config.waves).digest if config.waves else _NO_WAVES
+
+def _write_varint(f, value):
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            f.write(bytes((byte | 0x80,)))
+        else:
+            f.write(bytes((byte,)))
+            return
+
+def _read_varint(data, offset):
+    value = 0
+    shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, offset
+        shift += 7
+
+class ReplayRecorder:
+    """Write the inputs of one simulation session to a replay file.
+
+    Call ``record(inputs)`` with the bitmask for every tick just before it
+    is passed to ``sim.step`` and ``close()`` when the session ends. With
+    ``exclusive`` an existing file at ``path`` raises ``FileExistsError``
+    instead of being overwritten.
+    """
+
+    def __init__(self, path, sim, snapshot_interval=SNAPSHOT_INTERVAL, exclusive=False):
+        self.path = path
+        self.sim = sim
+        self.snapshot_interval = snapshot_interval
+        self._run_inputs = None
+        self._run_length = 0
+        self._file = open(path, "xb" if exclusive else "wb")
+
+        config = json.dumps(sim.config.overrides(), sort_keys=True).encode()
+        self._file.write(MAGIC + _HEADER.pack(FORMAT_VERSION, sim.seed, TICK_RATE, len(config)) + config)
+        self._file.write(waves_digest(sim.config))
+        if sim.tick:
+            self._write_snapshot()
+
+    def record(self, inputs):
+        if self.sim.tick and self.sim.tick % self.snapshot_interval == 0:
+            self._flush_run()
+            self._write_snapshot()
+        if inputs == self._run_inputs:
+            self._run_length += 1
+        else:
+            self._flush_run()
+            self._run_inputs = inputs
+            self._run_length = 1
+
+    def close(self):
+        if self._file is None:
+            return
+        self._flush_run()
+        self._file.write(b"E" + _END.pack(self.sim.tick, self.sim.total_score, self.sim.total_lives))
+        self._file.close()
+        self._file = None
+
+    def _flush_run(self):
+        if self._run_length:
+            self._file.write(b"I")
+            _write_varint(self._file, self._run_length)
+            _write_varint(self._file, self._run_inputs)
+        self._run_inputs = None
+        self._run_length = 0
+
+    def _write_snapshot(self):
+        data = zlib.compress(self.sim.snapshot())
+        self._file.write(b"S" + _SNAPSHOT.pack(self.sim.tick, len(data)) + data)
+
+class Replay:
+    """A loaded replay: input runs plus seekable state snapshots."""
+
+    def __init__(self, seed, config, run_starts, run_inputs, snapshots, length, final=None,
+                 version=FORMAT_VERSION):
+        self.seed = seed
+        self.config = config
+        self.run_starts = run_starts
+        self.run_inputs = run_inputs
+        self.snapshots = snapshots
+        self.length = length
+        self.final = final
+        self.version = version
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        if not data.startswith(MAGIC):
+            raise ReplayError(f"{path} is not a replay file")
+        offset = len(MAGIC)
+        version, seed, tick_rate, config_len = _HEADER.unpack_from(data, offset)
+        if not 1 <= version <= FORMAT_VERSION:
+            raise ReplayError(f"Unsupported replay version {version}")
+        if tick_rate != TICK_RATE:
+            raise ReplayError(f"Replay was recorded at {tick_rate} ticks/s, expected {TICK_RATE}")
+        offset += _HEADER.size
+        config = SimConfig(**json.loads(data[offset:offset + config_len]))
+        offset += config_len
+        if version >= 3:
+            recorded = data[offset:offset + len(_NO_WAVES)]
+            offset += len(_NO_WAVES)
+            try:
+                current = waves_digest(config)
+            except WaveError as e:
+                raise ReplayError(f"{path} needs its wave file: {e}")
+            if current != recorded:
+                raise ReplayError(f"{path} was recorded with a different version of {config.waves or 'the spawner'}")
+
+        run_starts = []
+        run_inputs = []
+        snapshots = []
+        tick = 0
+        final = None
+        while offset < len(data):
+            tag = data[offset:offset + 1]
+            offset += 1
+            if tag == b"I":
+                length, offset = _read_varint(data, offset)
+                run_starts.append(tick)
+                if version == 1:
+                    inputs = data[offset]
+                    offset += 1
+                else:
+                    inputs, offset = _read_varint(data, offset)
+                run_inputs.append(inputs)
+                tick += length
+            elif tag == b"S":
+                snapshot_tick, size = _SNAPSHOT.unpack_from(data, offset)
+                offset += _SNAPSHOT.size
+                snapshots.append((snapshot_tick, data[offset:offset + size]))
+                offset += size
+            elif tag == b"E":
+                final = _END.unpack_from(data, offset)
+                offset += _END.size
+            else:
+                raise ReplayError(f"Corrupt replay record {tag!r} at byte {offset - 1}")
+        # A recording cut off before close() is still playable up to its last run
+        return cls(seed, config, run_starts, run_inputs, snapshots, tick, final, version)
+
+    def inputs_at(self, tick):
+        """Input bitmask passed to the step that advances ``tick`` to ``tick + 1``."""
+        index = bisect.bisect_right(self.run_starts, tick) - 1
+        return self.run_inputs[index] if index >= 0 else 0
+
+    def input_stream(self, start_tick=0):
+        """Yield the input bitmask for every tick from ``start_tick`` to the end."""
+        index = max(0, bisect.bisect_right(self.run_starts, start_tick) - 1)
+        tick = start_tick
+        for run in range(index, len(self.run_starts)):
+            end = self.run_starts[run + 1] if run + 1 < len(self.run_starts) else self.length
+            inputs = self.run_inputs[run]
+            while tick < end:
+                yield inputs
+                tick += 1
+
+    def simulation(self, tick=0):
+        """Return a Simulation positioned at ``tick``, restored from the nearest snapshot."""
+        tick = max(0, min(tick, self.length))
+        sim = Simulation(self.seed, self.config)
+        index = bisect.bisect_right([t for t, _ in self.snapshots], tick) - 1
+        if index >= 0:
+            tear_fields = EntityPool.LEGACY_FIELDS if self.version < 4 else None
+            sim.restore(zlib.decompress(self.snapshots[index][1]), tear_fields)
+        for inputs in self.input_stream(sim.tick):
+            if sim.tick >= tick:
+                break
+            sim.step(inputs)
+        return sim
+
+    def play(self, sim):
+        """Run ``sim`` headless through the rest of the recorded inputs."""
+        for inputs in self.input_stream(sim.tick):
+            sim.step(inputs)
+        return sim
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded catch game session headless.")
+    parser.add_argument("replay", help="replay file")
+    parser.add_argument("--seek", type=float, default=0.0, help="start from this many seconds in")
+    args = parser.parse_args()
+
+    replay = Replay.load(args.replay)
+    start = time.perf_counter()
+    sim = replay.simulation(int(args.seek * TICK_RATE))
+    seek_time = time.perf_counter() - start
+    start_tick = sim.tick
+    start = time.perf_counter()
+    replay.play(sim)
+    elapsed = time.perf_counter() - start
+
+    print(f"Seed {replay.seed}, {replay.length} ticks ({replay.length / TICK_RATE:.1f}s), "
+          f"{len(replay.snapshots)} snapshots")
+    print(f"Seeked to tick {start_tick} in {seek_time * 1000:.1f} ms")
+    ticks = sim.tick - start_tick
+    if elapsed > 0:
+        print(f"Simulated {ticks} ticks in {elapsed:.3f}s ({ticks / elapsed:.0f} ticks/s)")
+    if sim.players > 1:
+        for player in range(sim.players):
+            print(f"Player {player + 1}: score {sim.player_score[player]}, lives {sim.player_lives[player]}")
+    print(f"Final score {sim.total_score}, lives {sim.total_lives}")
+    if replay.final is not None:
+        recorded = tuple(replay.final)
+        matches = recorded == (sim.tick, sim.total_score, sim.total_lives)
+        print(f"Recorded end state {recorded}: {'match' if matches else 'MISMATCH'}")
+        if not matches:
+            raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,321 @@
+"""Headless, fixed-timestep simulation of the catch game rules.
+
+This module has no pygame dependency: it owns the bucket, the falling
+tears, score and lives, advances them one fixed tick at a time from an
+input bitmask, and draws every random number from a seeded RNG. The
+pygame front end in ``catch_game`` drives it and renders on top.
+"""
+
+import random
+import struct
+
+import numpy as np
+
+from collision import collide_tears, nearest_buckets
+from entities import EntityPool
+from waves import SpawnSchedule, TearType, load_waves
+
+# Playing field
+WINDOW_WIDTH = 800
+WINDOW_HEIGHT = 600
+
+# Bucket settings
+BUCKET_WIDTH = 120
+BUCKET_HEIGHT = 35
+BUCKET_SPEED = 8
+BUCKET_BOTTOM_MARGIN = 60
+
+# Falling object settings
+OBJECT_SIZE = 35
+OBJECT_SPEED = 5
+OBJECT_SPAWN_RATE = 60
+DANGER_SPAWN_CHANCE = 15
+DANGER_SPEED_FACTOR = 1.2
+TEAR_VARIANTS = 4
+
+# Game settings
+MAX_LIVES = 5
+CATCH_SCORE = 10
+
+# Fixed timestep
+TICK_RATE = 60
+TICK_SECONDS = 1.0 / TICK_RATE
+
+# Input bitmask: INPUT_BITS bits per player, player 0 in the lowest bits
+INPUT_LEFT = 1
+INPUT_RIGHT = 2
+INPUT_BITS = 2
+MAX_PLAYERS = 8
+
+# Events returned by Simulation.step, with the player they count for
+EVENT_CATCH = "catch"  # harmless tear caught
+EVENT_HIT = "hit"      # damaging tear caught
+EVENT_MISS = "miss"    # tear that had to be caught fell off the bottom
+
+class SimConfig:
+    """Tunable rules of one simulation; defaults mirror the module constants.
+
+    ``waves`` names a wave file (see ``waves.py``) whose precompiled
+    schedule replaces the random spawner and its ``object_*``,
+    ``danger_*`` and ``catch_score`` settings.
+    """
+
+    def __init__(self, **overrides):
+        self.width = WINDOW_WIDTH
+        self.height = WINDOW_HEIGHT
+        self.bucket_width = BUCKET_WIDTH
+        self.bucket_height = BUCKET_HEIGHT
+        self.bucket_speed = BUCKET_SPEED
+        self.bucket_bottom_margin = BUCKET_BOTTOM_MARGIN
+        self.object_size = OBJECT_SIZE
+        self.object_speed = OBJECT_SPEED
+        self.object_spawn_rate = OBJECT_SPAWN_RATE
+        self.danger_spawn_chance = DANGER_SPAWN_CHANCE
+        self.danger_speed_factor = DANGER_SPEED_FACTOR
+        self.tear_variants = TEAR_VARIANTS
+        self.max_lives = MAX_LIVES
+        self.catch_score = CATCH_SCORE
+        self.waves = None
+        self.players = 1
+        for name, value in overrides.items():
+            if not hasattr(self, name):
+                raise TypeError(f"Unknown simulation setting: {name}")
+            setattr(self, name, value)
+
+    def overrides(self):
+        """Return the settings that differ from the module defaults."""
+        defaults = vars(SimConfig())
+        return {name: value for name, value in vars(self).items() if defaults[name] != value}
+
+    @property
+    def bucket_y(self):
+        return self.height - self.bucket_bottom_margin
+
+    @property
+    def bucket_start_x(self):
+        return self.width // 2 - self.bucket_width // 2
+
+    def player_start_x(self, player):
+        """Starting bucket x of ``player``: the middle of an equal share of the field."""
+        return (2 * player + 1) * self.width // (2 * self.players) - self.bucket_width // 2
+
+def player_inputs(inputs, player):
+    """Extract ``player``'s INPUT_LEFT/INPUT_RIGHT bits from a combined bitmask."""
+    return (inputs >> (INPUT_BITS * player)) & ((1 << INPUT_BITS) - 1)
+
+def classic_tear_types(config):
+    """The blue (kind 0) and red (kind 1) tears of the random spawner."""
+    return (TearType("blue", config.object_speed, config.object_size, score=config.catch_score, miss_damage=1),
+            TearType("red", config.object_speed * config.danger_speed_factor, config.object_size, damage=1,
+                     sprite="danger"))
+
+def spawn_tear(pool, x, y, is_dangerous, rng, config):
+    """Add one tear to ``pool`` and return its slot index."""
+    if is_dangerous:
+        speed = config.object_speed * config.danger_speed_factor
+        color = 0
+    else:
+        speed = config.object_speed
+        color = rng.randrange(config.tear_variants)
+    return pool.spawn(x, y, vy=speed, size=config.object_size, color=color, kind=int(is_dangerous))
+
+class Simulation:
+    """Game rules advanced one fixed tick per ``step`` call.
+
+    Every player has a bucket, a score and lives; ``bucket_x``, ``score``
+    and ``lives`` are the first player's. A player whose lives run out
+    leaves the field and the session is over when all of them have.
+    Buckets may overlap: a tear touching several goes to the bucket
+    closest to it, and a missed tear costs a life of the player whose
+    bucket is closest to where it fell.
+    """
+
+    _STATE = struct.Struct("<QIqqIddd?")
+    _PLAYER = struct.Struct("<qqdd")
+
+    def __init__(self, seed=None, config=None):
+        self.config = config or SimConfig()
+        self.tears = EntityPool()
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        """Start a new session, reseeding the RNG when ``seed`` is given."""
+        if seed is not None or not hasattr(self, "rng"):
+            self.seed = seed if seed is not None else random.randrange(2 ** 32)
+            self.rng = random.Random(self.seed)
+        self._load_rules()
+        config = self.config
+        self.tick = 0
+        self.spawn_timer = 0
+        self.game_over = False
+        self.player_score = [0] * config.players
+        self.player_lives = [config.max_lives] * config.players
+        self.player_x = [config.player_start_x(player) for player in range(config.players)]
+        self.player_prev_x = list(self.player_x)
+        self.tears.clear()
+
+    @property
+    def players(self):
+        return len(self.player_x)
+
+    @property
+    def score(self):
+        return self.player_score[0]
+
+    @score.setter
+    def score(self, value):
+        self.player_score[0] = value
+
+    @property
+    def lives(self):
+        return self.player_lives[0]
+
+    @lives.setter
+    def lives(self, value):
+        self.player_lives[0] = value
+
+    @property
+    def bucket_x(self):
+        return self.player_x[0]
+
+    @property
+    def prev_bucket_x(self):
+        return self.player_prev_x[0]
+
+    @property
+    def total_score(self):
+        return sum(self.player_score)
+
+    @property
+    def total_lives(self):
+        return sum(self.player_lives)
+
+    def snapshot(self):
+        """Serialise the full simulation state, RNG included, to bytes."""
+        version, mt_state, gauss_next = self.rng.getstate()
+        header = self._STATE.pack(self.seed, self.tick, self.score, self.lives, self.spawn_timer,
+                                  self.bucket_x, self.prev_bucket_x,
+                                  0.0 if gauss_next is None else gauss_next, gauss_next is not None)
+        # Players after the first follow the tears, so one-player snapshots keep their old layout
+        others = b"".join(self._PLAYER.pack(self.player_score[player], self.player_lives[player],
+                                            self.player_x[player], self.player_prev_x[player])
+                          for player in range(1, self.players))
+        return (header + struct.pack("<I", version)
+                + np.array(mt_state, dtype=np.uint32).tobytes() + self.tears.pack() + others)
+
+    def restore(self, data, tear_fields=None):
+        """Load a state produced by ``snapshot``; ``tear_fields`` as for ``EntityPool.unpack``."""
+        (self.seed, self.tick, score, lives, self.spawn_timer,
+         bucket_x, prev_bucket_x, gauss_next, has_gauss) = self._STATE.unpack_from(data)
+        players = [(score, lives, bucket_x, prev_bucket_x)]
+        offset = self._STATE.size
+        (version,) = struct.unpack_from("<I", data, offset)
+        offset += 4
+        mt_state = np.frombuffer(data, dtype=np.uint32, count=625, offset=offset)
+        offset += mt_state.nbytes
+        self.rng = random.Random()
+        self.rng.setstate((version, tuple(int(v) for v in mt_state), gauss_next if has_gauss else None))
+        offset += self.tears.unpack(data[offset:], tear_fields)
+        for _ in range(1, self.config.players):
+            players.append(self._PLAYER.unpack_from(data, offset))
+            offset += self._PLAYER.size
+
+        self.player_score = [score for score, _, _, _ in players]
+        self.player_lives = [lives for _, lives, _, _ in players]
+        self.player_x = [int(x) if x.is_integer() else x for _, _, x, _ in players]
+        self.player_prev_x = [int(x) if x.is_integer() else x for _, _, _, x in players]
+        self.game_over = max(self.player_lives) <= 0
+        self._load_rules()
+
+    def _load_rules(self):
+        """Set up the tear types and, with a wave file, the session's spawn schedule."""
+        config = self.config
+        if config.waves:
+            waveset = load_waves(config.waves)
+            self.tear_types = waveset.tear_types
+            self.schedule = SpawnSchedule(waveset, self.seed, config.width, TICK_RATE, config.tear_variants)
+        else:
+            self.tear_types = classic_tear_types(config)
+            self.schedule = None
+        self._type_score = [tear_type.score for tear_type in self.tear_types]
+        self._type_damage = [tear_type.damage for tear_type in self.tear_types]
+        self._type_miss_damage = [tear_type.miss_damage for tear_type in self.tear_types]
+
+    def bucket_box(self, player=0):
+        config = self.config
+        return (self.player_x[player], config.bucket_y, config.bucket_width, config.bucket_height)
+
+    def step(self, inputs=0):
+        """Advance one tick and return the ``(event, x, y, player)`` tuples it produced.
+
+        ``inputs`` holds every player's bits, see ``player_inputs``.
+        """
+        if self.game_over:
+            return []
+        config = self.config
+        self.tick += 1
+
+        player_x = self.player_x
+        self.player_prev_x = list(player_x)
+        active = []
+        for player in range(self.players):
+            if self.player_lives[player] <= 0:
+                continue
+            active.append(player)
+            bits = player_inputs(inputs, player)
+            if bits & INPUT_LEFT and player_x[player] > 0:
+                player_x[player] -= config.bucket_speed
+            if bits & INPUT_RIGHT and player_x[player] < config.width - config.bucket_width:
+                player_x[player] += config.bucket_speed
+
+        schedule = self.schedule
+        if schedule is not None:
+            start, stop = schedule.window(self.tick)
+            if stop > start:
+                size = schedule.size[start:stop]
+                self.tears.spawn_many(schedule.x[start:stop], -size, vy=schedule.speed[start:stop], size=size,
+                                      color=schedule.color[start:stop], kind=schedule.kind[start:stop])
+        else:
+            self.spawn_timer += 1
+            if self.spawn_timer >= config.object_spawn_rate:
+                self.spawn_timer = 0
+                x = self.rng.randint(config.object_size // 2, config.width - config.object_size // 2)
+                is_dangerous = self.rng.randint(1, 100) <= config.danger_spawn_chance
+                spawn_tear(self.tears, x, -config.object_size, is_dangerous, self.rng, config)
+
+        tears = self.tears
+        if not tears.count:
+            return []
+        tears.update()
+        buckets = [self.bucket_box(player) for player in active]
+        contacts = collide_tears(tears, buckets, config.height)
+        if not contacts.hits.size and not contacts.off_screen.size:
+            return []
+
+        events = []
+        for i, owner in zip(contacts.hits.tolist(), contacts.owners.tolist()):
+            player = active[owner]
+            kind = tears.kind[i]
+            damage = self._type_damage[kind]
+            if damage:
+                self.player_lives[player] -= damage
+                events.append((EVENT_HIT, float(tears.x[i]), float(tears.y[i]), player))
+            else:
+                self.player_score[player] += self._type_score[kind]
+                events.append((EVENT_CATCH, float(tears.x[i]), float(tears.y[i]), player))
+
+        off_screen = contacts.off_screen
+        if off_screen.size:
+            # Only tears that had to be caught cost a life when missed
+            nearest = nearest_buckets(tears.x[off_screen], buckets) if len(active) > 1 else [0] * off_screen.size
+            for i, owner in zip(off_screen.tolist(), list(nearest)):
+                damage = self._type_miss_damage[tears.kind[i]]
+                if damage:
+                    player = active[owner]
+                    self.player_lives[player] -= damage
+                    events.append((EVENT_MISS, float(tears.x[i]), float(tears.y[i]), player))
+
+        tears.remove(contacts.hits.tolist() + off_screen.tolist())
+        if max(self.player_lives) <= 0:
+            self.game_over = True
+        return events
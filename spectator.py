@@ -0,0 +1,188 @@
+"""Watch, or play in, a game streamed by ``catch_game.py --serve``.
+
+The view runs ``INTERPOLATION_DELAY_TICKS`` behind the newest snapshot so
+it always has a received tick on either side of the moment it draws and
+can interpolate between them, even when snapshots arrive unevenly::
+
+    python catch_game.py --serve 7777 --players 2 --remote-players 1
+    python spectator.py 127.0.0.1:7777 --join
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from catch_game import (
+    DANGER_RED, GAME_OVER, PLAYER_PALETTES, PLAYING, SOLO_KEYS, TEARS_DARK, TEXT_FONT_SIZE, WELCOME_SCREEN,
+    WINDOW_WIDTH, Game, parse_size,
+)
+from controls import Controls
+from entities import EntityPool
+from netplay import DEFAULT_PORT, STATE_OVER, STATE_PLAYING, STATE_WAITING, StateClient, parse_address
+from simulation import TICK_SECONDS, SimConfig
+
+INTERPOLATION_DELAY_TICKS = 2
+CLOCK_RELAX = 0.0005  # seconds per frame the clock estimate may move later
+CONNECT_TIMEOUT = 5.0
+GAME_STATES = {STATE_WAITING: WELCOME_SCREEN, STATE_PLAYING: PLAYING, STATE_OVER: GAME_OVER}
+
+class NetRenderState:
+    """What the playing screen draws, rebuilt from two received snapshots."""
+
+    __slots__ = ("tick", "tears", "tear_types", "particles", "player_x", "player_prev_x", "player_score", "player_lives")
+
+class SpectatorGame(Game):
+    """A Game whose state comes from a ``StateClient`` instead of a simulation."""
+
+    def __init__(self, client, **options):
+        config = SimConfig(**client.hello["config"])
+        super().__init__(waves=config.waves, players=config.players, **options)
+        # Same rules as the host, for its tear types and lives
+        self.sim.config = config
+        self.sim.reset()
+        # Only this client's own bucket, whichever slot the host gave it
+        self.controls = Controls(SOLO_KEYS, config, self.viewport)
+        self.client = client
+        self.net_tears = EntityPool()
+        self.add_trails(self.net_tears)
+        self.net_state = None
+        self.net_pair = None
+        self.clock_offset = None
+        self.last_tick = None
+
+    def start_session(self):
+        """Sessions are started by the host."""
+
+    def restart_session(self):
+        """Sessions are restarted by the host."""
+
+    def handle_events(self):
+        running = super().handle_events()
+        if self.client.closed:
+            reason = f": {self.client.error}" if self.client.error else ""
+            print(f"Disconnected from {self.client.host}:{self.client.port}{reason}")
+            return False
+        if self.client.snapshots:
+            self.state = GAME_STATES[self.client.snapshots[-1].state]
+        return running
+
+    def read_input(self):
+        state = self.net_state
+        player = self.client.player
+        player_x = (state.player_x[player],) if state is not None and player is not None else ()
+        return self.controls.sample(self.input_time, player_x)
+
+    def update_game(self):
+        """Send this player's keys; the host runs the simulation."""
+        self.client.send_inputs(self.read_input())
+
+    def final_scores(self):
+        return self.client.snapshots[-1].player("score")
+
+    def render_state(self):
+        snapshots = list(self.client.snapshots)
+        # Only the current session: ticks restart from 0 when the host restarts
+        start = len(snapshots) - 1
+        while start > 0 and snapshots[start - 1].tick < snapshots[start].tick:
+            start -= 1
+        snapshots = snapshots[start:]
+        latest = snapshots[-1]
+        if self.last_tick is not None and latest.tick < self.last_tick:
+            self.clock_offset = None
+        self.last_tick = latest.tick
+
+        # Map host ticks onto our clock; the least delayed snapshot so far sets it
+        offset = latest.received - latest.tick * TICK_SECONDS
+        if self.clock_offset is None:
+            self.clock_offset = offset
+        else:
+            self.clock_offset = min(self.clock_offset + CLOCK_RELAX, offset)
+        render_tick = (time.perf_counter() - self.clock_offset) / TICK_SECONDS - INTERPOLATION_DELAY_TICKS
+
+        older = newer = snapshots[0]
+        for snapshot in snapshots:
+            newer = snapshot
+            if snapshot.tick > render_tick:
+                break
+            older = snapshot
+        span = newer.tick - older.tick
+        alpha = min(1.0, max(0.0, (render_tick - older.tick) / span)) if span else 1.0
+
+        if self.net_pair != (older.tick, newer.tick):
+            self._build_state(older, newer, span)
+            self.net_pair = (older.tick, newer.tick)
+        return self.net_state, alpha
+
+    def _build_state(self, older, newer, span):
+        previous = self.net_state
+        tears = newer.tears()
+        n = len(tears["x"])
+        pool = self.net_tears
+        pool.clear()
+        sizes = np.array([tear_type.size for tear_type in self.sim.tear_types], dtype=np.int32)
+        kind = tears["kind"].astype(np.int8)
+        pool.spawn_many(tears["x"], tears["y"], vy=tears["vy"], size=sizes[kind], color=tears["color"], kind=kind)
+        # Each tear moved by its own speed since the older snapshot
+        pool.py[:n] -= tears["vy"] * span
+
+        state = NetRenderState()
+        state.tick = newer.tick
+        state.tears = pool
+        state.tear_types = self.sim.tear_types
+        state.particles = self.particles.pool
+        state.player_prev_x = tuple(older.player("x"))
+        state.player_x = tuple(newer.player("x"))
+        state.player_score = tuple(newer.player("score"))
+        state.player_lives = tuple(newer.player("lives"))
+        if previous is not None:
+            self._play_effects(previous, state)
+        self.net_state = state
+
+    def _play_effects(self, previous, state):
+        """Stand in for the host's catch and hit effects, which are not streamed."""
+        bucket_y = self.sim.config.bucket_y
+        for player in range(min(self.players, len(previous.player_score))):
+            x = state.player_x[player] + self.sim.config.bucket_width / 2
+            if state.player_score[player] > previous.player_score[player]:
+                self.audio.queue("catch")
+                self.create_particles(x, bucket_y, PLAYER_PALETTES[player][1], 8)
+            if state.player_lives[player] < previous.player_lives[player]:
+                self.audio.queue("hit")
+                self.create_particles(x, bucket_y, DANGER_RED, 12)
+        self.audio.flush()
+
+    def draw_welcome_screen(self):
+        super().draw_welcome_screen()
+        status = f"Watching {self.client.host}:{self.client.port}"
+        if self.client.player is not None:
+            status += f" as player {self.client.player + 1}"
+        text = self.text_cache.render(status + " - waiting for the host", TEXT_FONT_SIZE, TEARS_DARK)
+        self.screen.blit(text, text.get_rect(center=self.viewport.point(WINDOW_WIDTH // 2, 540)))
+
+def main():
+    parser = argparse.ArgumentParser(description="Watch or join a Tears PyGame session served over the network.")
+    parser.add_argument("server", nargs="?", default=f"127.0.0.1:{DEFAULT_PORT}",
+                        help=f"[HOST:]PORT of a catch_game.py --serve host (default 127.0.0.1:{DEFAULT_PORT})")
+    parser.add_argument("--join", action="store_true", help="play in a remote player slot if the host has one free")
+    parser.add_argument("--window-size", type=parse_size, metavar="WxH", help="window or fullscreen mode size")
+    parser.add_argument("--fullscreen", action="store_true", help="run fullscreen")
+    args = parser.parse_args()
+
+    try:
+        host, port = parse_address(args.server)
+    except ValueError:
+        parser.error(f"expected [HOST:]PORT, got {args.server!r}")
+    client = StateClient(host, port, join=args.join)
+    client.start()
+    client.connected.wait(CONNECT_TIMEOUT)
+    if client.hello is None:
+        print(f"Could not connect to {host}:{port}: {client.error or 'timed out'}")
+        sys.exit(1)
+
+    game = SpectatorGame(client, window_size=args.window_size, fullscreen=args.fullscreen)
+    game.run()
+
+if __name__ == "__main__":
+    main()
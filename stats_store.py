@@ -0,0 +1,311 @@
+"""High scores and per-session telemetry in a local SQLite database.
+
+``SessionTelemetry`` collects one session's numbers while it is played:
+catches, misses and red hits per player, the score once a second, frame
+times and quality levels. Frame times go into a fixed histogram, not a
+list, so a session's telemetry stays the same size however long it is
+played. ``StatsStore.record`` hands the finished session to a writer
+thread, which inserts sessions in batches, one transaction per batch, so
+the game loop never waits on the disk. The store keeps the best score in
+memory for the game over screen.
+
+Query the database from the command line::
+
+    python stats_store.py leaderboard --days 7
+    python stats_store.py summary --by machine
+"""
+
+import argparse
+import os
+import platform
+import queue
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from simulation import EVENT_CATCH, EVENT_HIT, EVENT_MISS
+
+DATA_DIR = os.environ.get("TEARS_DATA_DIR",
+                          os.path.join(os.path.expanduser("~"), ".local", "share", "tears-pygame"))
+DEFAULT_DB = os.path.join(DATA_DIR, "stats.db")
+
+BATCH_SIZE = 256      # sessions per transaction at most
+FLUSH_SECONDS = 2.0   # a partial batch waits at most this long
+SCORE_SAMPLE_TICKS = 60
+FRAME_BIN_MS = 0.1    # frame time histogram resolution, so the p99 is exact to this
+FRAME_BINS = 2500     # the last bin holds every frame of 250 ms and more
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    started REAL NOT NULL,
+    ended REAL NOT NULL,
+    machine TEXT NOT NULL,
+    seed INTEGER,
+    waves TEXT,
+    players INTEGER NOT NULL,
+    completed INTEGER NOT NULL,
+    ticks INTEGER NOT NULL,
+    score INTEGER NOT NULL,
+    catches INTEGER NOT NULL,
+    misses INTEGER NOT NULL,
+    hits INTEGER NOT NULL,
+    frame_ms_mean REAL,
+    frame_ms_p99 REAL,
+    frame_ms_max REAL,
+    quality_worst INTEGER,
+    quality_changes INTEGER,
+    score_timeline BLOB
+);
+CREATE TABLE IF NOT EXISTS player_scores (
+    session_id INTEGER NOT NULL REFERENCES sessions (id),
+    player INTEGER NOT NULL,
+    ended REAL NOT NULL,
+    score INTEGER NOT NULL,
+    catches INTEGER NOT NULL,
+    misses INTEGER NOT NULL,
+    hits INTEGER NOT NULL,
+    PRIMARY KEY (session_id, player)
+);
+CREATE INDEX IF NOT EXISTS player_scores_score ON player_scores (score DESC);
+CREATE INDEX IF NOT EXISTS player_scores_ended ON player_scores (ended);
+CREATE INDEX IF NOT EXISTS sessions_started ON sessions (started);
+CREATE INDEX IF NOT EXISTS sessions_machine ON sessions (machine, started);
+"""
+
+_STOP = object()
+
+def connect(path):
+    connection = sqlite3.connect(path)
+    # WAL lets queries run while the writer thread commits
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.executescript(SCHEMA)
+    return connection
+
+class SessionTelemetry:
+    """Counters for one session, fed from the simulation events and the frame loop."""
+
+    def __init__(self, seed, players, waves=None, quality=0):
+        self.started = time.time()
+        self.seed = seed
+        self.waves = waves
+        self.catches = [0] * players
+        self.misses = [0] * players
+        self.hits = [0] * players
+        self.score_timeline = []
+        self.frames = 0
+        self.frame_ms_total = 0.0
+        self.frame_ms_max = 0.0
+        self.frame_histogram = [0] * FRAME_BINS
+        self.quality_worst = quality
+        self.quality_changes = 0
+        self._quality = quality
+
+    def event(self, kind, player):
+        """Count a ``simulation.EVENT_*`` for ``player``."""
+        if kind == EVENT_CATCH:
+            self.catches[player] += 1
+        elif kind == EVENT_MISS:
+            self.misses[player] += 1
+        elif kind == EVENT_HIT:
+            self.hits[player] += 1
+
+    def tick(self, sim):
+        if sim.tick % SCORE_SAMPLE_TICKS == 0:
+            self.score_timeline.append(sim.total_score)
+
+    def frame(self, frame_ms, quality):
+        self.frames += 1
+        self.frame_ms_total += frame_ms
+        self.frame_ms_max = max(self.frame_ms_max, frame_ms)
+        self.frame_histogram[min(int(frame_ms / FRAME_BIN_MS), FRAME_BINS - 1)] += 1
+        if quality != self._quality:
+            self.quality_changes += 1
+            self._quality = quality
+            self.quality_worst = max(self.quality_worst, quality)
+
+    def frame_ms_percentile(self, percent):
+        """Upper edge of the histogram bin holding the ``percent`` percentile frame time."""
+        if not self.frames:
+            return None
+        cumulative = np.cumsum(self.frame_histogram)
+        index = int(np.searchsorted(cumulative, self.frames * percent / 100.0))
+        if index >= FRAME_BINS - 1:
+            # The last bin has no upper edge
+            return self.frame_ms_max
+        return min((index + 1) * FRAME_BIN_MS, self.frame_ms_max)
+
+    def result(self, sim, completed):
+        """Return the session as a dict for ``StatsStore.record``."""
+        frames = self.frames
+        return {
+            "started": self.started,
+            "ended": time.time(),
+            "seed": self.seed,
+            "waves": self.waves,
+            "completed": completed,
+            "ticks": sim.tick,
+            "scores": list(sim.player_score),
+            "catches": self.catches,
+            "misses": self.misses,
+            "hits": self.hits,
+            "frame_ms_mean": self.frame_ms_total / frames if frames else None,
+            "frame_ms_p99": self.frame_ms_percentile(99),
+            "frame_ms_max": self.frame_ms_max if frames else None,
+            "quality_worst": self.quality_worst,
+            "quality_changes": self.quality_changes,
+            "score_timeline": np.array(self.score_timeline, dtype=np.int32).tobytes(),
+        }
+
+class StatsStore:
+    """Owns the database connection on a writer thread; ``record`` never blocks."""
+
+    def __init__(self, path=DEFAULT_DB, machine=None):
+        self.path = path
+        self.machine = machine or platform.node()
+        self.best_score = 0
+        self.written = 0
+        # Set when the database cannot be opened; sessions are then no longer queued
+        self.failed = False
+        self._queue = queue.Queue()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="stats-writer", daemon=True)
+            self._thread.start()
+
+    def close(self):
+        """Write what is still queued and stop the writer thread."""
+        if self._thread is not None:
+            if not self.failed:
+                self._queue.put(_STOP)
+            self._thread.join()
+            self._thread = None
+
+    def record(self, session):
+        self.best_score = max([self.best_score] + session["scores"])
+        if not self.failed:
+            self._queue.put(session)
+
+    def _run(self):
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            connection = connect(self.path)
+            (best,) = connection.execute("SELECT MAX(score) FROM player_scores").fetchone()
+        except (OSError, sqlite3.Error) as e:
+            print(f"Stats disabled, cannot open {self.path}: {e}")
+            self.failed = True
+            # Drop what was queued before the flag was set
+            while True:
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    return
+        self.best_score = max(self.best_score, best or 0)
+
+        batch = []
+        while True:
+            try:
+                item = self._queue.get(timeout=FLUSH_SECONDS if batch else None)
+            except queue.Empty:
+                item = None
+            if item is not None and item is not _STOP:
+                batch.append(item)
+                if len(batch) < BATCH_SIZE:
+                    continue
+            if batch:
+                self._write(connection, batch)
+                batch = []
+            if item is _STOP:
+                break
+        connection.close()
+
+    def _write(self, connection, batch):
+        try:
+            with connection:
+                for session in batch:
+                    cursor = connection.execute(
+                        "INSERT INTO sessions (started, ended, machine, seed, waves, players, completed, ticks,"
+                        " score, catches, misses, hits, frame_ms_mean, frame_ms_p99, frame_ms_max,"
+                        " quality_worst, quality_changes, score_timeline)"
+                        " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (session["started"], session["ended"], self.machine, session["seed"], session["waves"],
+                         len(session["scores"]), int(session["completed"]), session["ticks"],
+                         sum(session["scores"]), sum(session["catches"]), sum(session["misses"]),
+                         sum(session["hits"]), session["frame_ms_mean"], session["frame_ms_p99"],
+                         session["frame_ms_max"], session["quality_worst"], session["quality_changes"],
+                         session["score_timeline"]))
+                    connection.executemany(
+                        "INSERT INTO player_scores (session_id, player, ended, score, catches, misses, hits)"
+                        " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        [(cursor.lastrowid, player, session["ended"], score, session["catches"][player],
+                          session["misses"][player], session["hits"][player])
+                         for player, score in enumerate(session["scores"])])
+            self.written += len(batch)
+        except sqlite3.Error as e:
+            print(f"Could not save {len(batch)} sessions to {self.path}: {e}")
+
+def leaderboard(connection, limit=10, since=None):
+    """Best individual scores, optionally only those set after ``since`` (unix time)."""
+    query = ("SELECT p.score, p.player, p.ended, s.machine, s.ticks FROM player_scores p"
+             " JOIN sessions s ON s.id = p.session_id")
+    params = []
+    if since is not None:
+        query += " WHERE p.ended >= ?"
+        params.append(since)
+    query += " ORDER BY p.score DESC LIMIT ?"
+    return connection.execute(query, params + [limit]).fetchall()
+
+SUMMARY_GROUPS = {
+    None: "'all'",
+    "day": "date(started, 'unixepoch', 'localtime')",
+    "machine": "machine",
+    "players": "players",
+}
+
+def summary(connection, since=None, by=None):
+    """Aggregate sessions per group: count, mean score and length, catch rate and frame times."""
+    group = SUMMARY_GROUPS[by]
+    query = (f"SELECT {group}, COUNT(*), AVG(score), MAX(score), AVG(ticks), SUM(catches), SUM(misses),"
+             f" SUM(hits), AVG(frame_ms_mean), MAX(frame_ms_p99) FROM sessions")
+    params = []
+    if since is not None:
+        query += " WHERE started >= ?"
+        params.append(since)
+    query += f" GROUP BY {group} ORDER BY {group}"
+    return connection.execute(query, params).fetchall()
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the stored high scores and session telemetry.")
+    parser.add_argument("command", choices=("leaderboard", "summary"))
+    parser.add_argument("--db", default=DEFAULT_DB, help=f"database file (default {DEFAULT_DB})")
+    parser.add_argument("--days", type=float, help="only sessions from the last DAYS days")
+    parser.add_argument("--limit", type=int, default=10, help="leaderboard entries (default 10)")
+    parser.add_argument("--by", choices=[name for name in SUMMARY_GROUPS if name], help="summary groups")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        parser.error(f"no database at {args.db}")
+    connection = connect(args.db)
+    since = time.time() - args.days * 86400 if args.days else None
+    start = time.perf_counter()
+    if args.command == "leaderboard":
+        rows = leaderboard(connection, args.limit, since)
+        for rank, (score, player, ended, machine, ticks) in enumerate(rows, 1):
+            when = time.strftime("%Y-%m-%d %H:%M", time.localtime(ended))
+            print(f"{rank:3d}. {score:7d}  player {player + 1}  {when}  {machine}  {ticks / 60:.0f}s")
+    else:
+        for (group, sessions, mean_score, best, mean_ticks, catches, misses, hits, frame_ms,
+             worst_p99) in summary(connection, since, args.by):
+            caught = catches / max(1, catches + misses)
+            print(f"{group}: {sessions} sessions, score mean {mean_score:.0f} best {best}, "
+                  f"length {mean_ticks / 60:.0f}s, caught {caught:.0%}, red hits {hits}, "
+                  f"frame {frame_ms or 0:.1f} ms mean / {worst_p99 or 0:.1f} ms worst p99")
+    print(f"({(time.perf_counter() - start) * 1000:.1f} ms)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# The game modules live at the top of the repository, next to this folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+# Keep the sound cache and the stats database out of the user's folders
+os.environ.setdefault("TEARS_CACHE_DIR", tempfile.mkdtemp(prefix="tears-cache-"))
+os.environ.setdefault("TEARS_DATA_DIR", tempfile.mkdtemp(prefix="tears-data-"))
+
+@pytest.fixture(scope="session")
+def display():
+    """A dummy display, for code that converts surfaces to its format."""
+    import pygame
+    pygame.display.init()
+    return pygame.display.set_mode((800, 600))
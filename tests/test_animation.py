@@ -0,0 +1,48 @@
+import math
+
+import numpy as np
+import pytest
+
+from animation import ANIMATION_RATE, SINE_TABLE_SIZE, AnimationClock, cos, cos_array, sin, sin_array
+
+# One table step of phase moves a sine by at most this much
+TOLERANCE = math.tau / SINE_TABLE_SIZE
+
+@pytest.mark.parametrize("phase", [0.0, 0.3, 1.0, math.pi, 5.5, 40.0, 1234.5])
+def test_lookups_match_math(phase):
+    assert sin(phase) == pytest.approx(math.sin(phase), abs=TOLERANCE)
+    assert cos(phase) == pytest.approx(math.cos(phase), abs=TOLERANCE)
+
+def test_array_lookups_match_the_scalar_ones():
+    phases = np.linspace(0.0, 50.0, 997)
+    assert sin_array(phases).tolist() == [sin(phase) for phase in phases]
+    assert cos_array(phases).tolist() == [cos(phase) for phase in phases]
+
+def test_clock_follows_real_time():
+    clock = AnimationClock()
+    for _ in range(60):
+        clock.advance(1 / 60)
+    slow = AnimationClock()
+    for _ in range(30):
+        slow.advance(1 / 30)
+    assert clock.time == pytest.approx(ANIMATION_RATE)
+    assert slow.time == pytest.approx(clock.time)
+
+def test_waves_are_cached_per_frame():
+    clock = AnimationClock()
+    clock.advance(0.5)
+    first = clock.wave(3.0, 1.0)
+    assert first == pytest.approx(math.sin(clock.time * 3.0 + 1.0), abs=TOLERANCE)
+    clock.time += 1.0
+    # Still the same frame: the cached value is reused
+    assert clock.wave(3.0, 1.0) == first
+    clock.advance(0.0)
+    assert clock.wave(3.0, 1.0) != first
+
+def test_step():
+    clock = AnimationClock(rate=1.0)
+    assert clock.step(1.0, 8) == 0
+    clock.advance(math.tau * 3 / 8 + 0.01)
+    assert clock.step(1.0, 8) == 3
+    clock.advance(math.tau)
+    assert clock.step(1.0, 8) == 3
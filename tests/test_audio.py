@@ -0,0 +1,75 @@
+import random
+
+import numpy as np
+import pygame
+import pytest
+
+from audio import PITCH_VARIANTS, VOLUME_LEVELS, VoicePool, render_variants
+
+@pytest.fixture(scope="module")
+def mixer():
+    pygame.mixer.init(44100, -16, 2, 512)
+    yield
+    pygame.mixer.quit()
+
+def tone(seconds=2.0):
+    """A long sound, so the voices it starts stay busy for the whole test."""
+    samples = np.zeros((int(44100 * seconds), 2), dtype=np.int16)
+    samples[::50] = 3000
+    return pygame.sndarray.make_sound(samples)
+
+def pool(voices=4, max_per_second=16):
+    voice_pool = VoicePool(voices, max_per_second, rng=random.Random(0))
+    voice_pool.add_cue("catch", render_variants(tone()), priority=0)
+    voice_pool.add_cue("hit", render_variants(tone()), priority=1)
+    return voice_pool
+
+def busy(voice_pool):
+    return sum(channel.get_busy() for channel in voice_pool.channels)
+
+def test_render_variants(mixer):
+    variants = render_variants(tone(0.1), base_volume=0.5)
+    assert len(variants) == len(VOLUME_LEVELS)
+    for volume, row in zip(VOLUME_LEVELS, variants):
+        assert len(row) == len(PITCH_VARIANTS)
+        lengths = [len(pygame.sndarray.array(sound)) for sound in row]
+        # Higher pitches are resampled into fewer samples
+        assert lengths == sorted(lengths, reverse=True)
+        assert row[0].get_volume() == pytest.approx(min(0.5 * volume, 1.0), abs=0.01)
+
+def test_queued_cues_are_coalesced(mixer):
+    voice_pool = pool()
+    for _ in range(5):
+        voice_pool.queue("catch")
+    voice_pool.queue("unknown")
+    voice_pool.flush(now=0.0)
+    assert busy(voice_pool) == 1
+    assert len(voice_pool.started) == 1
+    assert voice_pool.dropped == 0
+    assert not voice_pool.pending
+
+def test_voices_per_second_are_capped(mixer):
+    voice_pool = pool(voices=8, max_per_second=2)
+    for now in (0.0, 0.1, 0.2):
+        voice_pool.queue("catch")
+        voice_pool.flush(now=now)
+    assert len(voice_pool.started) == 2
+    assert voice_pool.dropped == 1
+    # Once the first start leaves the window there is room again
+    voice_pool.queue("catch")
+    voice_pool.flush(now=1.05)
+    assert len(voice_pool.started) == 2
+    assert voice_pool.dropped == 1
+
+def test_busy_voices_yield_only_to_equal_or_higher_priority(mixer):
+    voice_pool = pool(voices=1)
+    voice_pool.queue("catch")
+    voice_pool.flush(now=0.0)
+    voice_pool.queue("hit")
+    voice_pool.flush(now=0.1)
+    assert voice_pool.dropped == 0
+    assert voice_pool._playing[0][0] == 1
+    voice_pool.queue("catch")
+    voice_pool.flush(now=0.2)
+    assert voice_pool.dropped == 1
+    assert voice_pool._playing[0][0] == 1
@@ -0,0 +1,26 @@
+import numpy as np
+import pygame
+
+from catch_game import AnimatedBackground
+
+def pixels(surface):
+    return pygame.surfarray.array3d(surface)
+
+def test_ring_built_in_the_background_matches(display):
+    built = AnimatedBackground(800, 600, 8, 12)
+    background = AnimatedBackground(800, 600, 8, 12, async_ring=True)
+    background.wait_ring()
+    for frame in range(12):
+        assert (pixels(background._ring[frame]) == pixels(built._ring[frame])).all()
+
+def test_frames_are_rendered_until_the_ring_is_ready(display):
+    background = AnimatedBackground(800, 600, 8, 12)
+    background._ring[3] = None
+    t = 3 * np.pi * 2 / 12
+    assert (pixels(background.frame_for(t)) == background.render_pixels(t)).all()
+    assert background.frame_for(t) is background._low_res
+
+def test_draw_scales_to_the_screen(display):
+    screen = pygame.Surface((400, 300))
+    AnimatedBackground(800, 600, 8).draw(screen, 1.0)
+    assert pixels(screen).any()
@@ -0,0 +1,76 @@
+import argparse
+
+import numpy as np
+import pytest
+
+from batch_runner import BatchSimulation, parse_setting, run_batch, sweep_grid
+from simulation import INPUT_LEFT, INPUT_RIGHT, SimConfig, Simulation
+from waves import DEFAULT_WAVES
+
+class SpawnFeed:
+    """Stands in for Simulation's RNG, handing it the spawns the batch drew."""
+
+    def __init__(self):
+        self.values = []
+
+    def randint(self, low, high):
+        return self.values.pop(0)
+
+    def randrange(self, stop):
+        return 0
+
+@pytest.mark.parametrize("overrides", [{}, {"object_spawn_rate": 12, "danger_spawn_chance": 40, "bucket_speed": 11}])
+def test_session_matches_simulation(overrides):
+    config = SimConfig(**overrides)
+    batch = BatchSimulation(1, config, seed=3)
+    sim = Simulation(0, config)
+    sim.rng = feed = SpawnFeed()
+    rng = np.random.default_rng(4)
+    while batch.alive[0]:
+        inputs = int(rng.choice((0, INPUT_LEFT, INPUT_RIGHT)))
+        slot = batch.next_slot
+        batch.step(np.array([inputs]))
+        if batch.spawn_timer == 0:
+            feed.values += [int(batch.tear_x[0, slot]), 1 if batch.tear_kind[0, slot] else 100]
+        sim.step(inputs)
+        assert (batch.bucket_x[0], batch.score[0], batch.lives[0]) == (sim.bucket_x, sim.score, sim.lives)
+    assert sim.game_over
+    assert batch.length[0] == sim.tick
+
+def test_wave_sessions_match_simulation():
+    config = SimConfig(waves=DEFAULT_WAVES, max_lives=5)
+    batch = BatchSimulation(3, config, seed=8)
+    sims = [Simulation(8, config) for _ in range(3)]
+    rng = np.random.default_rng(5)
+    while batch.alive.any():
+        inputs = rng.choice((0, INPUT_LEFT, INPUT_RIGHT), 3)
+        batch.step(inputs)
+        for session, sim in enumerate(sims):
+            sim.step(int(inputs[session]))
+            expected = (sim.bucket_x, sim.score, sim.lives)
+            assert (batch.bucket_x[session], batch.score[session], batch.lives[session]) == expected
+            assert batch.tear_active[session].sum() == sim.tears.count or sim.game_over
+    assert [batch.length[session] for session in range(3)] == [sim.tick for sim in sims]
+    assert not batch.tear_active.shape[1]
+
+@pytest.mark.parametrize("waves", [None, DEFAULT_WAVES])
+def test_sessions_are_independent(waves):
+    results = run_batch({}, 64, "random:0.2", seed=1, max_ticks=20000, waves=waves)
+    assert len(set(results["score"].tolist())) > 1
+    assert not results["truncated"].any()
+    assert ((results["lost_at"] > 0).sum(axis=1) == SimConfig().max_lives).all()
+
+def test_parse_setting():
+    assert parse_setting("OBJECT_SPAWN_RATE=30,45") == ("object_spawn_rate", [30, 45])
+    assert parse_setting("danger_speed_factor=1.5") == ("danger_speed_factor", [1.5])
+
+@pytest.mark.parametrize("text", ["WAVES=1", "PLAYERS=3", "TEAR_VARIANTS=2", "NOPE=1", "OBJECT_SPEED"])
+def test_parse_setting_rejects_what_the_batch_ignores(text):
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_setting(text)
+
+def test_sweep_grid():
+    grid = sweep_grid([("max_lives", [3])], [("object_speed", [4, 6]), ("bucket_speed", [8, 10])])
+    assert len(grid) == 4
+    assert all(point["max_lives"] == 3 for point in grid)
+    assert {(point["object_speed"], point["bucket_speed"]) for point in grid} == {(4, 8), (4, 10), (6, 8), (6, 10)}
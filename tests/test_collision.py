@@ -0,0 +1,53 @@
+import numpy as np
+import pygame
+
+from collision import collide_tears
+from entities import EntityPool
+
+def reference(pool, buckets, bottom):
+    """The per-tear Rect loop collide_tears replaces."""
+    hits = []
+    owners = []
+    off_screen = []
+    rects = [pygame.Rect(bucket) for bucket in buckets]
+    for i in range(pool.count):
+        size = int(pool.size[i])
+        tear = pygame.Rect(int(pool.x[i] - size // 2), int(pool.y[i] - size // 2), size, size)
+        touching = [b for b, rect in enumerate(rects) if tear.colliderect(rect)]
+        if touching:
+            centre = tear.left + tear.right
+            hits.append(i)
+            owners.append(min(touching, key=lambda b: abs(centre - (rects[b].left + rects[b].right))))
+        elif pool.y[i] > bottom + size:
+            off_screen.append(i)
+    return hits, owners, off_screen
+
+def random_pool(rng, n):
+    pool = EntityPool()
+    pool.spawn_many(rng.uniform(-40, 840, n), rng.uniform(-40, 660, n), size=rng.integers(10, 40, n))
+    return pool
+
+def test_matches_colliderect():
+    rng = np.random.default_rng(1)
+    bottom = 600
+    for trial in range(200):
+        pool = random_pool(rng, int(rng.integers(1, 120)))
+        buckets = [(int(x), 540 + int(dy), 80, 30) for x, dy in zip(rng.integers(-20, 760, trial % 4 + 1),
+                                                                    rng.integers(-5, 5, trial % 4 + 1))]
+        contacts = collide_tears(pool, buckets, bottom)
+        hits, owners, off_screen = reference(pool, buckets, bottom)
+        assert contacts.hits.tolist() == hits
+        assert contacts.owners.tolist() == owners
+        assert contacts.off_screen.tolist() == off_screen
+
+def test_edges_touching_do_not_collide():
+    pool = EntityPool()
+    # A 20 px tear whose box ends exactly where the bucket starts
+    pool.spawn(90.0, 550.0, size=20)
+    assert collide_tears(pool, [(100, 540, 80, 30)], 600).hits.size == 0
+    pool.x[0] = 91.0
+    assert collide_tears(pool, [(100, 540, 80, 30)], 600).hits.tolist() == [0]
+
+def test_empty_pool():
+    contacts = collide_tears(EntityPool(), [(0, 540, 80, 30)], 600)
+    assert contacts.hits.size == contacts.owners.size == contacts.off_screen.size == 0
@@ -0,0 +1,94 @@
+import csv
+
+import pygame
+import pytest
+
+from controls import Controls, LatencyMeter
+from simulation import INPUT_BITS, INPUT_LEFT, INPUT_RIGHT, TICK_SECONDS, SimConfig
+
+BINDINGS = [((pygame.K_a,), (pygame.K_d,), "A/D"), ((pygame.K_LEFT,), (pygame.K_RIGHT,), "Arrows")]
+T = TICK_SECONDS
+
+class Screen:
+    """A viewport whose logical coordinates are the window's."""
+
+    display = pygame.Surface((800, 600))
+
+    def to_logical(self, pos):
+        return pos
+
+def key(kind, code):
+    return pygame.event.Event(kind, key=code)
+
+def samples(controls, ticks, start=0):
+    return [controls.sample((start + tick) * T) for tick in range(1, ticks + 1)]
+
+def test_hold_time_becomes_ticks_of_movement():
+    controls = Controls(BINDINGS, SimConfig())
+    assert controls.handle(key(pygame.KEYDOWN, pygame.K_a), 0.0)
+    assert not controls.handle(key(pygame.KEYDOWN, pygame.K_a), 0.5 * T)
+    assert samples(controls, 3) == [INPUT_LEFT] * 3
+    controls.handle(key(pygame.KEYUP, pygame.K_a), 3 * T)
+    assert samples(controls, 2, start=3) == [0, 0]
+
+def test_a_short_tap_still_moves_once():
+    controls = Controls(BINDINGS, SimConfig())
+    controls.handle(key(pygame.KEYDOWN, pygame.K_d), 0.1 * T)
+    controls.handle(key(pygame.KEYUP, pygame.K_d), 0.2 * T)
+    assert samples(controls, 3) == [INPUT_RIGHT, 0, 0]
+
+def test_events_after_the_tick_wait_for_the_next_sample():
+    controls = Controls(BINDINGS, SimConfig())
+    controls.handle(key(pygame.KEYDOWN, pygame.K_RIGHT), 1.5 * T)
+    second = INPUT_RIGHT << INPUT_BITS
+    assert samples(controls, 3) == [0, second, second]
+    assert not controls.handle(key(pygame.KEYDOWN, pygame.K_SPACE), 3 * T)
+
+def test_focus_loss_releases_every_key():
+    controls = Controls(BINDINGS, SimConfig())
+    controls.handle(key(pygame.KEYDOWN, pygame.K_a), 0.0)
+    controls.handle(key(pygame.KEYDOWN, pygame.K_LEFT), 0.0)
+    controls.handle(pygame.event.Event(pygame.WINDOWFOCUSLOST), T)
+    assert controls.steer(0, 400, 8) == 0
+    assert samples(controls, 2) == [INPUT_LEFT | INPUT_LEFT << INPUT_BITS, 0]
+
+def test_pointer_steers_the_first_player():
+    config = SimConfig()
+    controls = Controls(BINDINGS, config, Screen())
+    motion = pygame.event.Event(pygame.MOUSEMOTION, pos=(600, 300), rel=(0, 0), buttons=(0, 0, 0))
+    assert not controls.handle(motion, 0.0, pointer=False)
+    assert controls.handle(motion, 0.0)
+    centre = 600 - config.bucket_width / 2
+    assert controls.sample(T, player_x=(centre - 100,)) == INPUT_RIGHT
+    assert controls.sample(2 * T, player_x=(centre,)) == 0
+    assert controls.steer(0, 500, 8) == 8
+    # A movement key hands the bucket back to the keyboard
+    controls.handle(key(pygame.KEYDOWN, pygame.K_a), 2 * T)
+    assert controls.sample(3 * T, player_x=(centre - 100,)) == INPUT_LEFT
+
+def test_latency_from_input_to_present(tmp_path):
+    log = tmp_path / "latency.csv"
+    meter = LatencyMeter("fixed-step", str(log))
+    meter.input(1.000)
+    meter.input(1.010)
+    meter.used_by(1.005, 5)
+    meter.presented(4, 1.020)
+    assert meter.samples == []
+    meter.presented(5, 1.030)
+    meter.used_by(1.020, 6)
+    meter.presented(7, 1.050)
+    assert meter.samples == pytest.approx([30.0, 40.0])
+    assert "2 inputs" in meter.summary()
+    meter.close()
+
+    again = LatencyMeter("threaded", str(log))
+    again.input(2.0)
+    again.used_by(2.0, 1)
+    again.presented(1, 2.016)
+    again.close()
+    with open(log, newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ["time", "mode", "latency_ms", "tick"]
+    assert [(row[1], float(row[2]), int(row[3])) for row in rows[1:]] == [
+        ("fixed-step", 30.0, 5), ("fixed-step", 40.0, 6), ("threaded", 16.0, 1)]
+    assert LatencyMeter("idle").summary().endswith("no samples")
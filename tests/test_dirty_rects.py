@@ -0,0 +1,65 @@
+import pygame
+import pytest
+
+from catch_game import PLAYING, DirtyRectTracker, Game
+
+@pytest.fixture
+def pushed(monkeypatch):
+    """What reaches the display: a list of rect lists, None for a full flip."""
+    calls = []
+    monkeypatch.setattr(pygame.display, "update", lambda rects: calls.append(list(rects)))
+    monkeypatch.setattr(pygame.display, "flip", lambda: calls.append(None))
+    return calls
+
+def test_tracker_pushes_old_and_new_rects(display, pushed):
+    screen = pygame.Surface((200, 100))
+    backdrop = pygame.Surface((200, 100))
+    backdrop.fill((10, 20, 30))
+    tracker = DirtyRectTracker()
+
+    tracker.begin(screen, backdrop)
+    first = screen.fill((255, 0, 0), (10, 10, 20, 20))
+    tracker.add([first])
+    tracker.present(screen)
+    assert pushed == [None]
+
+    tracker.begin(screen, backdrop)
+    # Last frame's drawing is gone before anything is drawn again
+    assert screen.get_at((15, 15))[:3] == (10, 20, 30)
+    second = screen.fill((0, 255, 0), (50, 10, 20, 20))
+    tracker.add([second])
+    tracker.present(screen)
+    assert pushed[1] == [first, second]
+
+def test_large_or_invalidated_frames_flip(display, pushed):
+    screen = pygame.Surface((200, 100))
+    backdrop = pygame.Surface((200, 100))
+    tracker = DirtyRectTracker(full_threshold=0.5)
+    tracker.begin(screen, backdrop)
+    tracker.present(screen)
+    tracker.begin(screen, backdrop)
+    tracker.add([pygame.Rect(0, 0, 200, 60)])
+    tracker.present(screen)
+    tracker.invalidate()
+    tracker.begin(screen, backdrop)
+    tracker.present(screen)
+    assert pushed == [None, None, None]
+
+def test_dirty_frames_match_full_redraws(display, pushed):
+    game = Game(seed=9, dirty_rects=True, waves="waves.json")
+    game.state = PLAYING
+    game.reset_game()
+    game.dirty_frame = True
+    for frame in range(240):
+        game.update_game()
+        game.particles.update()
+        game.interpolation = 0.5
+        game.draw_game_screen()
+        game.present()
+        if frame % 20 == 0:
+            dirty = pygame.image.tobytes(game.screen, "RGB")
+            game.dirty_frame = False
+            game.draw_game_screen()
+            assert pygame.image.tobytes(game.screen, "RGB") == dirty
+            game.dirty_frame = True
+    assert any(isinstance(rects, list) for rects in pushed)
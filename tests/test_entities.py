@@ -0,0 +1,73 @@
+import numpy as np
+
+from entities import EntityPool
+
+def make_pool(n):
+    pool = EntityPool(capacity=4)
+    pool.spawn_many(np.arange(n, dtype=np.float64), 0.0, life=np.arange(n), kind=np.arange(n) % 2)
+    return pool
+
+def test_spawn_many_grows_capacity():
+    pool = make_pool(10)
+    assert pool.count == 10
+    assert pool.capacity >= 10
+    assert pool.x[:10].tolist() == list(range(10))
+
+def test_remove_keeps_survivors_dense():
+    pool = make_pool(10)
+    pool.remove([1, 4, 8])
+    assert pool.count == 7
+    assert sorted(pool.x[:7].tolist()) == [0, 2, 3, 5, 6, 7, 9]
+    # Every field moved with its entity
+    assert (pool.life[:7] == pool.x[:7]).all()
+    assert (pool.kind[:7] == pool.x[:7].astype(int) % 2).all()
+
+def test_remove_fills_holes_from_the_tail():
+    pool = make_pool(6)
+    pool.remove([0])
+    assert pool.x[:5].tolist() == [5, 1, 2, 3, 4]
+
+def test_remove_tail_and_duplicates():
+    pool = make_pool(6)
+    pool.remove([5, 4, 4, 1])
+    assert pool.count == 3
+    assert sorted(pool.x[:3].tolist()) == [0, 2, 3]
+
+def test_remove_everything_and_nothing():
+    pool = make_pool(5)
+    pool.remove([])
+    assert pool.count == 5
+    pool.remove(range(5))
+    assert pool.count == 0
+
+def test_remove_dead():
+    pool = make_pool(8)
+    pool.update()
+    pool.remove_dead()
+    # Lives were 0-7, so after one tick the first two have run out
+    assert sorted(pool.x[:pool.count].tolist()) == [2, 3, 4, 5, 6, 7]
+    assert (pool.life[:pool.count] > 0).all()
+
+def test_pack_round_trip():
+    pool = make_pool(7)
+    pool.remove([2])
+    copy = EntityPool()
+    copy.unpack(pool.pack())
+    assert copy.count == pool.count
+    for name in EntityPool.FIELDS:
+        assert (getattr(copy, name)[:copy.count] == getattr(pool, name)[:pool.count]).all()
+
+def test_unpack_legacy_layout():
+    pool = make_pool(5)
+    n = pool.count
+    # The older layout had a phase column after the others
+    parts = [np.uint32(n).tobytes()]
+    for name, dtype in EntityPool.LEGACY_FIELDS.items():
+        values = getattr(pool, name)[:n] if name in EntityPool.FIELDS else np.full(n, 1.5, dtype=dtype)
+        parts.append(values.tobytes())
+    data = b"".join(parts) + b"tail"
+    copy = EntityPool()
+    assert copy.unpack(data, EntityPool.LEGACY_FIELDS) == len(data) - 4
+    assert not hasattr(copy, "phase")
+    for name in EntityPool.FIELDS:
+        assert (getattr(copy, name)[:n] == getattr(pool, name)[:n]).all()
@@ -0,0 +1,63 @@
+import io
+import os
+import struct
+import zlib
+
+import numpy as np
+import pygame
+
+from export import FRAME_NAME, FrameExporter, encode_png
+
+def frame(width, height, shade):
+    """A surface with a different colour in every pixel."""
+    surface = pygame.Surface((width, height))
+    pixels = np.zeros((width, height, 3), dtype=np.uint8)
+    pixels[..., 0] = np.arange(width)[:, None] * 7
+    pixels[..., 1] = np.arange(height)[None, :] * 11
+    pixels[..., 2] = shade
+    pygame.surfarray.blit_array(surface, pixels)
+    return surface
+
+def chunks(data):
+    """The (kind, payload) chunks of a PNG file, checking every CRC."""
+    assert data.startswith(b"\x89PNG\r\n\x1a\n")
+    offset = 8
+    while offset < len(data):
+        (length,) = struct.unpack_from(">I", data, offset)
+        kind = data[offset + 4:offset + 8]
+        payload = data[offset + 8:offset + 8 + length]
+        (crc,) = struct.unpack_from(">I", data, offset + 8 + length)
+        assert crc == zlib.crc32(kind + payload)
+        yield kind, payload
+        offset += length + 12
+
+def test_encode_png_decodes_to_the_same_pixels():
+    surface = frame(37, 23, 200)
+    data = encode_png(pygame.image.tobytes(surface, "RGB"), 37, 23)
+    assert [kind for kind, _ in chunks(data)] == [b"IHDR", b"IDAT", b"IEND"]
+    decoded = pygame.image.load(io.BytesIO(data), "frame.png")
+    assert decoded.get_size() == (37, 23)
+    assert pygame.image.tobytes(decoded, "RGB") == pygame.image.tobytes(surface, "RGB")
+
+def test_exporter_writes_png_frames(tmp_path):
+    out = str(tmp_path / "frames")
+    surfaces = [frame(16, 12, shade) for shade in range(0, 250, 50)]
+    exporter = FrameExporter((16, 12), "png", out, workers=1, slots=2)
+    for surface in surfaces:
+        exporter.write(surface)
+    exporter.close()
+    assert sorted(os.listdir(out)) == [FRAME_NAME.format(i) for i in range(len(surfaces))]
+    for i, surface in enumerate(surfaces):
+        decoded = pygame.image.load(os.path.join(out, FRAME_NAME.format(i)))
+        assert pygame.image.tobytes(decoded, "RGB") == pygame.image.tobytes(surface, "RGB")
+
+def test_exporter_writes_raw_frames(tmp_path):
+    out = str(tmp_path / "session.rgb")
+    surfaces = [frame(16, 12, shade) for shade in range(0, 250, 50)]
+    exporter = FrameExporter((16, 12), "raw", out, workers=2, slots=3)
+    for surface in surfaces:
+        exporter.write(surface)
+    exporter.close()
+    with open(out, "rb") as f:
+        data = f.read()
+    assert data == b"".join(pygame.image.tobytes(surface, "RGB") for surface in surfaces)
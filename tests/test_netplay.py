@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from netplay import Snapshot, decode_delta, encode_delta, state_columns
+from simulation import SimConfig, Simulation
+
+def playing_sim(ticks=400):
+    sim = Simulation(8, SimConfig(players=2, max_lives=10 ** 6))
+    for _ in range(ticks):
+        sim.step()
+    assert sim.tears.count
+    return sim
+
+def round_trip(columns, sim, previous=None):
+    return decode_delta(encode_delta(columns, previous), sim.players, sim.tears.count, previous)
+
+def assert_same(decoded, columns):
+    assert len(decoded) == len(columns)
+    for a, b in zip(decoded, columns):
+        assert a.dtype == b.dtype
+        assert (a == b).all()
+
+def test_keyframe_round_trip():
+    sim = playing_sim()
+    columns = state_columns(sim)
+    assert_same(round_trip(columns, sim), columns)
+
+def test_delta_round_trip():
+    sim = playing_sim()
+    previous = state_columns(sim)
+    for _ in range(30):
+        sim.step()
+    columns = state_columns(sim)
+    assert_same(round_trip(columns, sim, previous), columns)
+
+def test_snapshot_scales_back():
+    sim = playing_sim()
+    n = sim.tears.count
+    tears = Snapshot(sim.tick, 1, 0.0, round_trip(state_columns(sim), sim)).tears()
+    assert np.abs(tears["y"] - sim.tears.y[:n]).max() <= 1 / 8
+    assert np.abs(tears["vy"] - sim.tears.vy[:n]).max() <= 1 / 32
+    assert (tears["x"] == np.round(sim.tears.x[:n])).all()
+
+def test_fast_tears_are_not_clipped():
+    # Repeated laps keep speeding tears up; 20 px/tick used to clip at 255 / 16
+    sim = playing_sim()
+    sim.tears.spawn_many(np.linspace(100.0, 700.0, 8), 300.0, vy=np.linspace(15.0, 40.0, 8), size=40)
+    n = sim.tears.count
+    tears = Snapshot(sim.tick, 1, 0.0, round_trip(state_columns(sim), sim)).tears()
+    assert np.abs(tears["vy"] - sim.tears.vy[:n]).max() <= 1 / 32
+
+def test_values_beyond_their_column_are_clamped():
+    sim = playing_sim()
+    sim.tears.vy[0] = 5000.0
+    sim.tears.y[0] = -9000.0
+    tears = Snapshot(sim.tick, 1, 0.0, round_trip(state_columns(sim), sim)).tears()
+    assert tears["vy"][0] == pytest.approx(65535 / 16)
+    assert tears["y"][0] == pytest.approx(-32768 / 4)
@@ -0,0 +1,67 @@
+import numpy as np
+import pygame
+
+from catch_game import DANGER_RED, PARTICLE_COLORS, TEARS_MEDIUM, Particle, ParticleSplat
+from entities import EntityPool
+from particles import ContinuousEmitter, ParticleSystem, TrailEmitter
+
+def test_pool_never_grows_past_the_limit():
+    system = ParticleSystem(capacity=100)
+    assert system.emit(np.zeros(80), 0.0, 0.0, 0.0, 10, 3, 0) == 80
+    assert system.burst(5.0, 5.0, 0, count=50, life=10) == 20
+    assert system.burst(5.0, 5.0, 0, count=50, life=10) == 0
+    assert system.count == 100
+    assert system.pool.capacity == 100
+    system.clear()
+    # Quality levels lower the limit below the capacity
+    system.limit = 30
+    assert system.burst(5.0, 5.0, 0, count=50, life=10) == 30
+    assert system.room() == 0
+
+def test_update_integrates_and_drops_the_dead():
+    system = ParticleSystem(capacity=10, gravity=0.5)
+    system.emit([0.0, 10.0], [0.0, 0.0], vx=[1.0, -1.0], vy=[0.0, -2.0], life=np.array([1, 3]), size=3, color=0)
+    system.update()
+    assert system.count == 1
+    assert (system.pool.x[0], system.pool.y[0], system.pool.vy[0]) == (9.0, -2.0, -1.5)
+    system.update()
+    system.update()
+    assert system.count == 0
+
+def test_continuous_emitter_carries_fractions_and_stops():
+    system = ParticleSystem(capacity=1000)
+    emitter = system.add(ContinuousEmitter(100.0, 100.0, 0, rate=0.5, life=100, ticks=10))
+    for _ in range(12):
+        system.update()
+    assert system.count == 5
+    assert emitter not in system.emitters
+
+def test_trail_emitter_sheds_from_matching_kinds_only():
+    tears = EntityPool()
+    tears.spawn_many(np.array([100.0, 300.0, 500.0]), 200.0, size=40, kind=np.array([0, 1, 1]))
+    system = ParticleSystem(capacity=1000)
+    trail = TrailEmitter(tears, kinds=(1,), color=2, rate=1.0, life=30)
+    assert trail.emit(system)
+    pool = system.pool
+    assert system.count == 2
+    assert sorted(np.round(pool.x[:2], -2).tolist()) == [300.0, 500.0]
+    assert (pool.y[:2] == 180.0).all()
+    assert (pool.color[:2] == 2).all()
+
+def test_particle_colors_index_the_palette():
+    pool = EntityPool()
+    particle = Particle.spawn(pool, 10, 20, DANGER_RED, life=5)
+    assert particle.color == DANGER_RED
+    assert PARTICLE_COLORS[Particle.color_index(TEARS_MEDIUM)] == TEARS_MEDIUM
+
+def test_splat_draws_where_the_particles_are(display):
+    screen = pygame.Surface((200, 100))
+    system = ParticleSystem(capacity=100)
+    color = Particle.color_index(DANGER_RED)
+    system.emit(np.full(50, 150.0), np.full(50, 40.0), 0.0, 0.0, 10, np.full(50, 5), color)
+    system.update()
+    rects = ParticleSplat().draw(system.pool, screen, 1.0)
+    assert rects and all(rect.collidepoint(150, 40) for rect in rects)
+    red, green, blue = screen.get_at((150, 40))[:3]
+    assert red > 100 and red > green and red > blue
+    assert screen.get_at((20, 80))[:3] == (0, 0, 0)
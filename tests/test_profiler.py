@@ -0,0 +1,93 @@
+import threading
+import time
+
+import pytest
+
+import profiler
+from profiler import PHASES, THREAD_LABEL, FrameProfiler
+
+class FakeGame:
+    """Has every profiled method; update_game sleeps so its time shows."""
+
+    def __init__(self):
+        self.calls = []
+
+    def update_game(self):
+        self.calls.append(threading.current_thread().name)
+        time.sleep(0.002)
+
+for _method, _ in PHASES:
+    if not hasattr(FakeGame, _method):
+        setattr(FakeGame, _method, lambda self: None)
+
+def column(frame_profiler, label):
+    return frame_profiler.recorded()[:, frame_profiler.columns.index(label)]
+
+def test_main_thread_calls_are_phases():
+    game = FakeGame()
+    frames = FrameProfiler()
+    frames.enable(game)
+    frames.begin_frame()
+    game.update_game()
+    frames.end_frame()
+    assert column(frames, "update")[0] >= 2.0
+    assert column(frames, THREAD_LABEL)[0] == 0.0
+
+def test_other_thread_calls_go_to_the_thread_column():
+    game = FakeGame()
+    frames = FrameProfiler()
+    frames.enable(game)
+    frames.begin_frame()
+    thread = threading.Thread(target=lambda: [game.update_game() for _ in range(3)], name="simulation")
+    thread.start()
+    thread.join()
+    frames.end_frame()
+    assert game.calls == ["simulation"] * 3
+    assert column(frames, "update")[0] == 0.0
+    assert column(frames, THREAD_LABEL)[0] >= 6.0
+    # Drained by the frame that saw them
+    frames.begin_frame()
+    frames.end_frame()
+    assert column(frames, THREAD_LABEL)[1] == 0.0
+
+def test_disable_restores_the_class_methods():
+    class Subclass(FakeGame):
+        def update_game(self):
+            self.calls.append("override")
+
+    game = Subclass()
+    frames = FrameProfiler()
+    frames.enable(game)
+    game.update_game()
+    frames.disable()
+    assert "update_game" not in vars(game)
+    game.update_game()
+    assert game.calls == ["override", "override"]
+
+def test_surfaces_are_counted(display):
+    before = profiler.surfaces_created
+    profiler.new_surface((4, 4))
+    profiler.count_surfaces(2)
+    assert profiler.surfaces_created == before + 3
+
+@pytest.mark.parametrize("path", ["frames.csv", "frames.json"])
+def test_dump(tmp_path, path):
+    frames = FrameProfiler(capacity=4)
+    frames.enable(FakeGame())
+    for _ in range(6):
+        frames.begin_frame()
+        frames.end_frame(tears=3)
+    assert len(frames.recorded()) == 4
+    frames.dump(str(tmp_path / path))
+    assert (tmp_path / path).stat().st_size
+
+def test_overlay_surfaces_are_counted(display):
+    from catch_game import TextCache
+
+    frames = FrameProfiler()
+    frames.enable(FakeGame())
+    frames.begin_frame()
+    frames.end_frame()
+    before = profiler.surfaces_created
+    frames.draw_overlay(display, TextCache())
+    assert profiler.surfaces_created > before
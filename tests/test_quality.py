@@ -0,0 +1,50 @@
+from quality import QUALITY_LEVELS, UPGRADE_FRAMES, WINDOW_FRAMES, QualityGovernor
+
+FPS = 60
+BUDGET_MS = 1000.0 / FPS
+
+def feed(governor, frames, frame_ms, busy_ms):
+    """Observe ``frames`` identical frames; return how many changed the level."""
+    return sum(governor.observe(frame_ms, busy_ms) for _ in range(frames))
+
+def test_steps_down_under_load():
+    governor = QualityGovernor(FPS)
+    assert feed(governor, WINDOW_FRAMES - 1, BUDGET_MS * 2, BUDGET_MS * 2) == 0
+    assert governor.observe(BUDGET_MS * 2, BUDGET_MS * 2)
+    assert governor.name == "medium"
+    # Each level is judged on a full window of its own frames
+    feed(governor, WINDOW_FRAMES * 10, BUDGET_MS * 2, BUDGET_MS * 2)
+    assert governor.level == len(QUALITY_LEVELS) - 1
+    assert governor.changes == len(QUALITY_LEVELS) - 1
+
+def test_steps_back_up_with_headroom():
+    governor = QualityGovernor(FPS, level=2)
+    assert feed(governor, UPGRADE_FRAMES - 1, BUDGET_MS, BUDGET_MS * 0.3) == 0
+    assert governor.observe(BUDGET_MS, BUDGET_MS * 0.3)
+    assert governor.level == 1
+    feed(governor, UPGRADE_FRAMES, BUDGET_MS, BUDGET_MS * 0.3)
+    assert governor.level == 0
+    feed(governor, UPGRADE_FRAMES, BUDGET_MS, BUDGET_MS * 0.3)
+    assert governor.level == 0
+
+def test_a_busy_frame_resets_the_headroom():
+    governor = QualityGovernor(FPS, level=1)
+    feed(governor, UPGRADE_FRAMES - 1, BUDGET_MS, BUDGET_MS * 0.3)
+    governor.observe(BUDGET_MS, BUDGET_MS * 0.9)
+    assert feed(governor, UPGRADE_FRAMES - 1, BUDGET_MS, BUDGET_MS * 0.3) == 0
+    assert governor.level == 1
+
+def test_undone_upgrades_wait_longer():
+    governor = QualityGovernor(FPS, level=1)
+    feed(governor, UPGRADE_FRAMES, BUDGET_MS, BUDGET_MS * 0.3)
+    assert governor.level == 0
+    feed(governor, WINDOW_FRAMES, BUDGET_MS * 2, BUDGET_MS * 2)
+    assert governor.level == 1
+    assert feed(governor, UPGRADE_FRAMES, BUDGET_MS, BUDGET_MS * 0.3) == 0
+    feed(governor, UPGRADE_FRAMES, BUDGET_MS, BUDGET_MS * 0.3)
+    assert governor.level == 0
+
+def test_fixed_quality_never_changes():
+    governor = QualityGovernor(FPS, level=3, adaptive=False)
+    assert feed(governor, WINDOW_FRAMES * 5, BUDGET_MS * 3, BUDGET_MS * 3) == 0
+    assert governor.name == "minimal"
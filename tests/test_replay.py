@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+import replay as replay_module
+from entities import EntityPool
+from replay import Replay, ReplayError, ReplayRecorder
+from simulation import SimConfig, Simulation
+from test_simulation import LIVES, scripted_inputs
+from waves import load_waves
+
+TICKS = 2500
+
+def record(path, config, seed=21, snapshot_interval=600):
+    sim = Simulation(seed, config)
+    recorder = ReplayRecorder(str(path), sim, snapshot_interval)
+    for bits in scripted_inputs(TICKS, config.players):
+        recorder.record(bits)
+        sim.step(bits)
+    recorder.close()
+    return sim
+
+@pytest.mark.parametrize("config", [SimConfig(max_lives=LIVES),
+                                    SimConfig(players=2, waves="waves.json", max_lives=LIVES)],
+                         ids=["classic", "waves"])
+def test_round_trip(tmp_path, config):
+    path = tmp_path / "session.replay"
+    sim = record(path, config)
+    replay = Replay.load(str(path))
+    assert replay.seed == sim.seed
+    assert replay.length == TICKS
+    assert replay.final == (sim.tick, sim.total_score, sim.total_lives)
+    played = replay.play(replay.simulation())
+    assert played.snapshot() == sim.snapshot()
+
+def test_seek_matches_playing_from_the_start(tmp_path):
+    path = tmp_path / "session.replay"
+    record(path, SimConfig(waves="waves.json", max_lives=LIVES))
+    replay = Replay.load(str(path))
+    assert len(replay.snapshots) == (TICKS - 1) // 600
+    for tick in (0, 599, 600, 1333, TICKS):
+        sim = replay.simulation()
+        for bits in replay.input_stream():
+            if sim.tick >= tick:
+                break
+            sim.step(bits)
+        seeked = replay.simulation(tick)
+        assert seeked.tick == tick
+        assert seeked.snapshot() == sim.snapshot()
+
+def test_exclusive_recorder_does_not_overwrite(tmp_path):
+    path = tmp_path / "session.replay"
+    path.write_bytes(b"keep")
+    with pytest.raises(FileExistsError):
+        ReplayRecorder(str(path), Simulation(1), exclusive=True)
+    assert path.read_bytes() == b"keep"
+
+def test_changed_waves_are_refused(tmp_path, monkeypatch):
+    path = tmp_path / "session.replay"
+    record(path, SimConfig(waves="waves.json", max_lives=LIVES))
+    # As if waves.json had been edited since the recording
+    monkeypatch.setattr(load_waves("waves.json"), "digest", bytes(range(32)))
+    with pytest.raises(ReplayError):
+        Replay.load(str(path))
+
+def legacy_pack(pool):
+    """``EntityPool.pack`` as it was before version 4, with a phase column."""
+    n = pool.count
+    return np.uint32(n).tobytes() + b"".join(
+        (getattr(pool, name)[:n] if name in EntityPool.FIELDS else np.zeros(n, dtype=dtype)).tobytes()
+        for name, dtype in EntityPool.LEGACY_FIELDS.items())
+
+def test_version_3_snapshots_still_seek(tmp_path, monkeypatch):
+    path = tmp_path / "session.replay"
+    monkeypatch.setattr(replay_module, "FORMAT_VERSION", 3)
+    monkeypatch.setattr(EntityPool, "pack", legacy_pack)
+    # With a second player the snapshot goes on after the tears
+    sim = record(path, SimConfig(players=2, waves="waves.json", max_lives=LIVES))
+    monkeypatch.undo()
+
+    replay = Replay.load(str(path))
+    assert replay.version == 3
+    seeked = replay.simulation(1500)
+    assert seeked.tick == 1500
+    assert replay.play(seeked).snapshot() == sim.snapshot()
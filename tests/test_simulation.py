@@ -0,0 +1,57 @@
+import random
+
+from simulation import INPUT_BITS, INPUT_LEFT, INPUT_RIGHT, SimConfig, Simulation
+
+# Scripted players miss a lot; enough lives that no session ends early
+LIVES = 10 ** 6
+
+def scripted_inputs(ticks, players=1, seed=0):
+    """Held directions that change every few ticks, like a player would."""
+    rng = random.Random(seed)
+    inputs = []
+    while len(inputs) < ticks:
+        bits = 0
+        for player in range(players):
+            bits |= rng.choice((0, INPUT_LEFT, INPUT_RIGHT)) << (INPUT_BITS * player)
+        inputs.extend([bits] * rng.randrange(1, 40))
+    return inputs[:ticks]
+
+def run(sim, inputs):
+    events = []
+    for bits in inputs:
+        events.extend(sim.step(bits))
+    return events
+
+def test_same_seed_same_session():
+    inputs = scripted_inputs(3000)
+    a = Simulation(11, SimConfig(max_lives=LIVES))
+    b = Simulation(11, SimConfig(max_lives=LIVES))
+    assert run(a, inputs) == run(b, inputs)
+    assert a.snapshot() == b.snapshot()
+
+def test_restore_continues_identically():
+    inputs = scripted_inputs(4000, players=2)
+    config = SimConfig(players=2, max_lives=LIVES)
+    sim = Simulation(5, config)
+    run(sim, inputs[:1500])
+    saved = sim.snapshot()
+    expected = run(sim, inputs[1500:])
+
+    restored = Simulation(99, SimConfig(players=2, max_lives=LIVES))
+    restored.restore(saved)
+    assert restored.tick == 1500
+    assert run(restored, inputs[1500:]) == expected
+    assert restored.snapshot() == sim.snapshot()
+
+def test_restore_with_waves():
+    inputs = scripted_inputs(5000)
+    sim = Simulation(3, SimConfig(waves="waves.json", max_lives=LIVES))
+    run(sim, inputs[:2500])
+    saved = sim.snapshot()
+    expected = run(sim, inputs[2500:])
+
+    restored = Simulation(0, SimConfig(waves="waves.json", max_lives=LIVES))
+    restored.restore(saved)
+    assert restored.tick == 2500
+    assert run(restored, inputs[2500:]) == expected
+    assert restored.snapshot() == sim.snapshot()
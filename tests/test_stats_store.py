@@ -0,0 +1,75 @@
+import pytest
+
+from simulation import EVENT_CATCH, EVENT_HIT, EVENT_MISS, SimConfig, Simulation
+from stats_store import FRAME_BIN_MS, FRAME_BINS, SessionTelemetry, StatsStore, connect, leaderboard, summary
+
+def session(scores, players=None):
+    sim = Simulation(3, SimConfig(players=players or len(scores)))
+    telemetry = SessionTelemetry(sim.seed, sim.players, "waves.json")
+    for _ in range(120):
+        sim.step()
+        telemetry.tick(sim)
+        telemetry.frame(16.0, 0)
+    telemetry.event(EVENT_CATCH, 0)
+    telemetry.event(EVENT_MISS, 0)
+    telemetry.event(EVENT_HIT, sim.players - 1)
+    sim.player_score = list(scores)
+    return telemetry.result(sim, completed=True)
+
+def test_sessions_persist(tmp_path):
+    path = str(tmp_path / "data" / "stats.db")
+    store = StatsStore(path, machine="test")
+    store.start()
+    store.record(session([40]))
+    store.record(session([10, 70]))
+    store.close()
+    assert store.written == 2
+    assert store.best_score == 70
+
+    connection = connect(path)
+    assert [row[:2] for row in leaderboard(connection)] == [(70, 1), (40, 0), (10, 0)]
+    ((group, count, mean, best, ticks, catches, misses, hits, frame_ms, p99),) = summary(connection)
+    assert (count, best, ticks, catches, misses, hits) == (2, 80, 120, 2, 2, 2)
+    assert frame_ms == pytest.approx(16.0)
+    connection.close()
+
+    # A new store starts from the best score already saved
+    reopened = StatsStore(path)
+    reopened.start()
+    reopened.close()
+    assert reopened.best_score == 70
+
+def test_unopenable_database_stops_queueing(tmp_path, capsys):
+    blocker = tmp_path / "file"
+    blocker.write_text("not a folder")
+    store = StatsStore(str(blocker / "stats.db"))
+    store.record(session([5]))
+    store.start()
+    store._thread.join()
+    assert store.failed
+    assert store._queue.empty()
+    store.record(session([25]))
+    store.record(session([15]))
+    assert store._queue.empty()
+    assert store.best_score == 25
+    store.close()
+    assert capsys.readouterr().out.count("Stats disabled") == 1
+
+def test_frame_percentiles():
+    telemetry = SessionTelemetry(0, 1)
+    assert telemetry.frame_ms_percentile(99) is None
+    for _ in range(990):
+        telemetry.frame(16.0, 0)
+    for _ in range(10):
+        telemetry.frame(40.0, 1)
+    assert telemetry.frame_ms_percentile(50) == pytest.approx(16.0 + FRAME_BIN_MS)
+    assert telemetry.frame_ms_percentile(99) == pytest.approx(16.0 + FRAME_BIN_MS)
+    assert telemetry.frame_ms_percentile(99.5) == pytest.approx(40.0)
+    assert (telemetry.quality_worst, telemetry.quality_changes) == (1, 1)
+
+def test_frame_histogram_keeps_its_size():
+    telemetry = SessionTelemetry(0, 1)
+    telemetry.frame(10_000.0, 0)
+    assert len(telemetry.frame_histogram) == FRAME_BINS
+    assert telemetry.frame_histogram[-1] == 1
+    assert telemetry.frame_ms_percentile(99) == 10_000.0
@@ -0,0 +1,50 @@
+import time
+
+from catch_game import PLAYING, TICK_SECONDS, Game, RenderState
+
+def test_render_state_copies_are_private(display):
+    game = Game(seed=4, waves="waves.json")
+    game.state = PLAYING
+    game.reset_game()
+    for _ in range(120):
+        game.update_game()
+        game.particles.update()
+    state = RenderState(game)
+    tears = state.tears.count
+    assert tears and state.particles.count
+    x = state.tears.x[:tears].copy()
+    particles = state.particles.count
+
+    for _ in range(30):
+        game.update_game()
+        game.particles.update()
+    assert state.tears.count == tears
+    assert (state.tears.x[:tears] == x).all()
+    assert state.particles.count == particles
+    assert state.tick == game.sim.tick - 30
+
+    live = RenderState(game, copy=False)
+    assert live.tears is game.sim.tears
+    assert live.particles is game.particles.pool
+
+def test_simulation_thread_publishes_ticks(display):
+    game = Game(seed=4, threaded=True, waves="waves.json")
+    with game.sim_lock:
+        game.state = PLAYING
+        game.reset_game()
+    first = game.sim_thread.latest
+    assert first.tick == 0
+    game.sim_thread.start()
+    try:
+        time.sleep(TICK_SECONDS * 20)
+        state, alpha = game.render_state()
+    finally:
+        game.sim_thread.stop()
+    assert state is not first
+    assert state.tick > 0
+    assert 0.0 <= alpha <= 1.0
+    # Nothing ticks once the thread has stopped
+    tick = game.sim.tick
+    time.sleep(TICK_SECONDS * 3)
+    assert game.sim.tick == tick
+    assert game.sim_thread.latest.tick == tick
@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+from simulation import TICK_RATE
+from waves import SpawnSchedule, WaveSet, load_waves
+
+FIELDS = ("x", "kind", "speed", "size", "color")
+
+def schedule(seed=4):
+    return SpawnSchedule(load_waves("waves.json"), seed, 800, TICK_RATE, 4)
+
+def spawns(schedule, ticks):
+    """Every spawn due on ``ticks``, as (tick, field values...) rows."""
+    rows = []
+    for tick in ticks:
+        start, stop = schedule.window(tick)
+        assert (schedule.ticks[start:stop] == tick).all()
+        columns = [getattr(schedule, name)[start:stop].tolist() for name in FIELDS]
+        rows.extend((tick, *values) for values in zip(*columns))
+    return rows
+
+def lap_ticks(waveset):
+    first = sum(wave.seconds for wave in waveset.waves) * TICK_RATE
+    repeat = sum(wave.seconds for wave in waveset.waves[waveset.repeat_from:]) * TICK_RATE
+    return int(first), int(repeat)
+
+def test_laps_follow_each_other():
+    waveset = load_waves("waves.json")
+    first, repeat = lap_ticks(waveset)
+    s = schedule()
+    end = first + 4 * repeat
+    rows = spawns(s, range(end))
+    assert s.lap >= 5
+    ticks = [row[0] for row in rows]
+    assert ticks == sorted(ticks)
+    # Every lap spawns, and repeated laps speed the tears up
+    laps = [(first + i * repeat, first + (i + 1) * repeat) for i in range(4)]
+    speeds = [np.mean([row[3] for row in rows if lo <= row[0] < hi]) for lo, hi in laps]
+    assert all(later > earlier for earlier, later in zip(speeds, speeds[1:]))
+
+def test_only_unfinished_laps_are_kept():
+    waveset = load_waves("waves.json")
+    first, repeat = lap_ticks(waveset)
+    s = schedule()
+    spawns(s, range(first + 6 * repeat))
+    # Only the current lap and the next one, compiled ahead, are kept
+    assert s.base == first + 5 * repeat
+    assert s.ticks.min() >= s.base
+    assert s.ticks.max() < first + 7 * repeat
+
+def test_same_seed_same_spawns():
+    assert spawns(schedule(4), range(0, 20000, 7)) == spawns(schedule(4), range(0, 20000, 7))
+    assert spawns(schedule(4), range(3000)) != spawns(schedule(5), range(3000))
+
+def test_seeking_back_recompiles_the_same_spawns():
+    s = schedule()
+    later = spawns(s, range(30000, 30600))
+    earlier = spawns(s, range(100, 700))
+    fresh = schedule()
+    assert spawns(fresh, range(100, 700)) == earlier
+    assert spawns(fresh, range(30000, 30600)) == later
+
+def wave_data(**repeat):
+    return {
+        "tear_types": {"blue": {"speed": 5, "size": 35, "score": 10}},
+        "waves": [{"seconds": 10, "interval": [30, 20], "mix": {"blue": 1}}],
+        "repeat": repeat,
+    }
+
+def test_parse():
+    waveset = WaveSet.parse(wave_data(interval_scale=0.5, min_interval=4))
+    assert [t.name for t in waveset.tear_types] == ["blue"]
+    assert (waveset.interval_scale, waveset.min_interval) == (0.5, 4.0)
+    assert waveset.digest == WaveSet.parse(wave_data(min_interval=4, interval_scale=0.5)).digest
+
+@pytest.mark.parametrize("repeat", [{"min_interval": 0}, {"min_interval": -2}, {"from": 1}])
+def test_parse_rejects_bad_repeats(repeat):
+    with pytest.raises(ValueError):
+        WaveSet.parse(wave_data(**repeat))
+
+def test_parse_rejects_bad_intervals():
+    data = wave_data()
+    data["waves"][0]["interval"] = [30, 0]
+    with pytest.raises(ValueError):
+        WaveSet.parse(data)
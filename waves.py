@@ -0,0 +1,286 @@
+"""Data-driven tear types and spawn waves.
+
+A wave file is JSON that names the tear types and lists the waves of a
+session. ``SpawnSchedule`` compiles the waves ahead of time into arrays
+of spawns sorted by tick, so the simulation adds each tick's tears with
+one slice instead of rolling dice every tick, and a scripted burst of
+hundreds of tears costs the same per-tick work as a single tear.
+
+Tear type keys::
+
+    speed        pixels per tick (required)
+    size         pixels (required)
+    score        points for catching it
+    damage       lives lost when it is caught
+    miss_damage  lives lost when it falls off the bottom
+    sprite       "tear" or "danger" (pulsing red glow)
+    color        [r, g, b] for "tear" sprites; default: a random blue shade
+
+Wave keys::
+
+    name      label for readers of the file
+    seconds   length of the wave
+    interval  ticks between spawns at the start and the end of the wave
+    speed     speed multiplier at the start and the end (default [1, 1])
+    mix       relative weight of each tear type for regular spawns
+    bursts    scripted groups: {"at": seconds, "count": n, "over": seconds, "mix": {...}}
+
+After the last wave, the waves from ``repeat.from`` play again; every lap
+multiplies the intervals by ``repeat.interval_scale`` (but never below
+``repeat.min_interval``) and the speeds by ``repeat.speed_scale``.
+"""
+
+import collections
+import hashlib
+import json
+import os
+
+import numpy as np
+
+WAVES_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_WAVES = "waves.json"
+SPRITES = ("tear", "danger")
+
+# Laps are compiled this many ticks before they are needed
+LOOKAHEAD_TICKS = 600
+
+class WaveError(Exception):
+    pass
+
+class TearType:
+    __slots__ = ("name", "speed", "size", "score", "damage", "miss_damage", "sprite", "color")
+
+    def __init__(self, name, speed, size, score=0, damage=0, miss_damage=0, sprite="tear", color=None):
+        self.name = name
+        self.speed = speed
+        self.size = size
+        self.score = score
+        self.damage = damage
+        self.miss_damage = miss_damage
+        self.sprite = sprite
+        self.color = color
+
+class WaveSet:
+    """Tear types and waves loaded from a wave file.
+
+    ``digest`` is the SHA-256 of the parsed data, so two wave sets with the
+    same digest compile the same spawns whatever their file is called.
+    """
+
+    def __init__(self, tear_types, waves, repeat_from=0, interval_scale=1.0, speed_scale=1.0, min_interval=1,
+                 digest=None):
+        self.tear_types = tear_types
+        self.waves = waves
+        self.repeat_from = repeat_from
+        self.interval_scale = interval_scale
+        self.speed_scale = speed_scale
+        self.min_interval = min_interval
+        self.digest = digest
+
+    @classmethod
+    def load(cls, path):
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            raise WaveError(f"Cannot read wave file {path}: {e}")
+        try:
+            return cls.parse(data)
+        except (KeyError, TypeError, ValueError) as e:
+            raise WaveError(f"Invalid wave file {path}: {e!r}")
+
+    @classmethod
+    def parse(cls, data):
+        tear_types = []
+        for name, spec in data["tear_types"].items():
+            sprite = spec.get("sprite", "tear")
+            if sprite not in SPRITES:
+                raise ValueError(f"tear type {name}: unknown sprite {sprite}")
+            color = tuple(spec["color"]) if "color" in spec else None
+            tear_types.append(TearType(name, float(spec["speed"]), int(spec["size"]), int(spec.get("score", 0)),
+                                       int(spec.get("damage", 0)), int(spec.get("miss_damage", 0)), sprite, color))
+        kinds = {tear_type.name: kind for kind, tear_type in enumerate(tear_types)}
+
+        waves = []
+        for wave in data["waves"]:
+            interval = wave.get("interval")
+            if interval is not None and min(interval) <= 0:
+                raise ValueError(f"wave {wave.get('name')}: intervals must be positive")
+            bursts = []
+            for burst in wave.get("bursts", ()):
+                mix = cls._mix(burst.get("mix", wave.get("mix")), kinds)
+                if mix is None:
+                    raise ValueError(f"wave {wave.get('name')}: burst without a mix")
+                bursts.append((float(burst["at"]), int(burst["count"]), float(burst.get("over", 0)), mix))
+            waves.append(Wave(wave.get("name", ""), float(wave["seconds"]), interval,
+                              wave.get("speed", (1.0, 1.0)), cls._mix(wave.get("mix"), kinds), bursts))
+        if not waves:
+            raise ValueError("no waves")
+
+        repeat = data.get("repeat", {})
+        repeat_from = int(repeat.get("from", 0))
+        if not 0 <= repeat_from < len(waves):
+            raise ValueError(f"repeat.from {repeat_from} is not a wave index")
+        min_interval = float(repeat.get("min_interval", 1))
+        if min_interval <= 0:
+            raise ValueError(f"repeat.min_interval {min_interval} must be positive")
+        digest = hashlib.sha256(json.dumps(data, sort_keys=True).encode()).digest()
+        return cls(tuple(tear_types), waves, repeat_from, float(repeat.get("interval_scale", 1.0)),
+                   float(repeat.get("speed_scale", 1.0)), min_interval, digest)
+
+    @staticmethod
+    def _mix(mix, kinds):
+        """Return ``(kinds, probabilities)`` arrays for a ``{type name: weight}`` mix."""
+        if not mix:
+            return None
+        for name in mix:
+            if name not in kinds:
+                raise ValueError(f"unknown tear type {name}")
+        weights = np.array(list(mix.values()), dtype=np.float64)
+        return np.array([kinds[name] for name in mix], dtype=np.int8), weights / weights.sum()
+
+class Wave:
+    __slots__ = ("name", "seconds", "interval", "speed", "mix", "bursts")
+
+    def __init__(self, name, seconds, interval, speed, mix, bursts):
+        self.name = name
+        self.seconds = seconds
+        self.interval = interval
+        self.speed = speed
+        self.mix = mix
+        self.bursts = bursts
+
+_loaded = {}
+
+def load_waves(path):
+    """Load a wave file once per process; relative paths may name a bundled file."""
+    if not os.path.isabs(path) and not os.path.exists(path):
+        path = os.path.join(WAVES_DIR, path)
+    path = os.path.abspath(path)
+    waves = _loaded.get(path)
+    if waves is None:
+        waves = _loaded[path] = WaveSet.load(path)
+    return waves
+
+class SpawnSchedule:
+    """Every spawn of one session, compiled lap by lap and sorted by tick.
+
+    The spawns due on tick ``t`` are entries ``window(t)`` of the ``x``,
+    ``kind``, ``speed``, ``size`` and ``color`` arrays. Each lap draws
+    from its own RNG seeded with ``(seed, lap)``, so a schedule depends
+    only on the wave set and the seed, never on when it was compiled.
+
+    Only the laps that have not ended yet are kept, so memory does not grow
+    with the session's length. Asking for a tick before them (e.g. after
+    restoring an earlier snapshot) compiles the schedule again from lap 0.
+    """
+
+    FIELDS = (("x", np.float64), ("kind", np.int8), ("speed", np.float64), ("size", np.int32), ("color", np.int16))
+
+    def __init__(self, waveset, seed, width, tick_rate, color_variants):
+        self.waveset = waveset
+        self.seed = seed
+        self.width = width
+        self.tick_rate = tick_rate
+        self.color_variants = color_variants
+        types = waveset.tear_types
+        self._type_speed = np.array([t.speed for t in types])
+        self._type_size = np.array([t.size for t in types], dtype=np.int32)
+        self._type_shaded = np.array([t.sprite == "tear" and t.color is None for t in types])
+        self._restart()
+
+    def _restart(self):
+        self.ticks = np.zeros(0, dtype=np.int64)
+        for name, dtype in self.FIELDS:
+            setattr(self, name, np.zeros(0, dtype=dtype))
+        # Spawns are kept from tick ``base`` up to ``horizon``; ``_laps`` holds (end tick, spawns) per kept lap
+        self.base = 0
+        self.horizon = 0
+        self.lap = 0
+        self._laps = collections.deque()
+        self._due = None
+        self._offsets = np.zeros(1, dtype=np.intp)
+        self._compile_lap()
+
+    def window(self, tick):
+        """Return the ``(start, stop)`` slice of the spawns due on ``tick``."""
+        if tick < self.base:
+            self._restart()
+        while tick + LOOKAHEAD_TICKS >= self.horizon:
+            self._compile_lap()
+        while len(self._laps) > 1 and self._laps[0][0] <= tick:
+            self._drop_lap()
+        return self._offsets[tick - self.base], self._offsets[tick - self.base + 1]
+
+    def _drop_lap(self):
+        """Forget the oldest kept lap and rebase the tick offsets on the next one."""
+        end, count = self._laps.popleft()
+        self.ticks = self.ticks[count:]
+        for name, _ in self.FIELDS:
+            setattr(self, name, getattr(self, name)[count:])
+        self._offsets = self._offsets[end - self.base:] - count
+        self.base = end
+
+    def _compile_lap(self):
+        waveset = self.waveset
+        lap = self.lap
+        rng = np.random.default_rng([self.seed, lap])
+        waves = waveset.waves if lap == 0 else waveset.waves[waveset.repeat_from:]
+        interval_scale = waveset.interval_scale ** lap
+        speed_scale = waveset.speed_scale ** lap
+
+        parts = []
+        start = self.horizon
+        for wave in waves:
+            length = max(1, int(round(wave.seconds * self.tick_rate)))
+            end = start + length
+            if wave.interval is not None and wave.mix is not None:
+                first, last = wave.interval
+                if self._due is None:
+                    self._due = start + max(waveset.min_interval, first * interval_scale)
+                ticks = []
+                while self._due < end:
+                    ticks.append(int(self._due))
+                    fraction = (self._due - start) / length
+                    interval = (first + (last - first) * fraction) * interval_scale
+                    self._due += max(waveset.min_interval, interval)
+                if ticks:
+                    parts.append(self._spawns(rng, np.array(ticks, dtype=np.int64), start, length, wave, speed_scale,
+                                              wave.mix))
+            else:
+                # The next wave with regular spawns starts its own count
+                self._due = None
+            for at, count, over, mix in wave.bursts:
+                if count <= 0:
+                    continue
+                offsets = int(at * self.tick_rate) + (np.arange(count) * (over * self.tick_rate) / count).astype(np.int64)
+                ticks = start + np.minimum(offsets, length - 1)
+                parts.append(self._spawns(rng, ticks, start, length, wave, speed_scale, mix))
+            start = end
+
+        count = 0
+        if parts:
+            ticks = np.concatenate([part[0] for part in parts])
+            count = ticks.size
+            order = np.argsort(ticks, kind="stable")
+            self.ticks = np.concatenate((self.ticks, ticks[order]))
+            for i, (name, _) in enumerate(self.FIELDS, 1):
+                values = np.concatenate([part[i] for part in parts])[order]
+                setattr(self, name, np.concatenate((getattr(self, name), values)))
+        self._laps.append((start, count))
+        self.horizon = start
+        self.lap += 1
+        self._offsets = np.searchsorted(self.ticks, np.arange(self.base, self.horizon + 1), side="left")
+
+    def _spawns(self, rng, ticks, start, length, wave, speed_scale, mix):
+        """Draw the type, position, speed and shade of a spawn at each of ``ticks``."""
+        n = ticks.size
+        kinds, probabilities = mix
+        kind = kinds[rng.choice(kinds.size, n, p=probabilities)]
+        size = self._type_size[kind]
+        x = rng.integers(size // 2, self.width - size // 2, endpoint=True).astype(np.float64)
+        first, last = wave.speed
+        fraction = (ticks - start) / length
+        speed = self._type_speed[kind] * (first + (last - first) * fraction) * speed_scale
+        color = np.where(self._type_shaded[kind], rng.integers(0, self.color_variants, n), 0).astype(np.int16)
+        return ticks, x, kind, speed, size, color